@@ -0,0 +1,67 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Benchmarks of the compiler: commands per second which pass through the
+default and the IBM compiler engine pipelines.
+"""
+
+import timeit
+
+from projectq import MainEngine
+from projectq.backends import ResourceCounter
+from projectq.cengines import DummyEngine
+from projectq.ops import All, CNOT, H, Measure, S, T
+from projectq.setups.default import default_engines
+from projectq.setups.ibm import ibm_default_engines
+
+
+def star_circuit(eng, num_qubits, num_layers):
+    """
+    Clifford+T circuit whose CNOTs all act on the first qubit, such that it
+    can be mapped onto the (star-shaped) IBM chip without swaps.
+    """
+    qureg = eng.allocate_qureg(num_qubits)
+    for layer in range(num_layers):
+        All(H) | qureg
+        for qubit in qureg[1:]:
+            CNOT | (qureg[0], qubit)
+            T | qubit
+        All(S) | qureg
+    All(Measure) | qureg
+    eng.flush()
+
+
+class CommandsPerSecond(object):
+    """
+    Number of commands per second sent to the compiler (counted by a
+    ResourceCounter in front of the pipeline, with a DummyEngine as backend).
+    """
+    params = ["default", "ibm"]
+    param_names = ["engines"]
+
+    def setup(self, engines):
+        get_engine_list = {"default": default_engines,
+                           "ibm": ibm_default_engines}[engines]
+        self.counter = ResourceCounter()
+        self.eng = MainEngine(backend=DummyEngine(),
+                              engine_list=[self.counter] + get_engine_list())
+
+    def track_commands_per_second(self, engines):
+        start = timeit.default_timer()
+        star_circuit(self.eng, 5, 200)
+        elapsed = timeit.default_timer() - start
+        return sum(self.counter.gate_counts.values()) / elapsed
+
+    track_commands_per_second.unit = "commands/s"
@@ -0,0 +1,95 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+End-to-end benchmarks running the examples (Shor, Grover and teleportation)
+on the simulator, including compilation.
+"""
+
+import os
+import runpy
+
+import projectq.libs.math
+import projectq.setups.decompositions
+from projectq import MainEngine
+from projectq.backends import Simulator
+from projectq.cengines import (AutoReplacer,
+                               DecompositionRuleSet,
+                               InstructionFilter,
+                               LocalOptimizer,
+                               TagRemover)
+from projectq.ops import H, Rz
+from projectq.setups.default import default_engines
+
+_EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "examples")
+
+
+def load_example(name):
+    """
+    Return the global variables of the example examples/<name>.py (without
+    running its main part).
+    """
+    return runpy.run_path(os.path.join(_EXAMPLES_DIR, name + ".py"))
+
+
+class Shor(object):
+    """
+    Factors N = 15 (or 21) using the compiler setup of examples/shor.py.
+    """
+    params = [15, 21]
+    param_names = ["N"]
+
+    def setup(self, N):
+        self.example = load_example("shor")
+        rule_set = DecompositionRuleSet(modules=[
+            projectq.libs.math, projectq.setups.decompositions])
+        high_level_gates = self.example["high_level_gates"]
+        engines = [AutoReplacer(rule_set),
+                   InstructionFilter(high_level_gates),
+                   TagRemover(),
+                   LocalOptimizer(3),
+                   AutoReplacer(rule_set),
+                   TagRemover(),
+                   LocalOptimizer(3)]
+        self.eng = MainEngine(Simulator(rnd_seed=1), engines)
+
+    def time_run_shor(self, N):
+        self.example["run_shor"](self.eng, N, 2)
+
+
+class Grover(object):
+    """ Grover search for a 7-bit solution (default compiler engines). """
+    def setup(self):
+        self.example = load_example("grover")
+        self.eng = MainEngine(Simulator(rnd_seed=1), default_engines())
+
+    def time_run_grover(self):
+        self.example["run_grover"](self.eng, 7,
+                                   self.example["alternating_bits_oracle"])
+
+
+def _create_state(eng, qubit):
+    H | qubit
+    Rz(1.21) | qubit
+
+
+class Teleport(object):
+    """ Quantum teleportation (default compiler engines). """
+    def setup(self):
+        self.example = load_example("teleport")
+        self.eng = MainEngine(Simulator(rnd_seed=1), default_engines())
+
+    def time_run_teleport(self):
+        self.example["run_teleport"](self.eng, _create_state)
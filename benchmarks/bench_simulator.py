@@ -0,0 +1,172 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Benchmarks of the C++ and the Python simulator: gate kernels, emulation of
+math gates, expectation values and time evolution.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from projectq import MainEngine
+from projectq.backends import Simulator
+from projectq.libs.math import AddConstant
+from projectq.meta import Control
+from projectq.ops import All, H, Measure, QubitOperator, TimeEvolution
+
+
+def make_simulator(kind):
+    """
+    Return a Simulator which uses the C++ ("cpp") or the Python ("python")
+    kernels.
+
+    Raises:
+        NotImplementedError: If the C++ simulator is not available (skips the
+            benchmark).
+    """
+    if kind == "cpp":
+        try:
+            from projectq.backends._sim._cppsim import Simulator as Backend
+        except ImportError:
+            raise NotImplementedError("C++ simulator is not available.")
+    else:
+        from projectq.backends._sim._pysim import Simulator as Backend
+    sim = Simulator(rnd_seed=1)
+    # (the Python simulator prints a note when it is created)
+    stdout = sys.stdout
+    with open(os.devnull, "w") as sys.stdout:
+        try:
+            sim._simulator = Backend(1)
+        finally:
+            sys.stdout = stdout
+    return sim
+
+
+def _random_unitary(num_qubits, seed=42):
+    rng = np.random.RandomState(seed)
+    dim = 1 << num_qubits
+    matrix = rng.randn(dim, dim) + 1j * rng.randn(dim, dim)
+    q, _ = np.linalg.qr(matrix)
+    return q
+
+
+class GateKernels(object):
+    """
+    Applies 10 k-qubit gates directly to the simulator kernels. With fusion,
+    the gates are collected and executed at once; otherwise, each one is
+    executed right away.
+    """
+    params = (["cpp", "python"], [10, 16, 20], [1, 2, 3, 4, 5],
+              [False, True])
+    param_names = ["simulator", "num_qubits", "arity", "fusion"]
+
+    def setup(self, simulator, num_qubits, arity, fusion):
+        # the Python kernels do not fuse gates (and are slow)
+        if simulator == "python" and (fusion or num_qubits > 10):
+            raise NotImplementedError
+        self.backend = make_simulator(simulator)._simulator
+        for qubit_id in range(num_qubits):
+            self.backend.allocate_qubit(qubit_id)
+        self.matrix = _random_unitary(arity)
+        self.ids = [[(i + j) % num_qubits for j in range(arity)]
+                    for i in range(10)]
+
+    def time_gates(self, simulator, num_qubits, arity, fusion):
+        for ids in self.ids:
+            self.backend.apply_controlled_gate(self.matrix, ids, [])
+            if not fusion:
+                self.backend.run()
+        self.backend.run()
+
+
+class EmulateMath(object):
+    """ Adds a constant to a register by emulation (controlled). """
+    params = (["cpp", "python"], [8, 14])
+    param_names = ["simulator", "num_qubits"]
+
+    def setup(self, simulator, num_qubits):
+        if simulator == "python" and num_qubits > 8:
+            raise NotImplementedError
+        self.eng = MainEngine(make_simulator(simulator), [])
+        self.ctrl = self.eng.allocate_qubit()
+        self.qureg = self.eng.allocate_qureg(num_qubits - 1)
+        H | self.ctrl
+        All(H) | self.qureg
+        self.eng.flush()
+
+    def teardown(self, simulator, num_qubits):
+        All(Measure) | self.qureg + self.ctrl
+        self.eng.flush()
+
+    def time_add_constant(self, simulator, num_qubits):
+        with Control(self.eng, self.ctrl):
+            AddConstant(7) | self.qureg
+        self.eng.flush()
+
+
+def _hamiltonian(num_qubits):
+    hamiltonian = QubitOperator()
+    for i in range(num_qubits - 1):
+        hamiltonian += QubitOperator("X{} X{}".format(i, i + 1), 0.5)
+        hamiltonian += QubitOperator("Z{}".format(i), 0.3)
+    return hamiltonian
+
+
+class ExpectationValue(object):
+    """ Expectation value of a nearest-neighbor Hamiltonian. """
+    params = (["cpp", "python"], [8, 16])
+    param_names = ["simulator", "num_qubits"]
+
+    def setup(self, simulator, num_qubits):
+        if simulator == "python" and num_qubits > 8:
+            raise NotImplementedError
+        self.sim = make_simulator(simulator)
+        self.eng = MainEngine(self.sim, [])
+        self.qureg = self.eng.allocate_qureg(num_qubits)
+        All(H) | self.qureg
+        self.eng.flush()
+        self.hamiltonian = _hamiltonian(num_qubits)
+
+    def teardown(self, simulator, num_qubits):
+        All(Measure) | self.qureg
+        self.eng.flush()
+
+    def time_expectation_value(self, simulator, num_qubits):
+        self.sim.get_expectation_value(self.hamiltonian, self.qureg)
+
+
+class TimeEvolutionBenchmark(object):
+    """ Time evolution under a nearest-neighbor Hamiltonian. """
+    params = (["cpp", "python"], [6, 12])
+    param_names = ["simulator", "num_qubits"]
+
+    def setup(self, simulator, num_qubits):
+        if simulator == "python" and num_qubits > 6:
+            raise NotImplementedError
+        self.eng = MainEngine(make_simulator(simulator), [])
+        self.qureg = self.eng.allocate_qureg(num_qubits)
+        All(H) | self.qureg
+        self.eng.flush()
+        self.hamiltonian = _hamiltonian(num_qubits)
+
+    def teardown(self, simulator, num_qubits):
+        All(Measure) | self.qureg
+        self.eng.flush()
+
+    def time_time_evolution(self, simulator, num_qubits):
+        TimeEvolution(0.5, self.hamiltonian) | self.qureg
+        self.eng.flush()
@@ -0,0 +1,67 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Measures the number of commands per second which pass through the default
+compiler engine pipeline, with and without a CommandBatcher after the
+MainEngine.
+
+Usage:
+    python benchmarks/commands_per_second.py [num_qubits] [num_layers]
+"""
+
+import sys
+import timeit
+
+from projectq import MainEngine
+from projectq.backends import ResourceCounter, Simulator
+from projectq.cengines import CommandBatcher, DummyEngine
+from projectq.ops import All, CNOT, H, Measure, Rz, T
+from projectq.setups.default import default_engines
+
+
+def circuit(eng, num_qubits, num_layers):
+    qureg = eng.allocate_qureg(num_qubits)
+    for layer in range(num_layers):
+        All(H) | qureg
+        for i in range(num_qubits - 1):
+            CNOT | (qureg[i], qureg[i + 1])
+            Rz(0.1 * (layer + i)) | qureg[i + 1]
+        All(T) | qureg
+    All(Measure) | qureg
+    eng.flush()
+
+
+def run(backend_class, batch_size, num_qubits, num_layers):
+    counter = ResourceCounter()
+    engines = [counter] + default_engines()
+    if batch_size is not None:
+        engines = [CommandBatcher(batch_size)] + engines
+    eng = MainEngine(backend=backend_class(), engine_list=engines)
+    start = timeit.default_timer()
+    circuit(eng, num_qubits, num_layers)
+    elapsed = timeit.default_timer() - start
+    return sum(counter.gate_counts.values()) / elapsed
+
+
+if __name__ == "__main__":
+    num_qubits = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    num_layers = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print("{:<16}{:>12}{:>16}".format("backend", "batch size",
+                                      "commands / s"))
+    for backend_class in [DummyEngine, Simulator]:
+        for batch_size in [None, 16, 256]:
+            rate = run(backend_class, batch_size, num_qubits, num_layers)
+            print("{:<16}{:>12}{:>16.0f}".format(backend_class.__name__,
+                                                 str(batch_size), rate))
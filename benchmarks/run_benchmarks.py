@@ -0,0 +1,252 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Runs the benchmarks in the bench_*.py files of this directory and stores the
+results as JSON, such that they can be compared against a baseline.
+
+The benchmarks are written in the style of asv (airspeed velocity), but do
+not require it: Each benchmark class may define
+
+    * params / param_names: Lists of parameter values (and their names); the
+      benchmarks are run for all combinations.
+    * setup(*params): Called before each sample. Raising NotImplementedError
+      skips the parameter combination.
+    * teardown(*params): Called after each sample.
+    * time_*(*params): Benchmarks measuring the run time (in seconds).
+    * track_*(*params): Benchmarks returning a value (e.g., a rate); the
+      unit is given by the function attribute `unit`.
+
+Usage:
+    python benchmarks/run_benchmarks.py [-o results.json] [-b REGEX]
+        [--repeat N] [--compare baseline.json] [--threshold 1.2]
+
+Example:
+    .. code-block:: bash
+
+        git checkout master
+        python benchmarks/run_benchmarks.py -o baseline.json
+        git checkout my-branch
+        python benchmarks/run_benchmarks.py -o new.json \\
+            --compare baseline.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import datetime
+import glob
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import timeit
+
+_BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT_DIR = os.path.dirname(_BENCHMARK_DIR)
+# benchmark the checkout the runner belongs to
+sys.path.insert(0, _ROOT_DIR)
+sys.path.insert(0, _BENCHMARK_DIR)
+
+
+def _get_commit():
+    # (outside of a git checkout, git complains on stderr)
+    with open(os.devnull, "w") as devnull:
+        try:
+            return subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                           cwd=_ROOT_DIR,
+                                           stderr=devnull).decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+
+def _get_param_combinations(benchmark_class):
+    params = getattr(benchmark_class, "params", [])
+    if len(params) > 0 and not isinstance(params[0], (list, tuple)):
+        params = [params]
+    names = getattr(benchmark_class, "param_names",
+                    ["param{}".format(i) for i in range(len(params))])
+    for values in itertools.product(*params):
+        yield dict(zip(names, values)), values
+
+
+def _run_sample(instance, method, values):
+    """ Run setup, method and teardown; return (duration, return value). """
+    if hasattr(instance, "setup"):
+        instance.setup(*values)
+    try:
+        start = timeit.default_timer()
+        result = method(*values)
+        duration = timeit.default_timer() - start
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(*values)
+    return duration, result
+
+
+def run_benchmark_class(module_name, benchmark_class, pattern, repeat):
+    """
+    Run all benchmarks of a class for all parameter combinations.
+
+    Returns:
+        List of results, each of which is a dictionary containing the name
+        of the benchmark, its parameters, unit and value (the minimum over
+        all samples for timing benchmarks).
+    """
+    results = []
+    methods = sorted(name for name in dir(benchmark_class)
+                     if name.startswith(("time_", "track_")))
+    for method_name in methods:
+        name = "{}.{}.{}".format(module_name, benchmark_class.__name__,
+                                 method_name)
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        for params, values in _get_param_combinations(benchmark_class):
+            instance = benchmark_class()
+            method = getattr(instance, method_name)
+            try:
+                samples = [_run_sample(instance, method, values)
+                           for _ in range(repeat if method_name.startswith(
+                               "time_") else 1)]
+            except NotImplementedError:
+                continue
+            if method_name.startswith("time_"):
+                times = sorted(duration for duration, _ in samples)
+                value = times[0]
+                unit = "seconds"
+            else:
+                value = samples[0][1]
+                unit = getattr(method, "unit", "")
+            results.append({"name": name, "params": params, "unit": unit,
+                            "value": value, "samples": len(samples)})
+            print("{:<90}{:>14.6g} {}".format(
+                name + _format_params(params), value, unit))
+            sys.stdout.flush()
+    return results
+
+
+def _format_params(params):
+    if len(params) == 0:
+        return ""
+    return "(" + ", ".join("{}={}".format(key, params[key])
+                           for key in sorted(params)) + ")"
+
+
+def run_benchmarks(pattern=None, repeat=5):
+    """
+    Run all benchmarks of the bench_*.py files in the benchmark directory.
+
+    Args:
+        pattern (str): Regular expression; only benchmarks whose name
+            (module.Class.method) matches it are run.
+        repeat (int): Number of samples of each timing benchmark.
+
+    Returns:
+        Dictionary containing the results and information about the machine
+        and the commit which was benchmarked.
+    """
+    results = []
+    files = sorted(glob.glob(os.path.join(_BENCHMARK_DIR, "bench_*.py")))
+    for filename in files:
+        module_name = os.path.splitext(os.path.basename(filename))[0]
+        module = __import__(module_name)
+        for attr in sorted(dir(module)):
+            obj = getattr(module, attr)
+            if (isinstance(obj, type) and obj.__module__ == module_name and
+                    not attr.startswith("_")):
+                results += run_benchmark_class(module_name, obj, pattern,
+                                               repeat)
+    return {"date": datetime.datetime.now().isoformat(),
+            "commit": _get_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "results": results}
+
+
+def _get_key(result):
+    return result["name"] + _format_params(result["params"])
+
+
+def compare(results, baseline, threshold=1.2):
+    """
+    Compare results to a baseline and print a table of all benchmarks which
+    were run in both, flagging the ones whose value changed by more than the
+    given factor.
+
+    Timing benchmarks regress if they take longer, all others (rates) if
+    their value decreases.
+
+    Returns:
+        List of the keys of all regressed benchmarks.
+    """
+    old_values = {_get_key(res): res["value"] for res in baseline["results"]}
+    regressions = []
+    print("\n{:<90}{:>14}{:>14}{:>10}".format("benchmark", "baseline", "new",
+                                             "ratio"))
+    for res in results["results"]:
+        key = _get_key(res)
+        old = old_values.get(key)
+        if not old or not res["value"]:
+            continue
+        ratio = float(res["value"]) / old
+        if res["unit"] == "seconds":
+            slower = ratio
+        else:
+            slower = 1. / ratio
+        if slower > threshold:
+            regressions.append(key)
+            flag = "  (regression)"
+        elif slower < 1. / threshold:
+            flag = "  (improvement)"
+        else:
+            flag = ""
+        print("{:<90}{:>14.6g}{:>14.6g}{:>10.2f}{}".format(
+            key, old, res["value"], ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ProjectQ "
+                                     "benchmarks.")
+    parser.add_argument("-o", "--output", help="JSON file to write the "
+                        "results to")
+    parser.add_argument("-b", "--bench", help="only run benchmarks matching "
+                        "this regular expression")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of samples of each timing benchmark")
+    parser.add_argument("--compare", help="JSON file of a previous run to "
+                        "compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="factor by which a benchmark has to change to "
+                        "be reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.bench, args.repeat)
+    if args.output is not None:
+        with open(args.output, "w") as result_file:
+            json.dump(results, result_file, indent=1, sort_keys=True)
+    if args.compare is not None:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if len(compare(results, baseline, args.threshold)) > 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -72,7 +72,7 @@ def run_shor(eng, N, a, verbose=False):
 
         # and measure
         Measure | ctrl_qubit
-        eng.flush()
+        # int() flushes only what the measurement depends on (if needed)
         measurements[k] = int(ctrl_qubit)
         if measurements[k]:
             X | ctrl_qubit
@@ -1,7 +1,7 @@
 import projectq.setups.default
 from projectq.ops import H, X, Z, Rz, CNOT, Measure
 from projectq import MainEngine
-from projectq.meta import Dagger, Control
+from projectq.meta import Dagger, ClassicalControl
 
 
 def create_bell_pair(eng):
@@ -59,15 +59,15 @@ def run_teleport(eng, state_creation_function, verbose=False):
     # measure two values (once in Hadamard basis) and send the bits to Bob
     H | psi
     Measure | (psi, b1)
-    msg_to_bob = [int(psi), int(b1)]
     if verbose:
+        msg_to_bob = [int(psi), int(b1)]
         print("Alice is sending the message {} to Bob.".format(msg_to_bob))
 
     # Bob may have to apply up to two operation depending on the message sent
-    # by Alice:
-    with Control(eng, b1):
+    # by Alice (the back-end evaluates the conditions, if it supports it):
+    with ClassicalControl(eng, b1):
         X | b2
-    with Control(eng, psi):
+    with ClassicalControl(eng, psi):
         Z | b2
 
     # try to uncompute the psi state
@@ -27,4 +27,12 @@ Get started:
 """
 
 from ._version import __version__
-from projectq.cengines import MainEngine
+from ._lazy import lazy_import as _lazy_import
+
+# the subpackages (and MainEngine) are imported once they are accessed
+__getattr__, __dir__ = _lazy_import(globals(), {"MainEngine": ".cengines",
+                                                "backends": ".backends",
+                                                "cengines": ".cengines",
+                                                "meta": ".meta",
+                                                "ops": ".ops",
+                                                "types": ".types"})
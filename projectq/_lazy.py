@@ -0,0 +1,76 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the tools to import the attributes of a package lazily, i.e., only
+once they are accessed (using module-level __getattr__, see PEP 562).
+
+Example:
+    .. code-block:: python
+
+        # in the __init__.py of a package
+        _LAZY_ATTRIBUTES = {"Simulator": "._sim", "_sim": "._sim"}
+        __getattr__, __dir__ = lazy_import(globals(), _LAZY_ATTRIBUTES)
+"""
+
+import importlib
+import sys
+
+
+def _resolve(package, name, module_name):
+    """
+    Import the module module_name (relative to package) and return its
+    attribute name, or the module itself if it is the submodule name.
+    """
+    module = importlib.import_module(module_name, package)
+    if module_name.lstrip(".") == name:
+        return module
+    return getattr(module, name)
+
+
+def lazy_import(module_globals, attributes):
+    """
+    Make the attributes of a module load on first access.
+
+    On Python versions without module-level __getattr__ (< 3.7), all
+    attributes are imported right away.
+
+    Args:
+        module_globals (dict): Global variables of the module (globals()).
+        attributes (dict): Maps the name of each lazy attribute to the module
+            (relative to the package) which defines it. If the name equals
+            the module name, the module itself is the attribute.
+
+    Returns:
+        A tuple of the functions __getattr__ and __dir__ of the module.
+    """
+    package = module_globals["__name__"]
+
+    def __getattr__(name):
+        try:
+            module_name = attributes[name]
+        except KeyError:
+            raise AttributeError("module {!r} has no attribute {!r}"
+                                 .format(package, name))
+        value = _resolve(package, name, module_name)
+        module_globals[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(module_globals) | set(attributes))
+
+    if sys.version_info < (3, 7):  # pragma: no cover
+        for name in attributes:
+            __getattr__(name)
+    return __getattr__, __dir__
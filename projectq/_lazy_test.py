@@ -0,0 +1,34 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq._lazy.py."""
+
+import pytest
+
+from projectq import _lazy
+
+
+def test_lazy_import():
+    module_globals = {"__name__": "projectq.backends", "x": 1}
+    __getattr__, __dir__ = _lazy.lazy_import(
+        module_globals, {"ResourceCounter": "._resource",
+                         "_resource": "._resource"})
+    assert __dir__() == ["ResourceCounter", "__name__", "_resource", "x"]
+    from projectq.backends import _resource
+    assert __getattr__("_resource") is _resource
+    assert __getattr__("ResourceCounter") is _resource.ResourceCounter
+    # the attributes are cached in the module
+    assert module_globals["ResourceCounter"] is _resource.ResourceCounter
+    with pytest.raises(AttributeError):
+        __getattr__("Simulator")
@@ -21,12 +21,34 @@ This includes:
 * a circuit drawing engine (which can be used anywhere within the compilation
   chain)
 * a simulator with emulation capabilities
+* a batched simulator, which simulates many structurally identical circuits
+  at once (BatchedSimulator)
+* a simulator which computes the unitary of a circuit (UnitarySimulator)
+* a simulator which stores only the nonzero amplitudes of sparse states
+  (SparseSimulator)
+* a stabilizer simulator for Clifford circuits on many qubits
+  (StabilizerSimulator)
 * a resource counter (counts gates and keeps track of the maximal width of the
   circuit)
 * an interface to the IBM Quantum Experience chip (and simulator).
+* a wrapper which runs a back-end in a worker thread (AsyncBackend)
+
+The back-ends are imported once they are accessed, such that, e.g., using
+the Simulator does not load the IBM backend and its HTTP client.
 """
-from ._printer import CommandPrinter
-from ._circuits import CircuitDrawer
-from ._sim import Simulator, ClassicalSimulator
-from ._resource import ResourceCounter
-from ._ibm import IBMBackend
+from projectq._lazy import lazy_import as _lazy_import
+
+_BACKENDS = {"CommandPrinter": "._printer",
+             "CircuitDrawer": "._circuits",
+             "Simulator": "._sim",
+             "ClassicalSimulator": "._sim",
+             "BatchedSimulator": "._sim",
+             "UnitarySimulator": "._sim",
+             "SparseSimulator": "._sim",
+             "StabilizerSimulator": "._sim",
+             "ResourceCounter": "._resource",
+             "IBMBackend": "._ibm",
+             "AsyncBackend": "._async"}
+
+__all__ = sorted(_BACKENDS)
+__getattr__, __dir__ = _lazy_import(globals(), _BACKENDS)
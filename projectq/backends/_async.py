@@ -0,0 +1,211 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the AsyncBackend, which runs another back-end in a worker thread
+such that the compilation of the following commands overlaps with their
+execution.
+"""
+import sys
+import threading
+
+try:
+    import queue
+except ImportError:  # pragma: no cover
+    import Queue as queue
+
+from projectq.cengines import BasicEngine
+from projectq.ops import FlushGate, MeasureGate
+
+
+def _is_finalizing():
+    """ Return True if the interpreter is shutting down. """
+    try:
+        return sys.is_finalizing()
+    except AttributeError:  # pragma: no cover
+        return False  # Python 2
+
+
+class AsyncBackend(BasicEngine):
+    """
+    AsyncBackend is a back-end which forwards all commands to another
+    back-end running in a worker thread.
+
+    The commands are passed to the worker thread through a bounded queue, so
+    the compiler engines can keep going while the back-end executes the
+    previous commands (e.g., while the C++ simulator, which releases the GIL,
+    applies gates). Measurement results behave like futures: Measuring does
+    not block, but converting a measured qubit to int or bool waits until
+    the result is available (see MainEngine.get_measurement_result). The
+    result of an earlier measurement of the qubit is discarded as soon as
+    the new measurement is queued.
+
+    A flush waits until the back-end has processed all commands and stops the
+    worker thread (which is restarted by the next command). Afterwards, the
+    attributes of the back-end (e.g., Simulator.get_amplitude) can be
+    accessed directly through the AsyncBackend.
+
+    Example:
+        .. code-block:: python
+
+            eng = MainEngine(backend=AsyncBackend(Simulator()))
+            qureg = eng.allocate_qureg(10)
+            ...
+            All(Measure) | qureg
+            ...  # further compilation
+            print(int(qureg[0]))  # waits for the measurement
+    """
+    def __init__(self, backend, queue_size=64):
+        """
+        Initialize an AsyncBackend.
+
+        Args:
+            backend (BasicEngine): Back-end which executes the commands.
+            queue_size (int): Maximal number of command lists which may be
+                waiting for the back-end. If the queue is full, sending
+                further commands blocks until the back-end has caught up.
+        """
+        BasicEngine.__init__(self)
+        self._backend = backend
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self._error = None
+
+    def __getattr__(self, name):
+        """
+        Access attributes of the back-end (after waiting for it to process all
+        commands).
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        self.wait()
+        return getattr(self._backend, name)
+
+    @property
+    def backend(self):
+        """ Back-end which executes the commands. """
+        return self._backend
+
+    def is_available(self, cmd):
+        """
+        Return whether the back-end can execute the command cmd.
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        self._connect_backend()
+        return self._backend.is_available(cmd)
+
+    def get_availability_key(self, cmd):
+        """
+        Return the availability key of the back-end (see
+        BasicEngine.get_availability_key).
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        self._connect_backend()
+        return self._backend.get_availability_key(cmd)
+
+    def is_meta_tag_handler(self, tag):
+        """ Return whether the back-end handles the meta tag tag. """
+        try:
+            return self._backend.is_meta_tag_handler(tag)
+        except AttributeError:
+            return False
+
+    def receive(self, command_list):
+        """
+        Pass the commands on to the worker thread. Blocks if the queue is
+        full and waits for the back-end to finish in case of a flush.
+
+        Args:
+            command_list (list<Command>): List of commands to execute.
+
+        Raises:
+            Exception: The first exception raised by the back-end (if any).
+        """
+        self._raise_error()
+        self._connect_backend()
+        if self._worker is None:
+            if _is_finalizing():
+                # no threads can be started while the interpreter shuts down
+                # (e.g., when a MainEngine is garbage-collected)
+                self._backend.receive(command_list)
+                return
+            self._worker = threading.Thread(target=self._run)
+            self._worker.daemon = True
+            self._worker.start()
+        flush = False
+        for cmd in command_list:
+            if isinstance(cmd.gate, MeasureGate):
+                # results of earlier measurements of the qubits are outdated
+                # (and must not be returned while the measurement is queued)
+                for qureg in cmd.qubits:
+                    for qubit in qureg:
+                        self.main_engine._measurements.pop(qubit.id, None)
+            elif isinstance(cmd.gate, FlushGate):
+                flush = True
+        self._queue.put(command_list)
+        if flush:
+            self._stop_worker()
+            self._raise_error()
+
+    def wait(self):
+        """
+        Wait until the back-end has processed all commands received so far.
+
+        Raises:
+            Exception: The first exception raised by the back-end (if any).
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def _stop_worker(self):
+        """
+        Wait for the back-end to process all queued commands and stop the
+        worker thread (it is restarted by the next call to receive). The
+        MainEngine flushes at exit, such that no commands are lost when the
+        interpreter shuts down the (daemon) worker thread.
+        """
+        self._queue.put(None)
+        self._worker.join()
+        self._worker = None
+
+    def _connect_backend(self):
+        """ Make the back-end the last engine of the pipeline. """
+        self._backend.main_engine = self.main_engine
+        self._backend.is_last_engine = True
+
+    def _raise_error(self):
+        """ Re-raise an exception of the back-end in the calling thread. """
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+    def _run(self):
+        """ Worker thread: Pass the queued commands on to the back-end. """
+        while True:
+            command_list = self._queue.get()
+            if command_list is None:
+                self._queue.task_done()
+                return
+            try:
+                if self._error is None:
+                    self._backend.receive(command_list)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,120 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.backends._async.py."""
+
+import time
+
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import Simulator
+from projectq.cengines import DummyEngine, NotYetMeasuredError
+from projectq.ops import All, CNOT, H, Measure, X
+
+from projectq.backends import _async
+
+
+class SlowBackend(DummyEngine):
+    """ Back-end which takes some time for each command list. """
+    def __init__(self, default_result=1):
+        DummyEngine.__init__(self, save_commands=True)
+        self._results = dict()
+        self._default_result = default_result
+
+    def receive(self, command_list):
+        time.sleep(0.01)
+        for cmd in command_list:
+            if cmd.gate == X:
+                qubit_id = cmd.qubits[0][0].id
+                self._results[qubit_id] = 1 - self._results.get(qubit_id, 0)
+            if cmd.gate == Measure:
+                for qubit in cmd.qubits[0]:
+                    self.main_engine.set_measurement_result(
+                        qubit, self._results.get(qubit.id,
+                                                 self._default_result))
+        DummyEngine.receive(self, command_list)
+
+
+def test_async_backend_simulator():
+    backend = _async.AsyncBackend(Simulator())
+    eng = MainEngine(backend=backend)
+    qureg = eng.allocate_qureg(3)
+    X | qureg[0]
+    for i in range(2):
+        CNOT | (qureg[i], qureg[i + 1])
+    H | qureg[0]
+    H | qureg[0]
+    All(Measure) | qureg
+    assert [int(qubit) for qubit in qureg] == [1, 1, 1]
+    eng.flush()
+    # attributes of the simulator are accessible through the AsyncBackend
+    assert backend.cheat()[0] == {0: 0, 1: 1, 2: 2}
+    assert isinstance(backend.backend, Simulator)
+
+
+def test_async_backend_waits_for_measurement():
+    slow_backend = SlowBackend()
+    eng = MainEngine(backend=_async.AsyncBackend(slow_backend),
+                     engine_list=[])
+    qureg = eng.allocate_qureg(5)
+    Measure | qureg[4]
+    # the back-end has not processed all commands yet
+    assert len(slow_backend.received_commands) < 6
+    assert int(qureg[4]) == 1
+    assert len(slow_backend.received_commands) == 6
+    with pytest.raises(NotYetMeasuredError):
+        int(qureg[0])
+    eng.flush()
+    assert slow_backend.received_commands[-1].gate != Measure
+
+
+def test_async_backend_repeated_measurement():
+    backend = _async.AsyncBackend(SlowBackend(default_result=0))
+    eng = MainEngine(backend=backend, engine_list=[])
+    qubit = eng.allocate_qubit()
+    X | qubit
+    Measure | qubit
+    assert int(qubit) == 1
+    X | qubit
+    Measure | qubit
+    # the result of the first measurement is outdated
+    assert int(qubit) == 0
+    eng.flush()
+    # the worker thread is stopped by a flush and restarted afterwards
+    assert backend._worker is None
+    X | qubit
+    Measure | qubit
+    assert int(qubit) == 1
+    assert backend._worker.is_alive()
+    eng.flush()
+    assert backend._worker is None
+
+
+def test_async_backend_raises_backend_errors():
+    class FailingBackend(DummyEngine):
+        failed = False
+
+        def receive(self, command_list):
+            if not self.failed:
+                self.failed = True
+                raise RuntimeError("Backend failure")
+
+    eng = MainEngine(backend=_async.AsyncBackend(FailingBackend()),
+                     engine_list=[])
+    qubit = eng.allocate_qubit()
+    with pytest.raises(RuntimeError):
+        eng.flush()
+    with pytest.raises(AttributeError):
+        eng.backend._nonexistent_attribute
@@ -22,7 +22,9 @@ from builtins import input
 
 from projectq.cengines import LastEngineException, BasicEngine
 from projectq.ops import FlushGate, Measure, Allocate, Deallocate
-from projectq.meta import get_control_count
+from projectq.meta import (get_control_count,
+                           get_classical_control_tags,
+                           ClassicalControlTag)
 from projectq.backends._circuits import to_latex
 
 
@@ -170,6 +172,17 @@ class CircuitDrawer(BasicEngine):
         except LastEngineException:
             return True
 
+    def is_meta_tag_handler(self, tag):
+        """
+        Return True for ClassicalControlTag if the CircuitDrawer is the last
+        engine: Classically controlled gates are drawn as if they were
+        controlled by the measured qubits.
+
+        Args:
+            tag: Meta tag class for which to check support.
+        """
+        return self.is_last_engine and tag == ClassicalControlTag
+
     def set_qubit_locations(self, id_to_loc):
         """
         Sets the qubit lines to use for the qubits explicitly.
@@ -235,11 +248,14 @@ class CircuitDrawer(BasicEngine):
                     m = int(m)
                     self.main_engine.set_measurement_result(qubit, m)
 
-        all_lines = [qb.id for qr in cmd.all_qubits for qb in qr]
-
         gate = cmd.gate
         lines = [qb.id for qr in cmd.qubits for qb in qr]
         ctrl_lines = [qb.id for qb in cmd.control_qubits]
+        # draw the measured qubits of classically controlled gates as controls
+        for tag in get_classical_control_tags(cmd):
+            ctrl_lines += [qubit_id for qubit_id in tag.qubit_ids
+                           if qubit_id not in ctrl_lines]
+        all_lines = ctrl_lines + lines
         item = CircuitItem(gate, lines, ctrl_lines)
         for l in all_lines:
             self._qubit_lines[l].append(item)
@@ -288,6 +304,6 @@ class CircuitDrawer(BasicEngine):
         for cmd in command_list:
             if not cmd.gate == FlushGate():
                 self._print_cmd(cmd)
-            # (try to) send on
-            if not self.is_last_engine:
-                self.send([cmd])
+        # (try to) send on
+        if not self.is_last_engine:
+            self.send(command_list)
@@ -24,7 +24,7 @@ from projectq.ops import (H,
                           X,
                           CNOT,
                           Measure)
-from projectq.meta import Control
+from projectq.meta import Control, ClassicalControl, ClassicalControlTag
 
 import projectq.backends._circuits._drawer as _drawer
 from projectq.backends._circuits._drawer import CircuitItem, CircuitDrawer
@@ -85,6 +85,25 @@ def test_drawer_measurement():
     _drawer.input = old_input
 
 
+def test_drawer_classical_control():
+    drawer = CircuitDrawer(default_measure=0)
+    assert not drawer.is_meta_tag_handler(ClassicalControlTag)
+    eng = MainEngine(drawer, [])
+    assert drawer.is_meta_tag_handler(ClassicalControlTag)
+    qureg = eng.allocate_qureg(3)
+    Measure | qureg[0]
+    with Control(eng, qureg[1]):
+        with ClassicalControl(eng, qureg[:2]):
+            X | qureg[2]
+    item = drawer._qubit_lines[2][-1]
+    assert item.gate == X
+    assert item.lines == [2]
+    assert sorted(item.ctrl_lines) == [0, 1]
+    assert drawer._qubit_lines[0][-1] is item
+    assert drawer._qubit_lines[1][-1] is item
+    assert len(drawer._qubit_lines[1]) == 2
+
+
 def test_drawer_qubitmapping():
     drawer = CircuitDrawer()
     # mapping should still work (no gate has been applied yet)
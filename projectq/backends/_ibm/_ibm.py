@@ -30,9 +30,33 @@ from projectq.ops import (NOT,
                           Measure,
                           Allocate,
                           Deallocate,
-                          FlushGate)
+                          FlushGate,
+                          HGate,
+                          XGate,
+                          YGate,
+                          ZGate,
+                          SGate,
+                          TGate,
+                          MeasureGate,
+                          AllocateQubitGate,
+                          DeallocateQubitGate)
+
+
+def send(*args, **kwargs):
+    """
+    Send a QASM experiment to the IBM Quantum Experience (see
+    _ibm_http_client.send). The HTTP client (and requests) is imported on
+    first use.
+    """
+    from ._ibm_http_client import send as send_http
+    return send_http(*args, **kwargs)
+
 
-from ._ibm_http_client import send
+# gate classes for which the class (and the number of control qubits)
+# determines whether the gate is available
+_GATE_CLASSES_WITH_FIXED_AVAILABILITY = frozenset([
+    HGate, XGate, YGate, ZGate, SGate, TGate, MeasureGate, AllocateQubitGate,
+    DeallocateQubitGate])
 
 
 class IBMBackend(BasicEngine):
@@ -93,6 +117,20 @@ class IBMBackend(BasicEngine):
             return True
         return False
 
+    def get_availability_key(self, cmd):
+        """
+        Return the gate class and the number of control qubits as
+        availability key if they determine whether the command can be
+        executed (see BasicEngine.get_availability_key).
+
+        Args:
+            cmd (Command): Command for which to check availability
+        """
+        gate_class = type(cmd.gate)
+        if gate_class in _GATE_CLASSES_WITH_FIXED_AVAILABILITY:
+            return (gate_class, get_control_count(cmd))
+        return None
+
     def _reset(self):
         """ Reset all temporary variables (after flush gate). """
         self._clear = True
@@ -63,6 +63,20 @@ def test_ibm_backend_is_available_control_not(num_ctrl_qubits, is_available):
     assert ibm_backend.is_available(cmd) == is_available
 
 
+def test_ibm_backend_availability_key():
+    eng = MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
+    qubit1 = eng.allocate_qubit()
+    qureg = eng.allocate_qureg(2)
+    ibm_backend = _ibm.IBMBackend()
+    cmd = Command(eng, NOT, (qubit1,), controls=qureg)
+    assert ibm_backend.get_availability_key(cmd) == (type(NOT), 2)
+    # the result for daggered or parametrized gates is not cached
+    assert ibm_backend.get_availability_key(
+        Command(eng, Tdag, (qubit1,))) is None
+    assert ibm_backend.get_availability_key(
+        Command(eng, Rx(0.5), (qubit1,))) is None
+
+
 def test_ibm_backend_init():
     backend = _ibm.IBMBackend(verbose=True, use_hardware=True)
     assert backend.qasm == ""
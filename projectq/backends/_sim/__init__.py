@@ -14,3 +14,7 @@
 
 from ._simulator import Simulator
 from ._classical_simulator import ClassicalSimulator
+from ._batched_simulator import BatchedSimulator
+from ._unitary_simulator import UnitarySimulator
+from ._sparse_simulator import SparseSimulator
+from ._stabilizer_simulator import StabilizerSimulator
@@ -0,0 +1,475 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the BatchedSimulator, which simulates a batch of structurally
+identical circuits (e.g., a circuit for many values of its parameters) on a
+batch of state vectors at once.
+"""
+
+import numpy as np
+
+from projectq.cengines import BasicEngine
+from projectq.ops import (FlushGate,
+                          MeasureGate,
+                          AllocateQubitGate,
+                          DeallocateQubitGate,
+                          BasicMathGate,
+                          TimeEvolution,
+                          Ph,
+                          R,
+                          Rx,
+                          Ry,
+                          Rz)
+
+# gates acting on at most this many qubits are applied as a matrix
+_MAX_GATE_QUBITS = 5
+# gates acting on at most this many qubits are applied slice by slice
+_MAX_SLICED_GATE_QUBITS = 2
+
+_PAULI_MATRICES = {'X': np.array([[0., 1.], [1., 0.]], dtype=complex),
+                   'Y': np.array([[0., -1j], [1j, 0.]], dtype=complex),
+                   'Z': np.array([[1., 0.], [0., -1.]], dtype=complex)}
+
+
+def _get_rotation_matrices(gate_class, angles):
+    """
+    Return the matrices of rotation or phase gates of the given class for an
+    array of angles (or None if the class is not Rx, Ry, Rz, R or Ph).
+
+    Returns:
+        Array of shape (len(angles), 2, 2).
+    """
+    matrices = np.zeros((len(angles), 2, 2), dtype=complex)
+    if gate_class in (Rx, Ry):
+        cos = np.cos(.5 * angles)
+        sin = np.sin(.5 * angles)
+        matrices[:, 0, 0] = cos
+        matrices[:, 1, 1] = cos
+        if gate_class is Rx:
+            matrices[:, 0, 1] = -1j * sin
+            matrices[:, 1, 0] = -1j * sin
+        else:
+            matrices[:, 0, 1] = -sin
+            matrices[:, 1, 0] = sin
+    elif gate_class is Rz:
+        matrices[:, 0, 0] = np.exp(-.5j * angles)
+        matrices[:, 1, 1] = np.exp(.5j * angles)
+    elif gate_class is R:
+        matrices[:, 0, 0] = 1.
+        matrices[:, 1, 1] = np.exp(1j * angles)
+    elif gate_class is Ph:
+        matrices[:, 0, 0] = np.exp(1j * angles)
+        matrices[:, 1, 1] = np.exp(1j * angles)
+    else:
+        return None
+    return matrices
+
+
+def _get_time_evolution_matrices(gate, num_qubits, times):
+    """
+    Return the matrix of a TimeEvolution gate acting on num_qubits qubits for
+    each time in times (or for its own time if times is None).
+
+    Returns:
+        Array of shape (len(times), d, d), or (d, d) if times is None.
+    """
+    hamiltonian = np.zeros((1 << num_qubits, 1 << num_qubits), dtype=complex)
+    for term, coeff in gate.hamiltonian.terms.items():
+        factors = [np.identity(2, dtype=complex)] * num_qubits
+        for index, action in term:
+            factors[index] = _PAULI_MATRICES[action]
+        # bit i of the matrix index corresponds to qubit i
+        matrix = np.ones((1, 1), dtype=complex)
+        for factor in reversed(factors):
+            matrix = np.kron(matrix, factor)
+        hamiltonian += coeff * matrix
+    eigenvalues, eigenvectors = np.linalg.eigh(hamiltonian)
+    if times is None:
+        return (eigenvectors * np.exp(-1j * gate.time * eigenvalues)).dot(
+            eigenvectors.conj().T)
+    phases = np.exp(-1j * np.outer(times, eigenvalues))
+    return np.matmul(eigenvectors[np.newaxis] * phases[:, np.newaxis, :],
+                     eigenvectors.conj().T[np.newaxis])
+
+
+class BatchedSimulator(BasicEngine):
+    """
+    BatchedSimulator is a backend which simulates a batch of structurally
+    identical circuits at once: All circuits consist of the same commands,
+    but the symbolic parameters (see Parameter) of the gates may take
+    different values in each circuit (see bind).
+
+    The state vectors of the batch are stored in a single NumPy array, such
+    that every gate is applied to all of them by one vectorized operation.
+    Parameter sweeps and Monte Carlo studies of small circuits thus avoid
+    the per-gate overhead of running one MainEngine and Simulator per
+    circuit.
+
+    Measurement outcomes differ between the circuits of the batch and are
+    therefore not reported to the MainEngine; use get_measurement_results
+    instead.
+
+    Example:
+        .. code-block:: python
+
+            sim = BatchedSimulator(100)
+            eng = MainEngine(sim, default_engines())
+            qureg = eng.allocate_qureg(2)
+            sim.bind({"theta": numpy.linspace(0., numpy.pi, 100)})
+            Ry(Parameter("theta")) | qureg[0]
+            CNOT | (qureg[0], qureg[1])
+            eng.flush()
+            values = sim.get_expectation_value(QubitOperator("Z0 Z1"),
+                                               qureg)  # 100 values
+    """
+    def __init__(self, batch_size, rnd_seed=None):
+        """
+        Initialize the BatchedSimulator.
+
+        Args:
+            batch_size (int): Number of circuits (state vectors) in the
+                batch.
+            rnd_seed (int): Random seed for the measurements and sampling.
+        """
+        BasicEngine.__init__(self)
+        self.batch_size = batch_size
+        self._random = np.random.RandomState(rnd_seed)
+        # tensor of shape (batch_size, 2, ..., 2), one axis per qubit
+        self._state = np.ones((batch_size,), dtype=complex)
+        self._axes = dict()
+        self._parameter_values = dict()
+        self._measurement_results = dict()
+
+    def bind(self, values):
+        """
+        Set the values of the symbolic parameters (see Parameter) of all
+        gates which are executed from now on.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values,
+                either one value per circuit of the batch or a single value
+                for all circuits.
+
+        Raises:
+            ValueError: If the number of values does not match the batch
+                size.
+        """
+        for name, value in values.items():
+            self._parameter_values[name] = np.broadcast_to(
+                np.asarray(value, dtype=float), (self.batch_size,))
+
+    def is_available(self, cmd):
+        """
+        Return True if the command can be simulated: allocation,
+        deallocation, measurement, TimeEvolution and gates with a matrix,
+        acting on at most 5 qubits each (with arbitrary controls).
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        gate = cmd.gate
+        if isinstance(gate, (MeasureGate, AllocateQubitGate,
+                             DeallocateQubitGate, FlushGate)):
+            return True
+        num_qubits = sum(len(qureg) for qureg in cmd.qubits)
+        if num_qubits > _MAX_GATE_QUBITS or isinstance(gate, BasicMathGate):
+            return False
+        if isinstance(gate, TimeEvolution):
+            return True
+        if len(gate.parameters) > 0:
+            gate = gate.bind(dict.fromkeys(gate.parameters, 0.))
+        try:
+            return len(gate.matrix) == 1 << num_qubits
+        except AttributeError:
+            return False
+
+    def cheat(self):
+        """
+        Return the ordering of the qubits and the state vectors.
+
+        Returns:
+            A tuple where the first entry is a dictionary mapping qubit ids
+            to bit-locations and the second entry is an array of shape
+            (batch_size, 2 ** num_qubits) containing the state vectors.
+        """
+        num_qubits = len(self._axes)
+        order = [0] + list(range(num_qubits, 0, -1))
+        return (dict((qubit_id, axis - 1)
+                     for qubit_id, axis in self._axes.items()),
+                self._state.transpose(order).reshape(self.batch_size, -1))
+
+    def get_measurement_results(self, qureg):
+        """
+        Return the latest measurement results of the qubits.
+
+        Args:
+            qureg (list<Qubit>): Measured qubits.
+
+        Returns:
+            Boolean array of shape (batch_size, len(qureg)).
+
+        Raises:
+            RuntimeError: If a qubit has not been measured.
+        """
+        try:
+            return np.array([self._measurement_results[qubit.id]
+                             for qubit in qureg]).T.reshape(
+                                 self.batch_size, len(qureg))
+        except KeyError:
+            raise RuntimeError("BatchedSimulator: Qubit has not been "
+                               "measured (call eng.flush() first).")
+
+    def get_probabilities(self, qureg):
+        """
+        Return the probabilities of all outcomes when measuring qureg.
+
+        Args:
+            qureg (list<Qubit>): Qubits to measure, where bit i of an outcome
+                corresponds to qureg[i].
+
+        Returns:
+            Array of shape (batch_size, 2 ** len(qureg)).
+        """
+        axes = [self._get_axis(qubit.id) for qubit in qureg]
+        others = tuple(axis for axis in range(1, self._state.ndim)
+                       if axis not in axes)
+        probabilities = np.sum(np.abs(self._state) ** 2, axis=others)
+        # the remaining axes are in increasing order, reorder them such that
+        # qureg[0] is the last axis (i.e., the least significant bit)
+        remaining = sorted(axes)
+        order = [0] + [1 + remaining.index(axis) for axis in reversed(axes)]
+        return probabilities.transpose(order).reshape(self.batch_size, -1)
+
+    def sample(self, qureg, shots):
+        """
+        Sample measurement outcomes of qureg (without collapsing the state).
+
+        Args:
+            qureg (list<Qubit>): Qubits to measure, where bit i of an outcome
+                corresponds to qureg[i].
+            shots (int): Number of samples per circuit of the batch.
+
+        Returns:
+            Integer array of shape (batch_size, shots).
+        """
+        cdf = np.cumsum(self.get_probabilities(qureg), axis=1)
+        rand = self._random.random_sample((self.batch_size, shots))
+        samples = np.array([np.searchsorted(cdf[i], rand[i] * cdf[i, -1],
+                                            side="right")
+                            for i in range(self.batch_size)])
+        return np.minimum(samples, cdf.shape[1] - 1)
+
+    def get_expectation_value(self, qubit_operator, qureg):
+        """
+        Return the expectation values of a qubit operator.
+
+        Args:
+            qubit_operator (projectq.ops.QubitOperator): Operator to measure.
+            qureg (list<Qubit>): Qubits the operator acts on.
+
+        Returns:
+            Array of the batch_size expectation values.
+
+        Raises:
+            Exception: If `qubit_operator` acts on more qubits than present in
+                the `qureg` argument.
+        """
+        num_qubits = len(qureg)
+        axes = tuple(range(1, self._state.ndim))
+        expectation = np.zeros(self.batch_size)
+        for term, coeff in qubit_operator.terms.items():
+            if not term == () and term[-1][0] >= num_qubits:
+                raise Exception("qubit_operator acts on more qubits than "
+                                "contained in the qureg.")
+            state = self._state
+            for index, action in term:
+                state = self._apply_pauli(state, self._get_axis(
+                    qureg[index].id), action)
+            overlap = np.sum(self._state.conj() * state, axis=axes)
+            expectation += (coeff * overlap).real
+        return expectation
+
+    @staticmethod
+    def _apply_pauli(state, axis, action):
+        """ Return the state with a Pauli operator applied to an axis. """
+        shape = [1] * state.ndim
+        shape[axis] = 2
+        if action == 'Z':
+            return state * np.array([1., -1.]).reshape(shape)
+        state = np.flip(state, axis)
+        if action == 'Y':
+            state = state * np.array([-1j, 1j]).reshape(shape)
+        return state
+
+    def _get_axis(self, qubit_id):
+        try:
+            return self._axes[qubit_id]
+        except KeyError:
+            raise RuntimeError("BatchedSimulator: Unknown qubit id {} (call "
+                               "eng.flush() first).".format(qubit_id))
+
+    def _get_probability_of_one(self, axis):
+        one = np.take(self._state, 1, axis=axis)
+        return np.sum(np.abs(one.reshape(self.batch_size, -1)) ** 2, axis=1)
+
+    def _allocate(self, qubit_id):
+        state = np.zeros(self._state.shape + (2,), dtype=complex)
+        state[..., 0] = self._state
+        self._state = state
+        self._axes[qubit_id] = state.ndim - 1
+
+    def _deallocate(self, qubit_id):
+        axis = self._get_axis(qubit_id)
+        probability = self._get_probability_of_one(axis)
+        is_one = probability > .5
+        if np.any(np.abs(probability - is_one) > 1.e-12):
+            raise RuntimeError("BatchedSimulator: Qubit has not been "
+                               "measured / uncomputed! There is most likely "
+                               "a bug in your code.")
+        condition = is_one.reshape((-1,) + (1,) * (self._state.ndim - 2))
+        self._state = np.where(condition, np.take(self._state, 1, axis=axis),
+                               np.take(self._state, 0, axis=axis))
+        del self._axes[qubit_id]
+        for other_id, other_axis in self._axes.items():
+            if other_axis > axis:
+                self._axes[other_id] = other_axis - 1
+        self._measurement_results.pop(qubit_id, None)
+
+    def _measure(self, qubit_id):
+        axis = self._get_axis(qubit_id)
+        probability = self._get_probability_of_one(axis)
+        outcomes = self._random.random_sample(self.batch_size) < probability
+        norm = np.sqrt(np.where(outcomes, probability, 1. - probability))
+        shape = (-1,) + (1,) * (self._state.ndim - 2)
+        zero = np.take(self._state, 0, axis=axis)
+        one = np.take(self._state, 1, axis=axis)
+        condition = outcomes.reshape(shape)
+        norm = norm.reshape(shape)
+        self._state = np.stack([np.where(condition, 0., zero / norm),
+                                np.where(condition, one / norm, 0.)],
+                               axis=axis)
+        self._measurement_results[qubit_id] = outcomes
+
+    def _get_matrices(self, gate, num_qubits):
+        """
+        Return the matrix of a gate acting on num_qubits qubits, or an array
+        of one matrix per circuit of the batch if the gate has symbolic
+        parameters.
+        """
+        if len(gate.parameters) == 0:
+            if isinstance(gate, TimeEvolution):
+                return _get_time_evolution_matrices(gate, num_qubits, None)
+            return np.asarray(gate.matrix)
+        if isinstance(gate, TimeEvolution):
+            return _get_time_evolution_matrices(
+                gate, num_qubits, gate.time.evaluate(self._parameter_values))
+        if hasattr(gate, "_angle"):
+            matrices = _get_rotation_matrices(
+                type(gate), gate._angle.evaluate(self._parameter_values))
+            if matrices is not None:
+                return matrices
+        # other parametrized gates: bind them for each circuit
+        values = dict((name, self._parameter_values.get(name))
+                      for name in gate.parameters)
+        return np.array([gate.bind(dict(
+            (name, value[i]) for name, value in values.items()
+            if value is not None)).matrix for i in range(self.batch_size)])
+
+    def _apply_gate(self, matrices, target_ids, control_ids):
+        """
+        Apply a matrix (or one matrix per circuit, see _get_matrices) to the
+        target qubits, where bit i of the matrix index is target i.
+        """
+        index = [slice(None)] * self._state.ndim
+        control_axes = [self._get_axis(qubit_id) for qubit_id in control_ids]
+        for axis in control_axes:
+            index[axis] = 1
+        index = tuple(index)
+        state = self._state[index]
+        # axes of the targets after removing the control axes
+        axes = [axis - sum(1 for ctrl in control_axes if ctrl < axis)
+                for axis in (self._get_axis(qubit_id)
+                             for qubit_id in target_ids)]
+        if len(axes) <= _MAX_SLICED_GATE_QUBITS:
+            self._state[index] = self._apply_sliced(matrices, state, axes)
+            return
+        # move the targets to the end (in reverse order, such that target 0
+        # becomes the last axis) and multiply by the matrix
+        axes = axes[::-1]
+        num_targets = len(axes)
+        state = np.moveaxis(state, axes, range(-num_targets, 0))
+        shape = state.shape
+        state = state.reshape(self.batch_size, -1, 1 << num_targets)
+        if matrices.ndim == 3:
+            state = np.matmul(state, matrices.transpose(0, 2, 1))
+        else:
+            state = state.dot(matrices.T)
+        self._state[index] = np.moveaxis(state.reshape(shape),
+                                         range(-num_targets, 0), axes)
+
+    def _apply_sliced(self, matrices, state, axes):
+        """
+        Return the state after applying the matrix to the given axes, summing
+        over the slices of the state (which avoids copying it for small
+        matrices).
+        """
+        nonzero = np.any(matrices != 0, axis=0 if matrices.ndim == 3
+                         else ())
+        if matrices.ndim == 3:
+            # broadcast the matrix elements of each circuit over its state
+            matrices = np.moveaxis(matrices.reshape(
+                matrices.shape + (1,) * (state.ndim - 1 - len(axes))), 0, 2)
+        slices = []
+        for value in range(1 << len(axes)):
+            index = [slice(None)] * state.ndim
+            for i, axis in enumerate(axes):
+                index[axis] = (value >> i) & 1
+            slices.append(tuple(index))
+        result = np.zeros_like(state)
+        for row, row_index in enumerate(slices):
+            for col, col_index in enumerate(slices):
+                if nonzero[row, col]:
+                    result[row_index] += matrices[row, col] * state[col_index]
+        return result
+
+    def _handle(self, cmd):
+        gate = cmd.gate
+        if isinstance(gate, FlushGate):
+            return
+        if isinstance(gate, AllocateQubitGate):
+            self._allocate(cmd.qubits[0][0].id)
+        elif isinstance(gate, DeallocateQubitGate):
+            self._deallocate(cmd.qubits[0][0].id)
+        elif isinstance(gate, MeasureGate):
+            for qureg in cmd.qubits:
+                for qubit in qureg:
+                    self._measure(qubit.id)
+        else:
+            target_ids = [qubit.id for qureg in cmd.qubits for qubit in qureg]
+            self._apply_gate(self._get_matrices(gate, len(target_ids)),
+                             target_ids,
+                             [qubit.id for qubit in cmd.control_qubits])
+
+    def receive(self, command_list):
+        """
+        Simulate the commands on all circuits of the batch.
+
+        Args:
+            command_list (list<Command>): List of commands to execute.
+        """
+        for cmd in command_list:
+            self._handle(cmd)
+        if not self.is_last_engine:
+            self.send(command_list)
@@ -0,0 +1,188 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.backends._sim._batched_simulator.py."""
+
+import numpy
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import BatchedSimulator, Simulator
+from projectq.meta import Control
+from projectq.ops import (All, BasicMathGate, CNOT, Command, Deallocate, H,
+                          Measure, Parameter, Ph, QubitOperator, R, Rx, Ry,
+                          Rz, Swap, TimeEvolution, Toffoli, X)
+from projectq.setups.default import default_engines
+
+
+def _circuit(eng, qureg, theta, phi):
+    All(H) | qureg
+    Rx(theta) | qureg[0]
+    Ry(2 * phi + 0.1) | qureg[1]
+    CNOT | (qureg[0], qureg[2])
+    with Control(eng, qureg[0]):
+        Rz(theta - phi) | qureg[1]
+        R(phi) | qureg[2]
+    with Control(eng, qureg[1:]):
+        Ph(theta) | qureg[0]
+    Swap | (qureg[0], qureg[2])
+    TimeEvolution(phi, QubitOperator("X0 Y2", 0.3) +
+                  QubitOperator("Z1", -0.7)) | qureg
+    with Control(eng, qureg[2]):
+        TimeEvolution(0.4, QubitOperator("Y0", 0.4)) | qureg[:2]
+    Toffoli | (qureg[1], qureg[2], qureg[0])
+
+
+def _get_amplitudes(mapping, state, qureg):
+    amplitudes = []
+    for value in range(1 << len(qureg)):
+        index = sum(((value >> i) & 1) << mapping[qubit.id]
+                    for i, qubit in enumerate(qureg))
+        amplitudes.append(state[..., index])
+    return numpy.array(amplitudes).T
+
+
+@pytest.mark.parametrize("engine_list", [[], default_engines()])
+def test_batched_simulator_parameter_sweep(engine_list):
+    thetas = numpy.array([0.1, -1.2, 2.5, 0.])
+    phis = numpy.array([0.7, 0.3, -2., 1.])
+    sim = BatchedSimulator(4)
+    eng = MainEngine(sim, engine_list)
+    qureg = eng.allocate_qureg(3)
+    sim.bind({"theta": thetas, "phi": phis})
+    _circuit(eng, qureg, Parameter("theta"), Parameter("phi"))
+    eng.flush()
+    mapping, states = sim.cheat()
+    assert states.shape == (4, 8)
+    amplitudes = _get_amplitudes(mapping, states, qureg)
+    operator = QubitOperator("Z0 X1", 0.8) + QubitOperator("Y2", -0.3)
+    expectation = sim.get_expectation_value(operator, qureg)
+    probabilities = sim.get_probabilities(qureg[::-1])
+    for i in range(4):
+        ref_eng = MainEngine(Simulator(), [])
+        ref_qureg = ref_eng.allocate_qureg(3)
+        _circuit(ref_eng, ref_qureg, thetas[i], phis[i])
+        ref_eng.flush()
+        ref_mapping, ref_state = ref_eng.backend.cheat()
+        expected = _get_amplitudes(ref_mapping, numpy.array(ref_state),
+                                   ref_qureg)
+        assert numpy.allclose(amplitudes[i], expected)
+        assert expectation[i] == pytest.approx(
+            ref_eng.backend.get_expectation_value(operator, ref_qureg))
+        assert numpy.allclose(probabilities[i], [
+            ref_eng.backend.get_probability([int(bit) for bit in
+                                             format(value, "03b")],
+                                            ref_qureg)
+            for value in range(8)])
+        All(Measure) | ref_qureg
+    All(Measure) | qureg
+
+
+def test_batched_simulator_measure():
+    sim = BatchedSimulator(3, rnd_seed=5)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    with pytest.raises(RuntimeError):
+        sim.get_measurement_results(qureg)
+    sim.bind({"theta": [0., numpy.pi, numpy.pi]})
+    Rx(Parameter("theta")) | qureg[1]
+    X | qureg[0]
+    All(Measure) | qureg
+    eng.flush()
+    results = sim.get_measurement_results(qureg)
+    assert results.tolist() == [[True, False], [True, True], [True, True]]
+    # the measured qubits can be deallocated
+    del qureg
+    eng.flush()
+    assert sim.cheat()[1].shape == (3, 1)
+
+
+def test_batched_simulator_measurement_collapse():
+    sim = BatchedSimulator(200, rnd_seed=2)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    Measure | qureg[0]
+    eng.flush()
+    result = sim.get_measurement_results(qureg[:1])[:, 0]
+    assert 0 < numpy.sum(result) < 200
+    assert numpy.allclose(sim.get_probabilities(qureg)[:, 3], result)
+    Measure | qureg[1]
+    eng.flush()
+    assert numpy.all(sim.get_measurement_results(qureg)[:, 1] == result)
+
+
+def test_batched_simulator_deallocate_superposition():
+    sim = BatchedSimulator(2)
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    H | qubit
+    eng.flush()
+    with pytest.raises(RuntimeError):
+        sim.receive([Command(eng, Deallocate, ([qubit[0]],))])
+    Measure | qubit
+
+
+def test_batched_simulator_sample():
+    sim = BatchedSimulator(3, rnd_seed=1)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    sim.bind({"theta": [0., numpy.pi, .5 * numpy.pi]})
+    Ry(Parameter("theta")) | qureg[1]
+    eng.flush()
+    samples = sim.sample(qureg, 1000)
+    assert samples.shape == (3, 1000)
+    assert numpy.all(samples[0] == 0)
+    assert numpy.all(samples[1] == 2)
+    assert set(samples[2]) == set([0, 2])
+    assert abs(numpy.mean(samples[2] == 2) - .5) < .1
+    All(Measure) | qureg
+
+
+def test_batched_simulator_is_available():
+    sim = BatchedSimulator(2)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(6)
+
+    class MyMathGate(BasicMathGate):
+        def __init__(self):
+            BasicMathGate.__init__(self, lambda x: (x + 1,))
+
+    assert sim.is_available(Command(eng, Rx(Parameter("a")), ([qureg[0]],)))
+    assert sim.is_available(Command(eng, Measure, ([qureg[0]],)))
+    assert sim.is_available(Command(eng, TimeEvolution(
+        1., QubitOperator("X0 X1")), (qureg[:2],)))
+    assert not sim.is_available(Command(eng, MyMathGate(), (qureg[:2],)))
+    assert not sim.is_available(Command(eng, TimeEvolution(
+        1., QubitOperator("X0 X5")), (qureg,)))
+    assert not sim.is_available(Command(eng, Rx(0.5), (qureg[:2],)))
+    All(Measure) | qureg
+
+
+def test_batched_simulator_bind_errors():
+    sim = BatchedSimulator(2)
+    with pytest.raises(ValueError):
+        sim.bind({"theta": [1., 2., 3.]})
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    with pytest.raises(ValueError):
+        Rx(Parameter("phi")) | qubit
+        eng.flush()
+    sim.bind({"theta": 1.})
+    Rx(Parameter("theta")) | qubit
+    eng.flush()
+    assert numpy.allclose(sim.get_probabilities(qubit)[:, 1],
+                          numpy.sin(.5) ** 2)
+    Measure | qubit
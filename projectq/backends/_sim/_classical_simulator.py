@@ -22,7 +22,10 @@ from projectq.ops import (XGate,
                           Measure,
                           FlushGate,
                           Allocate,
-                          Deallocate)
+                          Deallocate,
+                          MeasureGate,
+                          AllocateQubitGate,
+                          DeallocateQubitGate)
 
 
 class ClassicalSimulator(BasicEngine):
@@ -120,6 +123,12 @@ class ClassicalSimulator(BasicEngine):
                 isinstance(cmd.gate, FlushGate) or
                 isinstance(cmd.gate, XGate))
 
+    def get_availability_key(self, cmd):
+        if isinstance(cmd.gate, (BasicMathGate, XGate, MeasureGate,
+                                 AllocateQubitGate, DeallocateQubitGate)):
+            return type(cmd.gate)
+        return None
+
     def receive(self, command_list):
         for cmd in command_list:
             self._handle(cmd)
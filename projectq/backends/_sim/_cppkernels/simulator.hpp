@@ -32,7 +32,26 @@
 #include <tuple>
 #include <random>
 #include <functional>
-
+#include <chrono>
+
+
+// Counters of the simulator (estimates of bytes and FLOPs assume that each
+// amplitude which is not masked out by the controls is read and written once)
+struct SimulatorStats{
+    using Counts = std::map<std::size_t, std::size_t>;
+
+    Counts kernel_calls; // by number of qubits of the (fused) gate
+    Counts fused_block_sizes; // number of fused gates -> number of blocks
+    double fusion_time = 0.; // seconds spent fusing gates
+    double kernel_time = 0.; // seconds spent in the kernels
+    double measure_time = 0.;
+    double allocation_time = 0.; // allocation and deallocation
+    double emulate_math_time = 0.;
+    double emulate_math_gil_time = 0.; // part spent holding the GIL
+    double time_evolution_time = 0.; // includes the kernels it runs
+    double bytes = 0.; // estimated bytes moved by the kernels
+    double flops = 0.; // estimated floating point operations of the kernels
+};
 
 class Simulator{
 public:
@@ -45,6 +64,8 @@ public:
     using TermsDict = std::vector<std::pair<Term, calc_type>>;
     using ComplexTermsDict = std::vector<std::pair<Term, complex_type>>;
 
+    using Clock = std::chrono::steady_clock;
+
     Simulator(unsigned seed = 1) : N_(0), vec_(1,0.), fusion_qubits_min_(4),
                                    fusion_qubits_max_(5), rnd_eng_(seed) {
         vec_[0]=1.; // all-zero initial state
@@ -52,7 +73,20 @@ public:
         rng_ = std::bind(dist, std::ref(rnd_eng_));
     }
 
+    SimulatorStats& stats(){
+        return stats_;
+    }
+
+    void reset_stats(){
+        stats_ = SimulatorStats();
+    }
+
+    static double seconds_since(Clock::time_point start){
+        return std::chrono::duration<double>(Clock::now() - start).count();
+    }
+
     void allocate_qubit(unsigned id){
+        auto start = Clock::now();
         if (map_.count(id) == 0){
             map_[id] = N_++;
             auto newvec = StateVector(1UL << N_);
@@ -60,6 +94,7 @@ public:
             for (std::size_t i = 0; i < newvec.size(); ++i)
                 newvec[i] = (i < vec_.size())?vec_[i]:0.;
             vec_ = std::move(newvec);
+            stats_.allocation_time += seconds_since(start);
         }
         else
             throw(std::runtime_error(
@@ -131,6 +166,7 @@ public:
 
     void measure_qubits(std::vector<unsigned> const& ids, std::vector<bool> &res){
         run();
+        auto start = Clock::now();
 
         std::vector<unsigned> positions(ids.size());
         for (unsigned i = 0; i < ids.size(); ++i)
@@ -170,6 +206,7 @@ public:
         #pragma omp parallel for schedule(static)
         for (std::size_t i = 0; i < vec_.size(); ++i)
             vec_[i] *= N;
+        stats_.measure_time += seconds_since(start);
     }
 
     std::vector<bool> measure_qubits_return(std::vector<unsigned> const& ids){
@@ -180,12 +217,14 @@ public:
 
     void deallocate_qubit(unsigned id){
         run();
+        auto start = Clock::now();
         assert(map_.count(id) == 1);
         if (!is_classical(id))
             throw(std::runtime_error("Error: Qubit has not been measured / uncomputed! There is most likely a bug in your code."));
 
         bool value = get_classical_value(id);
         collapse_vector(id, value, true);
+        stats_.allocation_time += seconds_since(start);
     }
 
     template <class M>
@@ -212,6 +251,7 @@ public:
     void emulate_math(F const& f, QuReg quregs, std::vector<unsigned> ctrl,
                       unsigned num_threads=1){
         run();
+        auto start = Clock::now();
         auto ctrlmask = get_control_mask(ctrl);
 
         for (unsigned i = 0; i < quregs.size(); ++i)
@@ -243,6 +283,11 @@ public:
                 newvec[i] += vec_[i];
         }
         vec_ = std::move(newvec);
+        stats_.emulate_math_time += seconds_since(start);
+    }
+
+    void add_emulate_math_gil_time(double seconds){
+        stats_.emulate_math_gil_time += seconds;
     }
 
     calc_type get_expectation_value(TermsDict const& td, std::vector<unsigned> const& ids){
@@ -321,6 +366,7 @@ public:
                                 std::vector<unsigned> const& ids,
                                 std::vector<unsigned> const& ctrl){
         run();
+        auto start = Clock::now();
         complex_type I(0., 1.);
         calc_type tr = 0., op_nrm = 0.;
         TermsDict td;
@@ -334,6 +380,10 @@ public:
         }
         unsigned s = std::abs(time) * op_nrm + 1.;
         complex_type correction = std::exp(-time * I * tr / (double)s);
+        // the terms act on the target qubits only, such that the subspace
+        // with all controls 1 evolves independently (and the rest is left
+        // unchanged)
+        auto ctrlmask = get_control_mask(ctrl);
         auto output_state = vec_;
         for (unsigned i = 0; i < s; ++i){
             calc_type nrm_change = 1.;
@@ -342,7 +392,7 @@ public:
                 auto current_state = vec_;
                 auto update = StateVector(vec_.size(), 0.);
                 for (auto const& tup : td){
-                    apply_term(tup.first, ids, ctrl);
+                    apply_term(tup.first, ids, {});
                     #pragma omp parallel for schedule(static)
                     for (std::size_t j = 0; j < vec_.size(); ++j){
                         update[j] += vec_[j] * tup.second;
@@ -354,17 +404,21 @@ public:
                 for (std::size_t j = 0; j < vec_.size(); ++j){
                     update[j] *= coeff;
                     vec_[j] = update[j];
-                    output_state[j] += update[j];
-                    nrm_change += std::norm(update[j]);
+                    if ((j & ctrlmask) == ctrlmask){
+                        output_state[j] += update[j];
+                        nrm_change += std::norm(update[j]);
+                    }
                 }
                 nrm_change = std::sqrt(nrm_change);
             }
             #pragma omp parallel for schedule(static)
             for (std::size_t j = 0; j < vec_.size(); ++j){
-                output_state[j] *= correction;
+                if ((j & ctrlmask) == ctrlmask)
+                    output_state[j] *= correction;
                 vec_[j] = output_state[j];
             }
         }
+        stats_.time_evolution_time += seconds_since(start);
     }
 
     void set_wavefunction(StateVector const& wavefunction, std::vector<unsigned> const& ordering){
@@ -417,9 +471,11 @@ public:
         if (fused_gates_.size() < 1)
             return;
 
+        auto start = Clock::now();
         Fusion::Matrix m;
         Fusion::IndexVector ids, ctrls;
 
+        stats_.fused_block_sizes[fused_gates_.size()]++;
         fused_gates_.perform_fusion(m, ids, ctrls);
 
         for (auto& id : ids)
@@ -427,6 +483,18 @@ public:
 
         auto ctrlmask = get_control_mask(ctrls);
 
+        auto kernel_start = Clock::now();
+        stats_.fusion_time += std::chrono::duration<double>(
+            kernel_start - start).count();
+        // amplitudes which are not masked out by the controls
+        std::size_t num_amplitudes = vec_.size();
+        for (std::size_t mask = ctrlmask; mask; mask &= mask - 1)
+            num_amplitudes >>= 1;
+        stats_.kernel_calls[ids.size()]++;
+        stats_.bytes += 2. * sizeof(complex_type) * num_amplitudes;
+        // one complex multiply-add (8 FLOPs) per matrix element
+        stats_.flops += 8. * num_amplitudes * (1UL << ids.size());
+
         switch (ids.size()){
             case 1:
                 #pragma omp parallel
@@ -451,6 +519,7 @@ public:
         }
 
         fused_gates_ = Fusion();
+        stats_.kernel_time += seconds_since(kernel_start);
     }
 
     std::tuple<Map, StateVector&> cheat(){
@@ -496,6 +565,7 @@ private:
     unsigned fusion_qubits_min_, fusion_qubits_max_;
     RndEngine rnd_eng_;
     std::function<double()> rng_;
+    SimulatorStats stats_;
 };
 
 #endif
@@ -18,6 +18,7 @@
 #include <vector>
 #include <complex>
 #include <iostream>
+#include <stdexcept>
 #if defined(_OPENMP)
 #include <omp.h>
 #endif
@@ -33,12 +34,63 @@ using QuRegs = std::vector<std::vector<unsigned>>;
 template <class QR>
 void emulate_math_wrapper(Simulator &sim, py::function const& pyfunc, QR const& qr, std::vector<unsigned> const& ctrls){
     auto f = [&](std::vector<int>& x) {
+        auto start = Simulator::Clock::now();
         pybind11::gil_scoped_acquire acquire;
         x = std::move(pyfunc(x).cast<std::vector<int>>());
+        // (still holding the GIL, so the counter is not updated concurrently)
+        sim.add_emulate_math_gil_time(Simulator::seconds_since(start));
     };
     pybind11::gil_scoped_release release;
     sim.emulate_math(f, qr, ctrls);
 }
+
+// The following functions release the GIL while running the kernels, such
+// that Python code (e.g., the compiler engines) can run in another thread.
+// The gate matrix is read directly from the (numpy) buffer instead of being
+// converted from nested Python lists.
+using MatrixBuffer = py::array_t<c_type, py::array::c_style | py::array::forcecast>;
+
+void apply_controlled_gate_wrapper(Simulator &sim, MatrixBuffer const& m, std::vector<unsigned> const& ids, std::vector<unsigned> const& ctrl){
+    if (m.ndim() != 2 || m.shape(0) != m.shape(1))
+        throw std::invalid_argument("The gate matrix must be a square matrix.");
+    std::size_t n = m.shape(0);
+    c_type const* data = m.data();
+    MatrixType matrix(n, ArrayType(n));
+    for (std::size_t i = 0; i < n; ++i)
+        for (std::size_t j = 0; j < n; ++j)
+            matrix[i][j] = data[i * n + j];
+    pybind11::gil_scoped_release release;
+    sim.apply_controlled_gate(matrix, ids, ctrl);
+}
+
+std::vector<bool> measure_qubits_wrapper(Simulator &sim, std::vector<unsigned> const& ids){
+    pybind11::gil_scoped_release release;
+    return sim.measure_qubits_return(ids);
+}
+
+void run_wrapper(Simulator &sim){
+    pybind11::gil_scoped_release release;
+    sim.run();
+}
+py::dict stats_wrapper(Simulator &sim){
+    auto const& stats = sim.stats();
+    py::dict time;
+    time["fusion"] = stats.fusion_time;
+    time["kernel"] = stats.kernel_time;
+    time["measure"] = stats.measure_time;
+    time["allocation"] = stats.allocation_time;
+    time["emulate_math"] = stats.emulate_math_time;
+    time["time_evolution"] = stats.time_evolution_time;
+    py::dict result;
+    result["kernel_calls"] = stats.kernel_calls;
+    result["fused_block_sizes"] = stats.fused_block_sizes;
+    result["time"] = time;
+    result["emulate_math_gil_time"] = stats.emulate_math_gil_time;
+    result["bytes"] = stats.bytes;
+    result["flops"] = stats.flops;
+    return result;
+}
+
 PYBIND11_PLUGIN(_cppsim) {
     py::module m("_cppsim", "_cppsim");
     py::class_<Simulator>(m, "Simulator")
@@ -47,8 +99,8 @@ PYBIND11_PLUGIN(_cppsim) {
         .def("deallocate_qubit", &Simulator::deallocate_qubit)
         .def("get_classical_value", &Simulator::get_classical_value)
         .def("is_classical", &Simulator::is_classical)
-        .def("measure_qubits", &Simulator::measure_qubits_return)
-        .def("apply_controlled_gate", &Simulator::apply_controlled_gate<MatrixType>)
+        .def("measure_qubits", &measure_qubits_wrapper)
+        .def("apply_controlled_gate", &apply_controlled_gate_wrapper)
         .def("emulate_math", &emulate_math_wrapper<QuRegs>)
         .def("get_expectation_value", &Simulator::get_expectation_value)
         .def("apply_qubit_operator", &Simulator::apply_qubit_operator)
@@ -57,8 +109,10 @@ PYBIND11_PLUGIN(_cppsim) {
         .def("get_amplitude", &Simulator::get_amplitude)
         .def("set_wavefunction", &Simulator::set_wavefunction)
         .def("collapse_wavefunction", &Simulator::collapse_wavefunction)
-        .def("run", &Simulator::run)
+        .def("run", &run_wrapper)
         .def("cheat", &Simulator::cheat)
+        .def("stats", &stats_wrapper)
+        .def("reset_stats", &Simulator::reset_stats)
         ;
     return m.ptr();
 }
@@ -22,6 +22,11 @@ import cmath
 import random
 import numpy as _np
 
+try:
+    from time import perf_counter as _clock
+except ImportError:  # pragma: no cover
+    from time import time as _clock
+
 
 class Simulator(object):
     """
@@ -45,8 +50,37 @@ class Simulator(object):
         self._state = _np.ones(1, dtype=_np.complex128)
         self._map = dict()
         self._num_qubits = 0
+        self.reset_stats()
         print("(Note: This is the (slow) Python simulator.)")
 
+    def stats(self):
+        """
+        Return the counters of the simulator (see Simulator.stats of the
+        ProjectQ simulator backend). Gates are applied one by one, i.e., each
+        fused block consists of a single gate.
+        """
+        stats = dict(self._stats)
+        stats["kernel_calls"] = dict(stats["kernel_calls"])
+        stats["fused_block_sizes"] = dict(stats["fused_block_sizes"])
+        stats["time"] = dict(stats["time"])
+        return stats
+
+    def reset_stats(self):
+        """
+        Reset all counters of the simulator to zero.
+        """
+        self._stats = {"kernel_calls": dict(),
+                       "fused_block_sizes": dict(),
+                       "time": {"fusion": 0., "kernel": 0., "measure": 0.,
+                                "allocation": 0., "emulate_math": 0.,
+                                "time_evolution": 0.},
+                       "emulate_math_gil_time": 0.,
+                       "bytes": 0.,
+                       "flops": 0.}
+
+    def _add_time(self, phase, start):
+        self._stats["time"][phase] += _clock() - start
+
     def cheat(self):
         """
         Return the qubit index to bit location map and the corresponding state
@@ -73,6 +107,7 @@ class Simulator(object):
         Returns:
             List of measurement results (containing either True or False).
         """
+        start = _clock()
         P = random.random()
         val = 0.
         i_picked = 0
@@ -100,6 +135,7 @@ class Simulator(object):
                 nrm += _np.abs(self._state[i]) ** 2
 
         self._state *= 1. / _np.sqrt(nrm)
+        self._add_time("measure", start)
         return res
 
     def allocate_qubit(self, ID):
@@ -109,9 +145,11 @@ class Simulator(object):
         Args:
             ID (int): ID of the qubit which is being allocated.
         """
+        start = _clock()
         self._map[ID] = self._num_qubits
         self._num_qubits += 1
         self._state.resize(1 << self._num_qubits)
+        self._add_time("allocation", start)
 
     def get_classical_value(self, ID, tol=1.e-10):
         """
@@ -154,6 +192,7 @@ class Simulator(object):
             RuntimeError: If the qubit is in a superposition, i.e., has not
                 been measured / uncomputed.
         """
+        start = _clock()
         pos = self._map[ID]
 
         cv = self.get_classical_value(ID)
@@ -175,6 +214,7 @@ class Simulator(object):
         self._map = newmap
         self._state = newstate
         self._num_qubits -= 1
+        self._add_time("allocation", start)
 
     def _get_control_mask(self, ctrlids):
         """
@@ -200,6 +240,7 @@ class Simulator(object):
                 quantum registers, which corresponds to this 'list of lists'.
             ctrlqubit_ids (list<int>): List of control qubit ids.
         """
+        start = _clock()
         mask = self._get_control_mask(ctrlqubit_ids)
         # determine qubit locations from their IDs
         qb_locs = []
@@ -229,6 +270,10 @@ class Simulator(object):
                 newstate[i] = self._state[i]
 
         self._state = newstate
+        # all of the emulation is executed holding the GIL
+        duration = _clock() - start
+        self._stats["time"]["emulate_math"] += duration
+        self._stats["emulate_math_gil_time"] += duration
 
     def get_expectation_value(self, terms_dict, ids):
         """
@@ -343,6 +388,7 @@ class Simulator(object):
             ids (list): A list of qubit IDs to which to apply the evolution.
             ctrlids (list): A list of control qubit IDs.
         """
+        start = _clock()
         # Determine the (normalized) trace, which is nonzero only for identity
         # terms:
         tr = sum([c for (t, c) in terms_dict if len(t) == 0])
@@ -351,6 +397,13 @@ class Simulator(object):
         # rescale the operator by s:
         s = int(op_nrm + 1.)
         correction = _np.exp(-1j * time * tr / float(s))
+        # the terms act on the target qubits only, such that the subspace
+        # with all controls 1 evolves independently (and the rest is left
+        # unchanged)
+        mask = 0
+        for ctrlid in ctrlids:
+            mask |= (1 << self._map[ctrlid])
+        controlled = (_np.arange(len(self._state)) & mask) == mask
         output_state = _np.copy(self._state)
         for i in range(s):
             j = 0
@@ -360,17 +413,19 @@ class Simulator(object):
                 current_state = _np.copy(self._state)
                 update = 0j
                 for t, c in terms_dict:
-                    self._apply_term(t, ids, ctrlids)
+                    self._apply_term(t, ids)
                     self._state *= c
                     update += self._state
                     self._state = _np.copy(current_state)
                 update *= coeff
+                update[~controlled] = 0.
                 self._state = update
                 output_state += update
                 nrm_change = _np.linalg.norm(update)
                 j += 1
-            output_state *= correction
+            output_state[controlled] *= correction
             self._state = _np.copy(output_state)
+        self._add_time("time_evolution", start)
 
     def apply_controlled_gate(self, m, ids, ctrlids):
         """
@@ -378,20 +433,31 @@ class Simulator(object):
         using ctrlids as control qubits.
 
         Args:
-            m (list[list]): 2^k x 2^k complex matrix describing the k-qubit
-                gate.
+            m (list[list] or numpy.ndarray): 2^k x 2^k complex matrix
+                describing the k-qubit gate.
             ids (list): A list containing the qubit IDs to which to apply the
                 gate.
             ctrlids (list): A list of control qubit IDs (i.e., the gate is
                 only applied where these qubits are 1).
         """
+        start = _clock()
         mask = self._get_control_mask(ctrlids)
         if len(m) == 2:
             pos = self._map[ids[0]]
-            self._single_qubit_gate(m, pos, mask)
+            # Python numbers are faster than numpy scalars in the kernel
+            self._single_qubit_gate(_np.asarray(m).tolist(), pos, mask)
         else:
             pos = [self._map[ID] for ID in ids]
             self._multi_qubit_gate(m, pos, mask)
+        self._add_time("kernel", start)
+        stats = self._stats
+        kernel_calls = stats["kernel_calls"]
+        kernel_calls[len(ids)] = kernel_calls.get(len(ids), 0) + 1
+        block_sizes = stats["fused_block_sizes"]
+        block_sizes[1] = block_sizes.get(1, 0) + 1
+        num_amplitudes = len(self._state) >> len(ctrlids)
+        stats["bytes"] += 2. * 16 * num_amplitudes
+        stats["flops"] += 8. * num_amplitudes * (1 << len(ids))
 
     def _single_qubit_gate(self, m, pos, mask):
         """
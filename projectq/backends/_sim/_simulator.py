@@ -20,8 +20,15 @@ implementation is used as an alternative.
 
 import math
 import random
+from functools import partial
+
+import numpy as np
+
 from projectq.cengines import BasicEngine
-from projectq.meta import get_control_count
+from projectq.meta import (get_control_count,
+                           get_classical_control_tags,
+                           ClassicalControlTag,
+                           LoopTag)
 from projectq.ops import (NOT,
                           H,
                           R,
@@ -30,7 +37,21 @@ from projectq.ops import (NOT,
                           Allocate,
                           Deallocate,
                           BasicMathGate,
-                          TimeEvolution)
+                          QubitOperator,
+                          TimeEvolution,
+                          HGate,
+                          XGate,
+                          YGate,
+                          ZGate,
+                          SGate,
+                          TGate,
+                          Ph,
+                          Rx,
+                          Ry,
+                          Rz,
+                          MeasureGate,
+                          AllocateQubitGate,
+                          DeallocateQubitGate)
 
 try:
     from ._cppsim import Simulator as SimulatorBackend
@@ -38,6 +59,159 @@ except ImportError:
     from ._pysim import Simulator as SimulatorBackend
 
 
+# gate classes for which the class determines whether the gate is available
+_GATE_CLASSES_WITH_FIXED_AVAILABILITY = frozenset([
+    HGate, XGate, YGate, ZGate, SGate, TGate, Ph, R, Rx, Ry, Rz, MeasureGate,
+    AllocateQubitGate, DeallocateQubitGate])
+
+# loop bodies acting on at most this many qubits are applied as one unitary
+_MAX_LOOP_UNITARY_QUBITS = 5
+
+
+class _LoopBlock(object):
+    """
+    Body of a loop (i.e., the commands with the same LoopTag), which is
+    executed by the Simulator once it is complete.
+
+    Attributes:
+        tag (LoopTag): Loop tag of the commands in the loop body.
+        items (list): Commands and nested loops (_LoopBlock) of the body.
+    """
+    def __init__(self, tag):
+        self.tag = tag
+        self.items = []
+
+
+def _get_loop_qubit_ids(items):
+    """ Return the set of qubit ids on which the loop body items act. """
+    ids = set()
+    for item in items:
+        if isinstance(item, _LoopBlock):
+            ids |= _get_loop_qubit_ids(item.items)
+        else:
+            ids.update(qb.id for qr in item.all_qubits for qb in qr)
+    return ids
+
+
+def _embed_gate(matrix, targets, controls, num_qubits):
+    """
+    Return the matrix of a controlled gate acting on num_qubits qubits.
+
+    Args:
+        matrix (numpy.ndarray): Matrix of the gate, where bit i of the
+            row/column index corresponds to the qubit at position targets[i].
+        targets (list<int>): Positions of the qubits the gate acts on.
+        controls (list<int>): Positions of the control qubits.
+        num_qubits (int): Total number of qubits.
+    """
+    dim = 1 << num_qubits
+    control_mask = sum(1 << pos for pos in controls)
+    target_mask = sum(1 << pos for pos in targets)
+    offsets = [sum(((i >> k) & 1) << pos for k, pos in enumerate(targets))
+               for i in range(len(matrix))]
+    full_matrix = np.zeros((dim, dim), dtype=complex)
+    for col in range(dim):
+        if col & control_mask != control_mask:
+            full_matrix[col, col] = 1.
+            continue
+        base = col & ~target_mask
+        j = offsets.index(col & target_mask)
+        for i in range(len(matrix)):
+            full_matrix[base | offsets[i], col] = matrix[i, j]
+    return full_matrix
+
+
+def _get_loop_unitary(items, positions):
+    """
+    Return the unitary of one iteration of a loop body (or None if the body
+    contains commands without a gate matrix).
+
+    Args:
+        items (list): Commands and nested loops (_LoopBlock) of the body.
+        positions (dict): Maps qubit ids to their bit-position in the
+            unitary.
+    """
+    unitary = np.identity(1 << len(positions), dtype=complex)
+    for item in items:
+        if isinstance(item, _LoopBlock):
+            body = _get_loop_unitary(item.items, positions)
+            if body is None:
+                return None
+            gate_matrix = np.linalg.matrix_power(body, item.tag.num)
+        else:
+            if (isinstance(item.gate, (MeasureGate, AllocateQubitGate,
+                                       DeallocateQubitGate, FlushGate,
+                                       TimeEvolution)) or
+                    len(get_classical_control_tags(item)) > 0):
+                return None
+            try:
+                matrix = np.asarray(item.gate.matrix)
+            except AttributeError:
+                return None
+            targets = [positions[qb.id] for qr in item.qubits for qb in qr]
+            if matrix.shape != (1 << len(targets), 1 << len(targets)):
+                return None
+            controls = [positions[qb.id] for qb in item.control_qubits]
+            gate_matrix = _embed_gate(matrix, targets, controls,
+                                      len(positions))
+        unitary = gate_matrix.dot(unitary)
+    return unitary
+
+
+def _get_generator(gate, qubit_ids, control_ids):
+    """
+    Return the generator G of a parametrized (controlled) gate, i.e., the
+    hermitian operator for which the gate is exp(-i * angle / 2 * G) (or
+    exp(-i * time * G / 2) for TimeEvolution gates).
+
+    Args:
+        gate (BasicGate): Gate with symbolic parameters.
+        qubit_ids (list<int>): Ids of the target qubits.
+        control_ids (list<int>): Ids of the control qubits.
+
+    Returns:
+        QubitOperator acting on the qubits with the given ids.
+
+    Raises:
+        ValueError: If the generator of the gate is unknown.
+    """
+    if isinstance(gate, (Rx, Ry, Rz)):
+        pauli = {Rx: 'X', Ry: 'Y', Rz: 'Z'}[type(gate)]
+        generator = QubitOperator(((qubit_ids[0], pauli),))
+    elif isinstance(gate, R):
+        generator = QubitOperator(((qubit_ids[0], 'Z'),)) - QubitOperator(())
+    elif isinstance(gate, Ph):
+        generator = QubitOperator((), -2.)
+    elif isinstance(gate, TimeEvolution):
+        generator = QubitOperator()
+        for term, coeff in gate.hamiltonian.terms.items():
+            generator += QubitOperator(
+                tuple((qubit_ids[index], action) for index, action in term),
+                2. * coeff)
+    else:
+        raise ValueError("Cannot differentiate {} gates.".format(
+            type(gate).__name__))
+    # the gate acts (as exp(-i * angle / 2 * G)) only if all controls are 1
+    for control_id in control_ids:
+        generator *= .5 * (QubitOperator(()) -
+                           QubitOperator(((control_id, 'Z'),)))
+    return generator
+
+
+def _get_operator_terms(qubit_operator):
+    """
+    Return the terms of a qubit operator (acting on the qubits with the ids
+    given by its indices) and the ids of the qubits it acts on, as expected
+    by the simulator kernels.
+    """
+    ids = sorted(set(index for term in qubit_operator.terms
+                     for index, _ in term))
+    positions = dict((qubit_id, i) for i, qubit_id in enumerate(ids))
+    terms = [([(positions[index], action) for index, action in term], coeff)
+             for term, coeff in qubit_operator.terms.items()]
+    return terms, ids
+
+
 class Simulator(BasicEngine):
     """
     Simulator is a compiler engine which simulates a quantum computer using
@@ -51,7 +225,7 @@ class Simulator(BasicEngine):
         export OMP_NUM_THREADS=4 # use 4 threads
         export OMP_PROC_BIND=spread # bind threads to processors by spreading
     """
-    def __init__(self, gate_fusion=False, rnd_seed=None):
+    def __init__(self, gate_fusion=False, rnd_seed=None, execute_loops=False):
         """
         Construct the C++/Python-simulator object and initialize it with a
         random seed.
@@ -62,6 +236,11 @@ class Simulator(BasicEngine):
                 for the c++ simulator).
             rnd_seed (int): Random seed (uses random.randint(0, 1024) by
                 default).
+            execute_loops (bool): If True, the Simulator handles LoopTag, i.e.,
+                it receives the body of a loop only once and executes it the
+                number of iterations itself. Only enable it if no engine
+                before the Simulator needs to see every iteration (e.g., a
+                ResourceCounter or CommandPrinter).
 
         Example of gate_fusion: Instead of applying a Hadamard gate to 5
         qubits, the simulator calculates the kronecker product of the 1-qubit
@@ -85,6 +264,52 @@ class Simulator(BasicEngine):
         BasicEngine.__init__(self)
         self._simulator = SimulatorBackend(rnd_seed)
         self._gate_fusion = gate_fusion
+        self._execute_loops = execute_loops
+        # loops which are being received (outermost first), see LoopTag
+        self._open_loops = []
+        # latest measurement result of each qubit (see ClassicalControlTag)
+        self._measurement_record = dict()
+        # values of the symbolic parameters of the gates (see bind)
+        self._parameter_values = dict()
+
+    def is_meta_tag_handler(self, tag):
+        """
+        Return True for ClassicalControlTag and, if loops are executed by
+        the Simulator (see execute_loops), for LoopTag: The Simulator executes
+        classically controlled commands depending on its own measurement
+        results, and it receives the body of a loop only once and executes it
+        the number of iterations itself (see _run_loop).
+
+        Args:
+            tag: Meta tag class for which to check support.
+        """
+        if tag == LoopTag:
+            return self._execute_loops
+        return tag == ClassicalControlTag
+
+    def _is_condition_met(self, cmd):
+        """
+        Return True if the command cmd is to be executed, i.e., if the latest
+        measurement results of all qubits in its classical control tags were
+        1.
+
+        Args:
+            cmd (Command): Command to check.
+
+        Raises:
+            RuntimeError: If a qubit of the condition has not been measured.
+        """
+        for tag in get_classical_control_tags(cmd):
+            for qubit_id in tag.qubit_ids:
+                try:
+                    if not self._measurement_record[qubit_id]:
+                        return False
+                except KeyError:
+                    raise RuntimeError("Simulator: Qubit #{} has not been "
+                                       "measured, cannot execute classically "
+                                       "controlled {} gate.".format(
+                                           qubit_id, str(cmd.gate)))
+        return True
 
     def is_available(self, cmd):
         """
@@ -104,8 +329,12 @@ class Simulator(BasicEngine):
            or isinstance(cmd.gate, BasicMathGate)
            or isinstance(cmd.gate, TimeEvolution)):
             return True
+        gate = cmd.gate
+        if len(gate.parameters) > 0:
+            # symbolic gates are bound to the parameter values upon execution
+            gate = gate.bind(dict.fromkeys(gate.parameters, 0.))
         try:
-            m = cmd.gate.matrix
+            m = gate.matrix
             # Allow up to 5-qubit gates
             if len(m) > 2 ** 5:
                 return False
@@ -113,6 +342,20 @@ class Simulator(BasicEngine):
         except:
             return False
 
+    def get_availability_key(self, cmd):
+        """
+        Return the gate class as availability key if it determines whether
+        the command can be simulated (see BasicEngine.get_availability_key).
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        gate_class = type(cmd.gate)
+        if (gate_class in _GATE_CLASSES_WITH_FIXED_AVAILABILITY or
+                isinstance(cmd.gate, (BasicMathGate, TimeEvolution))):
+            return gate_class
+        return None
+
     def get_expectation_value(self, qubit_operator, qureg):
         """
         Get the expectation value of qubit_operator w.r.t. the current wave
@@ -282,11 +525,175 @@ class Simulator(BasicEngine):
         """
         return self._simulator.cheat()
 
+    def stats(self):
+        """
+        Return the counters of the simulator kernels, which are accumulated
+        since the simulator was created (or reset_stats was called).
+
+        Returns:
+            A dictionary containing
+
+            * "kernel_calls": Number of kernel invocations by number of
+              qubits of the (fused) gate.
+            * "fused_block_sizes": Number of fused blocks by number of gates
+              they consist of.
+            * "time": Seconds spent in each phase ("fusion", "kernel",
+              "measure", "allocation", "emulate_math" and "time_evolution";
+              the latter includes the kernels it runs).
+            * "emulate_math_gil_time": Seconds spent holding the GIL while
+              emulating math gates (i.e., calling back into Python).
+            * "bytes", "flops": Estimates of the memory traffic and the
+              floating point operations of the kernels.
+
+        Note:
+            Call main_engine.flush() first to include all gates which have
+            been sent so far.
+        """
+        return self._simulator.stats()
+
+    def reset_stats(self):
+        """
+        Reset all counters of the simulator kernels (see stats) to zero.
+        """
+        self._simulator.reset_stats()
+
+    def get_expectation_value_gradient(self, qubit_operator, qureg, tape):
+        """
+        Return the gradient of the expectation value of qubit_operator with
+        respect to the symbolic parameters (see Parameter) of a recorded
+        circuit, using adjoint differentiation.
+
+        The current wave function must be the result of the tape (i.e., the
+        tape has just been recorded or replayed with the current parameter
+        values, see bind). Starting from the state psi and
+        lambda = qubit_operator * psi, the gates of the tape are undone one
+        after the other on both states, while the derivative with respect to
+        each gate angle is the overlap of lambda with the generator of the
+        gate applied to psi. All gradients are thus obtained at the cost of
+        roughly three simulations of the circuit.
+
+        The two states are stored in a single state vector using an
+        additional qubit, such that the gate and expectation value kernels
+        of the simulator can be used. The wave function is restored
+        afterwards.
+
+        Args:
+            qubit_operator (projectq.ops.QubitOperator): Operator of which to
+                differentiate the expectation value.
+            qureg (list[Qubit],Qureg): Quantum bits the operator acts on.
+            tape (Tape): Recorded circuit (see TapeRecorder), consisting of
+                unitary gates only.
+
+        Returns:
+            A dictionary mapping the names of the parameters of the tape to
+            the derivatives of the expectation value.
+
+        Raises:
+            ValueError: If the tape contains commands other than unitary
+                gates (e.g., allocations, measurements or loops), or a
+                parametrized gate of which the generator is unknown.
+            Exception: If `qubit_operator` acts on more qubits than present in
+                the `qureg` argument.
+        """
+        num_qubits = len(qureg)
+        for term in qubit_operator.terms:
+            if not term == () and term[-1][0] >= num_qubits:
+                raise Exception("qubit_operator acts on more qubits than "
+                                "contained in the qureg.")
+        commands = list(tape)
+        gradient = dict()
+        for gate, quregs, controls, tags in commands:
+            if (isinstance(gate, (MeasureGate, AllocateQubitGate,
+                                  DeallocateQubitGate, BasicMathGate)) or
+                    any(isinstance(tag, (LoopTag, ClassicalControlTag))
+                        for tag in tags)):
+                raise ValueError("Cannot differentiate the tape: {} is no "
+                                 "unitary gate.".format(gate))
+            for name in gate.parameters:
+                gradient[name] = 0.
+        simulator = self._simulator
+        mapping, state = simulator.cheat()
+        ordering = sorted(mapping, key=mapping.get)
+        state = np.array(state)
+
+        # ancilla in (|0> psi + |1> lambda) / sqrt(2)
+        ancilla = self.main_engine.get_new_qubit_id()
+        simulator.allocate_qubit(ancilla)
+        simulator.apply_controlled_gate(H.matrix, [ancilla], [])
+        operator = QubitOperator()
+        for term, coeff in qubit_operator.terms.items():
+            operator += QubitOperator(
+                tuple((qureg[index].id, action) for index, action in term),
+                coeff)
+        projector = .5 * QubitOperator(((ancilla, 'Z'),))
+        operator = ((QubitOperator((), .5) + projector) +
+                    (QubitOperator((), .5) - projector) * operator)
+        simulator.apply_qubit_operator(*_get_operator_terms(operator))
+        try:
+            for gate, quregs, controls, tags in reversed(commands):
+                ids = [qubit_id for ids in quregs for qubit_id in ids]
+                if len(gate.parameters) > 0:
+                    # d<H>/dangle = Im <lambda| G |psi>
+                    #             = -<Y_ancilla G> (w.r.t. the joint state)
+                    generator = _get_generator(gate, ids, controls)
+                    generator = QubitOperator(((ancilla, 'Y'),)) * generator
+                    terms, term_ids = _get_operator_terms(generator)
+                    derivative = -simulator.get_expectation_value(
+                        [(term, coeff.real) for term, coeff in terms],
+                        term_ids)
+                    if isinstance(gate, TimeEvolution):
+                        expression = gate.time
+                    else:
+                        expression = gate._angle
+                    for name, coeff in expression.terms.items():
+                        gradient[name] += coeff * derivative
+                gate = gate.bind(self._parameter_values)
+                if isinstance(gate, TimeEvolution):
+                    hamiltonian = [(list(term), coeff) for term, coeff
+                                   in gate.hamiltonian.terms.items()]
+                    simulator.emulate_time_evolution(hamiltonian, -gate.time,
+                                                     ids, controls)
+                else:
+                    simulator.apply_controlled_gate(
+                        np.conj(np.asarray(gate.matrix)).T, ids, controls)
+        finally:
+            simulator.collapse_wavefunction([ancilla], [False])
+            simulator.deallocate_qubit(ancilla)
+            simulator.set_wavefunction(state, ordering)
+        return gradient
+
+    def bind(self, values):
+        """
+        Set the values of the symbolic parameters (see Parameter) of all
+        gates which are executed from now on.
+
+        A circuit with symbolic parameters thus has to be compiled only once
+        and can then be executed for many parameter values, e.g., by
+        replaying its recorded tape (see TapeRecorder):
+
+        .. code-block:: python
+
+            with recorder.record() as tape:
+                Rx(Parameter("theta")) | qubit
+            for theta in angles:
+                sim.bind({"theta": theta})
+                recorder.replay(tape)
+                ...
+
+        Args:
+            values (dict): Maps the names of the parameters to their values
+                (parameters which are not in values keep their values).
+        """
+        self._parameter_values.update(values)
+
     def _handle(self, cmd):
         """
         Handle all commands, i.e., call the member functions of the C++-
         simulator object corresponding to measurement, allocation/
-        deallocation, and (controlled) single-qubit gate.
+        deallocation, and (controlled) single-qubit gate. Commands whose
+        classical condition is not met (see ClassicalControlTag) are
+        skipped. Symbolic gates are bound to the current parameter values
+        (see bind).
 
         Args:
             cmd (Command): Command to handle.
@@ -295,47 +702,52 @@ class Simulator(BasicEngine):
             Exception: If a non-single-qubit gate needs to be processed
                 (which should never happen due to is_available).
         """
-        if cmd.gate == Measure:
+        if len(cmd.tags) > 0 and not self._is_condition_met(cmd):
+            return
+        gate = cmd.gate.bind(self._parameter_values)
+        if gate == Measure:
             assert(get_control_count(cmd) == 0)
             ids = [qb.id for qr in cmd.qubits for qb in qr]
             out = self._simulator.measure_qubits(ids)
             i = 0
             for qr in cmd.qubits:
                 for qb in qr:
+                    self._measurement_record[qb.id] = bool(out[i])
                     self.main_engine.set_measurement_result(qb, out[i])
                     i += 1
-        elif cmd.gate == Allocate:
+        elif gate == Allocate:
             ID = cmd.qubits[0][0].id
             self._simulator.allocate_qubit(ID)
-        elif cmd.gate == Deallocate:
+        elif gate == Deallocate:
             ID = cmd.qubits[0][0].id
             self._simulator.deallocate_qubit(ID)
-        elif isinstance(cmd.gate, BasicMathGate):
+        elif isinstance(gate, BasicMathGate):
             qubitids = []
             for qr in cmd.qubits:
                 qubitids.append([])
                 for qb in qr:
                     qubitids[-1].append(qb.id)
-            math_fun = cmd.gate.get_math_function(cmd.qubits)
+            math_fun = gate.get_math_function(cmd.qubits)
             self._simulator.emulate_math(math_fun, qubitids,
                                          [qb.id for qb in cmd.control_qubits])
-        elif isinstance(cmd.gate, TimeEvolution):
+        elif isinstance(gate, TimeEvolution):
             op = [(list(term), coeff) for (term, coeff)
-                  in cmd.gate.hamiltonian.terms.items()]
-            t = cmd.gate.time
+                  in gate.hamiltonian.terms.items()]
+            t = gate.time
             qubitids = [qb.id for qb in cmd.qubits[0]]
             ctrlids = [qb.id for qb in cmd.control_qubits]
             self._simulator.emulate_time_evolution(op, t, qubitids, ctrlids)
-        elif len(cmd.gate.matrix) <= 2 ** 5:
-            matrix = cmd.gate.matrix
+        elif len(gate.matrix) <= 2 ** 5:
+            matrix = gate.matrix
             ids = [qb.id for qr in cmd.qubits for qb in qr]
-            if not 2 ** len(ids) == len(cmd.gate.matrix):
+            if not 2 ** len(ids) == len(matrix):
                 raise Exception("Simulator: Error applying {} gate: "
                                 "{}-qubit gate applied to {} qubits.".format(
-                                    str(cmd.gate),
-                                    int(math.log(len(cmd.gate.matrix), 2)),
+                                    str(gate),
+                                    int(math.log(len(matrix), 2)),
                                     len(ids)))
-            self._simulator.apply_controlled_gate(matrix.tolist(),
+            # the matrix buffer is passed on as is (no conversion to lists)
+            self._simulator.apply_controlled_gate(matrix,
                                                   ids,
                                                   [qb.id for qb in
                                                    cmd.control_qubits])
@@ -346,20 +758,127 @@ class Simulator(BasicEngine):
                             " gates with k < 6!\nPlease add an auto-replacer"
                             " engine to your list of compiler engines.")
 
+    def _compile_loop(self, block):
+        """
+        Return a list of functions which execute one iteration of the loop
+        block (without re-examining the commands in each iteration).
+
+        Args:
+            block (_LoopBlock): Loop to compile.
+        """
+        functions = []
+        for item in block.items:
+            if isinstance(item, _LoopBlock):
+                functions.append(partial(self._run_loop, item))
+                continue
+            gate = item.gate
+            if isinstance(gate, FlushGate):
+                functions.append(self._simulator.run)
+                continue
+            if (isinstance(gate, (MeasureGate, AllocateQubitGate,
+                                  DeallocateQubitGate, BasicMathGate,
+                                  TimeEvolution)) or
+                    not hasattr(gate, "matrix") or
+                    len(get_classical_control_tags(item)) > 0):
+                functions.append(partial(self._handle, item))
+                continue
+            ids = [qb.id for qr in item.qubits for qb in qr]
+            if len(gate.matrix) > 2 ** 5 or 2 ** len(ids) != len(gate.matrix):
+                # raises the appropriate error
+                functions.append(partial(self._handle, item))
+                continue
+            functions.append(partial(self._simulator.apply_controlled_gate,
+                                     gate.matrix, ids,
+                                     [qb.id for qb in item.control_qubits]))
+            if not self._gate_fusion:
+                functions.append(self._simulator.run)
+        return functions
+
+    def _run_loop(self, block):
+        """
+        Execute a loop (once its body has been received completely).
+
+        If the loop body only consists of gates with a matrix acting on at
+        most _MAX_LOOP_UNITARY_QUBITS qubits, the unitary of the body is
+        computed and raised to the power of the number of iterations (by
+        repeated squaring), which is then applied as a single gate.
+        Otherwise, the compiled loop body is executed for each iteration.
+
+        Args:
+            block (_LoopBlock): Loop to execute.
+        """
+        ids = sorted(_get_loop_qubit_ids(block.items))
+        if 0 < len(ids) <= _MAX_LOOP_UNITARY_QUBITS:
+            positions = dict((qubit_id, i) for i, qubit_id in enumerate(ids))
+            body = _get_loop_unitary(block.items, positions)
+            if body is not None:
+                matrix = np.linalg.matrix_power(body, block.tag.num)
+                self._simulator.apply_controlled_gate(matrix, ids, [])
+                if not self._gate_fusion:
+                    self._simulator.run()
+                return
+        functions = self._compile_loop(block)
+        for _ in range(block.tag.num):
+            for function in functions:
+                function()
+
+    def _close_loops(self, depth):
+        """
+        Close all loops which are nested more deeply than depth, i.e., add
+        them to their enclosing loop or run them.
+
+        Args:
+            depth (int): Number of loops which remain open.
+        """
+        while len(self._open_loops) > depth:
+            block = self._open_loops.pop()
+            if len(self._open_loops) > 0:
+                self._open_loops[-1].items.append(block)
+            else:
+                self._run_loop(block)
+
+    def _receive_command(self, cmd):
+        """
+        Handle the command cmd or, if it belongs to a loop body (i.e., if it
+        has a LoopTag), add it to the body of the loop.
+
+        A loop is complete (and gets executed) once a command without its
+        LoopTag arrives.
+
+        Args:
+            cmd (Command): Command to handle.
+        """
+        # the tags of enclosing loops come last (see Command.tags)
+        loop_tags = [tag for tag in reversed(cmd.tags)
+                     if isinstance(tag, LoopTag)]
+        depth = 0
+        while (depth < len(self._open_loops) and depth < len(loop_tags) and
+               self._open_loops[depth].tag == loop_tags[depth]):
+            depth += 1
+        self._close_loops(depth)
+        for tag in loop_tags[depth:]:
+            self._open_loops.append(_LoopBlock(tag))
+        if len(self._open_loops) > 0:
+            self._open_loops[-1].items.append(cmd)
+        elif not cmd.gate == FlushGate():
+            self._handle(cmd)
+        else:
+            self._simulator.run()  # flush gate --> run all saved gates
+
     def receive(self, command_list):
         """
         Receive a list of commands from the previous engine and handle them
         (simulate them classically) prior to sending them on to the next
         engine.
 
+        Commands with a LoopTag are collected until the loop body is complete
+        and then executed the number of loop iterations.
+
         Args:
             command_list (list<Command>): List of commands to execute on the
                 simulator.
         """
         for cmd in command_list:
-            if not cmd.gate == FlushGate():
-                self._handle(cmd)
-            else:
-                self._simulator.run()  # flush gate --> run all saved gates
-            if not self.is_last_engine:
-                self.send([cmd])
+            self._receive_command(cmd)
+        if not self.is_last_engine:
+            self.send(command_list)
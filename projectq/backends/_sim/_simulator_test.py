@@ -36,6 +36,8 @@ from projectq.ops import (H,
                           Rx,
                           Ry,
                           Rz,
+                          R,
+                          Ph,
                           CNOT,
                           Toffoli,
                           Measure,
@@ -43,8 +45,9 @@ from projectq.ops import (H,
                           BasicMathGate,
                           QubitOperator,
                           TimeEvolution,
-                          All)
-from projectq.meta import Control, Dagger
+                          All,
+                          Command)
+from projectq.meta import Control, Dagger, Loop
 
 from projectq.backends import Simulator
 
@@ -55,7 +58,7 @@ def test_is_cpp_simulator_present():
 
 
 def get_available_simulators():
-    result = ["py_simulator"]
+    result = ["py_simulator", "sparse_simulator"]
     try:
         import projectq.backends._sim._cppsim as _
         result.append("cpp_simulator")
@@ -77,6 +80,11 @@ def sim(request):
         sim = Simulator()
         sim._simulator = PySim(1)
         return sim
+    if request.param == "sparse_simulator":
+        from projectq.backends._sim._sparsesim import Simulator as SparseSim
+        sim = Simulator()
+        sim._simulator = SparseSim(1)
+        return sim
 
 
 class Mock1QubitGate(BasicGate):
@@ -146,6 +154,19 @@ def test_simulator_is_available(sim):
         Mock2QubitGate() | (qubit1, qubit2)
 
 
+def test_simulator_availability_key(sim):
+    eng = MainEngine(DummyEngine(), [])
+    qubit = eng.allocate_qubit()
+    cmd = Command(eng, Rx(0.3), (qubit,))
+    assert sim.get_availability_key(cmd) == Rx
+    cmd.gate = BasicMathGate(lambda x: x)
+    assert sim.get_availability_key(cmd) == BasicMathGate
+    # the matrix size of these gates depends on the instance
+    cmd.gate = Mock1QubitGate()
+    assert sim.get_availability_key(cmd) is None
+    assert cmd.gate.cnt == 0
+
+
 def test_simulator_cheat(sim):
     # cheat function should return a tuple
     assert isinstance(sim.cheat(), tuple)
@@ -171,6 +192,37 @@ def test_simulator_cheat(sim):
     assert len(sim.cheat()[1]) == 1
 
 
+def test_simulator_stats(sim):
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(3)
+    for qubit in qureg:
+        H | qubit
+    CNOT | (qureg[0], qureg[1])
+    with Control(eng, qureg[2]):
+        Plus2Gate() | qureg[:2]
+    Measure | qureg
+    stats = sim.stats()
+    assert set(stats["time"]) == {"fusion", "kernel", "measure",
+                                  "allocation", "emulate_math",
+                                  "time_evolution"}
+    # all 4 gates are executed, possibly fused into larger ones
+    block_sizes = stats["fused_block_sizes"]
+    assert sum(size * num for size, num in block_sizes.items()) == 4
+    assert (sum(stats["kernel_calls"].values()) ==
+            sum(block_sizes.values()))
+    # at least one pass over the 8 amplitudes (16 bytes each)
+    assert stats["bytes"] >= 2 * 16 * 2 ** 3
+    assert stats["flops"] > 0
+    assert all(time >= 0 for time in stats["time"].values())
+    assert 0 < stats["emulate_math_gil_time"]
+    assert stats["emulate_math_gil_time"] <= stats["time"]["emulate_math"]
+    sim.reset_stats()
+    stats = sim.stats()
+    assert stats["kernel_calls"] == dict()
+    assert stats["bytes"] == 0
+    assert stats["time"]["kernel"] == 0
+
+
 def test_simulator_functional_measurement(sim):
     eng = MainEngine(sim, [])
     qubits = eng.allocate_qureg(5)
@@ -209,6 +261,20 @@ def test_simulator_emulation(sim):
     Measure | (qubit1 + qubit2 + qubit3)
 
 
+@pytest.mark.parametrize("matrix_type", [list, numpy.matrix, numpy.array])
+def test_simulator_gate_matrix_types(sim, matrix_type):
+    class MatrixGate(BasicGate):
+        @property
+        def matrix(self):
+            return matrix_type([[0, 1], [1, 0]])
+
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    MatrixGate() | qubit
+    assert sim.get_amplitude('1', qubit) == pytest.approx(1.)
+    Measure | qubit
+
+
 def test_simulator_kqubit_gate(sim):
     m1 = Rx(0.3).matrix
     m2 = Rx(0.8).matrix
@@ -474,6 +540,40 @@ def test_simulator_time_evolution(sim):
     assert numpy.allclose(res, final_wavefunction)
 
 
+class _MatrixGate(BasicGate):
+    def __init__(self, matrix):
+        BasicGate.__init__(self)
+        self.matrix = matrix
+
+
+def test_simulator_controlled_time_evolution(sim):
+    import scipy.linalg
+    hamiltonian = QubitOperator("X0 Y1", 0.4) + QubitOperator("Z1", -0.9)
+    hamiltonian += QubitOperator((), 0.3)
+    # bit i of the matrix index is qubit i
+    matrix = scipy.linalg.expm(-1.1j * (
+        0.4 * numpy.kron(numpy.array([[0, -1j], [1j, 0]]),
+                         numpy.array([[0, 1], [1, 0]])) -
+        0.9 * numpy.kron(numpy.diag([1, -1]), numpy.eye(2)) +
+        0.3 * numpy.eye(4)))
+    states = []
+    for backend, gate in [(sim, TimeEvolution(1.1, hamiltonian)),
+                          (_reference_simulator(), _MatrixGate(matrix))]:
+        eng = MainEngine(backend, [])
+        qureg = eng.allocate_qureg(3)
+        All(H) | qureg
+        Rx(0.3) | qureg[0]
+        Ry(0.4) | qureg[2]
+        with Control(eng, qureg[2]):
+            gate | qureg[:2]
+        eng.flush()
+        states.append([eng.backend.get_amplitude(bits, qureg) for bits in
+                       ["000", "100", "010", "110",
+                        "001", "101", "011", "111"]])
+        All(Measure) | qureg
+    assert numpy.allclose(states[0], states[1])
+
+
 def test_simulator_set_wavefunction(sim):
     eng = MainEngine(sim)
     qubits = eng.allocate_qureg(2)
@@ -614,3 +714,309 @@ def test_simulator_functional_entangle(sim):
         assert 0. == pytest.approx(abs(sim.cheat()[1][i]))
 
     Measure | qubits
+
+
+def _run_loop_circuit(sim, engine_list, body, num, num_qubits, use_loop):
+    eng = MainEngine(sim, engine_list)
+    qureg = eng.allocate_qureg(num_qubits)
+    All(H) | qureg
+    if use_loop:
+        with Loop(eng, num):
+            body(eng, qureg)
+    else:
+        for _ in range(num):
+            body(eng, qureg)
+    Rx(0.2) | qureg[0]
+    eng.flush()
+    state = numpy.array(sim.cheat()[1])
+    All(Measure) | qureg
+    eng.flush()
+    return state
+
+
+def _reference_simulator():
+    from projectq.backends._sim._pysim import Simulator as PySim
+    sim = Simulator()
+    sim._simulator = PySim(1)
+    return sim
+
+
+class _TwoQubitGate(BasicGate):
+    @property
+    def matrix(self):
+        return numpy.kron(Rx(0.3).matrix, Ry(0.2).matrix.dot(S.matrix))
+
+
+def _small_loop_body(eng, qureg):
+    Rz(0.3) | qureg[0]
+    _TwoQubitGate() | (qureg[2], qureg[0])
+    CNOT | (qureg[0], qureg[1])
+    Toffoli | (qureg[1], qureg[2], qureg[0])
+    with Control(eng, qureg[2]):
+        Ry(0.7) | qureg[1]
+
+
+def test_simulator_is_loop_tag_handler():
+    from projectq.meta import LoopTag
+    assert not Simulator().is_meta_tag_handler(LoopTag)
+    sim = Simulator(execute_loops=True)
+    assert sim.is_meta_tag_handler(LoopTag)
+    assert not sim.is_meta_tag_handler(object)
+
+
+def test_simulator_loop_resource_counter(sim):
+    # engines before the Simulator see every iteration (unless the Simulator
+    # executes the loops)
+    from projectq.backends import ResourceCounter
+    counter = ResourceCounter()
+    eng = MainEngine(sim, [counter])
+    qubit = eng.allocate_qubit()
+    with Loop(eng, 4):
+        H | qubit
+    Measure | qubit
+    eng.flush()
+    assert counter.gate_counts["H"] == 4
+
+
+def test_simulator_loop_unitary(sim, monkeypatch):
+    sim._execute_loops = True
+    def no_compilation(block):
+        assert False, "The loop body should be applied as one unitary."
+    monkeypatch.setattr(sim, "_compile_loop", no_compilation)
+    state = _run_loop_circuit(sim, [], _small_loop_body, 7, 3, True)
+    expected = _run_loop_circuit(_reference_simulator(), [],
+                                 _small_loop_body, 7, 3, False)
+    assert numpy.allclose(state, expected)
+
+
+def test_simulator_loop_compiled(sim):
+    sim._execute_loops = True
+    # too many qubits for a dense unitary
+    def body(eng, qureg):
+        for i in range(len(qureg) - 1):
+            CNOT | (qureg[i], qureg[i + 1])
+            Rx(0.1 * i) | qureg[i]
+
+    state = _run_loop_circuit(sim, [], body, 5, 7, True)
+    expected = _run_loop_circuit(_reference_simulator(), [], body, 5, 7,
+                                 False)
+    assert numpy.allclose(state, expected)
+
+
+def test_simulator_nested_loops_with_ancilla(sim):
+    sim._execute_loops = True
+    def body(eng, qureg):
+        Ry(0.4) | qureg[1]
+        with Loop(eng, 3):
+            ancilla = eng.allocate_qubit()
+            CNOT | (qureg[0], ancilla)
+            with Control(eng, ancilla):
+                Rz(0.5) | qureg[1]
+            CNOT | (qureg[0], ancilla)
+            del ancilla
+        with Loop(eng, 2):
+            Rx(0.3) | qureg[0]
+
+    state = _run_loop_circuit(sim, [], body, 4, 2, True)
+    expected = _run_loop_circuit(_reference_simulator(), [], body, 4, 2,
+                                 False)
+    assert numpy.allclose(state, expected)
+
+
+def test_simulator_loop_in_default_pipeline(sim):
+    sim._execute_loops = True
+    from projectq.setups.default import default_engines
+
+    def body(eng, qureg):
+        _small_loop_body(eng, qureg)
+        H | qureg[2]
+        Rx(0.4) | qureg[3]
+
+    state = _run_loop_circuit(sim, default_engines(), body, 6, 4, True)
+    expected = _run_loop_circuit(_reference_simulator(), [], body, 6, 4,
+                                 False)
+    assert numpy.allclose(state, expected)
+
+
+def test_simulator_loop_with_measurement(sim):
+    sim._execute_loops = True
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    with Loop(eng, 3):
+        X | qubit
+        Measure | qubit
+    eng.flush()
+    assert int(qubit) == 1
+
+
+def test_simulator_is_classical_control_tag_handler():
+    from projectq.meta import ClassicalControlTag
+    assert Simulator().is_meta_tag_handler(ClassicalControlTag)
+
+
+def test_simulator_classical_control(sim):
+    from projectq.cengines import LocalOptimizer
+    from projectq.meta import ClassicalControl
+    eng = MainEngine(sim, [LocalOptimizer(5)])
+    qureg = eng.allocate_qureg(3)
+    X | qureg[0]
+    Measure | qureg[0]
+    Measure | qureg[1]
+    with ClassicalControl(eng, qureg[0]):
+        X | qureg[2]
+    with ClassicalControl(eng, qureg[:2]):
+        X | qureg[0]
+    # measuring qureg[0] again must not affect the previous conditions
+    X | qureg[0]
+    Measure | qureg[0]
+    with ClassicalControl(eng, qureg[0]):
+        H | qureg[1]
+    Measure | qureg[2]
+    with Loop(eng, 3):
+        with ClassicalControl(eng, qureg[2]):
+            X | qureg[1]
+        with ClassicalControl(eng, qureg[0]):
+            Rx(0.2) | qureg[2]
+    All(Measure) | qureg
+    assert [int(qubit) for qubit in qureg] == [0, 1, 1]
+    assert len(sim._open_loops) == 0
+
+
+def test_simulator_classical_control_not_measured(sim):
+    from projectq.meta import ClassicalControl
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    with pytest.raises(RuntimeError):
+        with ClassicalControl(eng, qureg[0]):
+            X | qureg[1]
+
+
+def _variational_circuit(eng, qureg, theta, phi):
+    All(H) | qureg
+    Rx(theta) | qureg[0]
+    Rx(theta) | qureg[0]
+    with Control(eng, qureg[0]):
+        Rz(phi - 0.5) | qureg[1]
+    TimeEvolution(phi, QubitOperator("X0 Y1", 0.3)) | qureg
+    Ry(-theta) | qureg[1]
+
+
+def test_simulator_bind(sim):
+    from projectq.cengines import TapeRecorder
+    from projectq.ops import Parameter
+    from projectq.setups.default import default_engines
+    recorder = TapeRecorder()
+    eng = MainEngine(sim, default_engines() + [recorder])
+    qureg = eng.allocate_qureg(2)
+    values = [(0.3, 1.2), (-2.1, 0.4), (0.3, 1.2)]
+    sim.bind({"theta": values[0][0], "phi": values[0][1]})
+    with recorder.record() as tape:
+        _variational_circuit(eng, qureg, Parameter("theta"),
+                             Parameter("phi"))
+    # the rotations have been merged symbolically
+    assert sum(1 for gate in tape.gates if isinstance(gate, Rx)) == 1
+    for i, (theta, phi) in enumerate(values):
+        if i > 0:
+            All(Measure) | qureg
+            eng.flush()
+            for qubit in qureg:
+                if int(qubit):
+                    X | qubit
+            sim.bind({"theta": theta, "phi": phi})
+            recorder.replay(tape)
+            eng.flush()
+        ref_eng = MainEngine(_reference_simulator(), [])
+        ref_qureg = ref_eng.allocate_qureg(2)
+        _variational_circuit(ref_eng, ref_qureg, theta, phi)
+        ref_eng.flush()
+        bit_strings = ["00", "01", "10", "11"]
+        state = [sim.get_amplitude(bits, qureg) for bits in bit_strings]
+        expected = [ref_eng.backend.get_amplitude(bits, ref_qureg)
+                    for bits in bit_strings]
+        # equal up to the global phase left by the measurements
+        assert numpy.isclose(abs(numpy.vdot(state, expected)), 1.)
+        All(Measure) | ref_qureg
+    All(Measure) | qureg
+
+
+def test_simulator_bind_missing_value(sim):
+    from projectq.ops import Parameter
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    sim.bind({"phi": 0.2})
+    assert sim.is_available(Command(eng, Rx(Parameter("theta")), (qubit,)))
+    with pytest.raises(ValueError):
+        Rx(Parameter("theta")) | qubit
+    Rx(Parameter("phi")) | qubit
+    Measure | qubit
+
+
+def _gradient_circuit(eng, qureg, theta, phi):
+    All(H) | qureg
+    Rx(theta) | qureg[0]
+    Ry(2 * phi + 0.1) | qureg[1]
+    CNOT | (qureg[0], qureg[2])
+    with Control(eng, qureg[0]):
+        Rz(theta - phi) | qureg[1]
+        R(phi) | qureg[2]
+    with Control(eng, qureg[1:]):
+        Ph(theta) | qureg[0]
+    TimeEvolution(phi, QubitOperator("X0 Y2", 0.3) +
+                  QubitOperator("Z1", -0.7)) | qureg
+    with Control(eng, qureg[2]):
+        TimeEvolution(theta, QubitOperator("Y0 Z1", 0.4)) | qureg[:2]
+    Rz(-theta) | qureg[2]
+
+
+def test_simulator_expectation_value_gradient(sim):
+    from projectq.cengines import TapeRecorder
+    from projectq.ops import Parameter
+    recorder = TapeRecorder()
+    eng = MainEngine(sim, [recorder])
+    qureg = eng.allocate_qureg(3)
+    operator = QubitOperator("Z0 X1", 0.8) + QubitOperator("Y2", -0.3)
+    theta, phi = 0.7, -1.3
+    sim.bind({"theta": theta, "phi": phi})
+    with recorder.record() as tape:
+        _gradient_circuit(eng, qureg, Parameter("theta"), Parameter("phi"))
+    state = [sim.get_amplitude(bits, qureg) for bits in ["000", "101"]]
+    gradient = sim.get_expectation_value_gradient(operator, qureg, tape)
+    # the wave function is restored
+    assert numpy.allclose(
+        [sim.get_amplitude(bits, qureg) for bits in ["000", "101"]], state)
+
+    def expectation(theta, phi):
+        ref_eng = MainEngine(_reference_simulator(), [])
+        ref_qureg = ref_eng.allocate_qureg(3)
+        _gradient_circuit(ref_eng, ref_qureg, theta, phi)
+        ref_eng.flush()
+        value = ref_eng.backend.get_expectation_value(operator, ref_qureg)
+        All(Measure) | ref_qureg
+        return value
+
+    eps = 1e-6
+    assert set(gradient) == set(["theta", "phi"])
+    assert gradient["theta"] == pytest.approx(
+        (expectation(theta + eps, phi) - expectation(theta - eps, phi)) /
+        (2 * eps), abs=1e-6)
+    assert gradient["phi"] == pytest.approx(
+        (expectation(theta, phi + eps) - expectation(theta, phi - eps)) /
+        (2 * eps), abs=1e-6)
+    All(Measure) | qureg
+
+
+def test_simulator_expectation_value_gradient_errors(sim):
+    from projectq.cengines import TapeRecorder
+    from projectq.ops import Parameter
+    recorder = TapeRecorder()
+    eng = MainEngine(sim, [recorder])
+    qureg = eng.allocate_qureg(2)
+    sim.bind({"theta": 0.5})
+    with recorder.record() as tape:
+        Rx(Parameter("theta")) | qureg[0]
+        Measure | qureg[1]
+    with pytest.raises(ValueError):
+        sim.get_expectation_value_gradient(QubitOperator("Z0"), qureg, tape)
+    with pytest.raises(Exception):
+        sim.get_expectation_value_gradient(QubitOperator("Z2"), qureg, tape)
+    All(Measure) | qureg
@@ -0,0 +1,138 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the SparseSimulator, a Simulator which stores only the nonzero
+amplitudes of the state vector while the state is sparse.
+"""
+
+import random
+
+import numpy as np
+
+from ._simulator import Simulator, SimulatorBackend
+from ._sparsesim import Simulator as SparseSimulatorBackend
+
+# sparse states with at most this many nonzero amplitudes are never moved to
+# the dense simulator
+_MIN_DENSE_AMPLITUDES = 64
+
+
+class SparseSimulator(Simulator):
+    """
+    SparseSimulator is a Simulator which keeps the state vector as a
+    dictionary of its nonzero amplitudes for as long as the state is sparse.
+
+    Circuits consisting mostly of permutation gates (X, CNOT, Toffoli, Swap)
+    and math gates (e.g., reversible arithmetic or the modular
+    multiplications of Shor's algorithm on basis states) only have a handful
+    of nonzero amplitudes, such that they can be simulated on many more
+    qubits than fit into a dense state vector.
+
+    Once the fraction of nonzero amplitudes exceeds max_fill_ratio (and the
+    dense state vector has at most max_dense_qubits qubits), the state is
+    moved to the dense simulator, which is used from then on. The check is
+    performed after every command outside of loop bodies; states with at
+    most 64 nonzero amplitudes always remain sparse.
+
+    The interface is the same as the one of the Simulator; in addition,
+    cheat_sparse returns only the nonzero amplitudes of the state vector
+    and, while the state is sparse, set_wavefunction also accepts a
+    dictionary mapping the indices of basis states to their amplitudes.
+
+    Example:
+        .. code-block:: python
+
+            eng = MainEngine(SparseSimulator())
+            qureg = eng.allocate_qureg(64)
+            X | qureg[0]
+            AddConstantModN(5, 2 ** 40 + 15) | qureg[:41]
+    """
+    def __init__(self, rnd_seed=None, max_fill_ratio=1. / 32,
+                 max_dense_qubits=28):
+        """
+        Initialize the SparseSimulator.
+
+        Args:
+            rnd_seed (int): Random seed (uses random.randint(0, 1024) by
+                default).
+            max_fill_ratio (float): Fraction of nonzero amplitudes above
+                which the simulator switches to a dense state vector.
+            max_dense_qubits (int): Maximal number of qubits of a dense state
+                vector (larger states remain sparse).
+        """
+        if rnd_seed is None:
+            rnd_seed = random.randint(0, 1024)
+        Simulator.__init__(self, rnd_seed=rnd_seed)
+        self._random = random.Random(rnd_seed)
+        self._simulator = SparseSimulatorBackend(self._random.randint(0,
+                                                                      1024))
+        self.max_fill_ratio = max_fill_ratio
+        self.max_dense_qubits = max_dense_qubits
+
+    @property
+    def is_sparse(self):
+        """ True while the state vector is stored sparsely. """
+        return isinstance(self._simulator, SparseSimulatorBackend)
+
+    def cheat_sparse(self):
+        """
+        Access the ordering of the qubits and the nonzero amplitudes of the
+        state vector directly (see cheat, which returns the dense state
+        vector of 2^n amplitudes).
+
+        Returns:
+            A tuple where the first entry is a dictionary mapping qubit
+            indices to bit-locations and the second entry is a dictionary
+            mapping the indices of the basis states to their nonzero
+            amplitudes.
+        """
+        if self.is_sparse:
+            return self._simulator.cheat_sparse()
+        mapping, state = self._simulator.cheat()
+        state = np.asarray(state)
+        return (mapping, dict((int(i), state[i])
+                              for i in np.flatnonzero(state)))
+
+    def _make_dense(self):
+        """
+        Move the state to the dense simulator.
+        """
+        mapping, sparse_state = self._simulator.cheat_sparse()
+        ordering = sorted(mapping, key=mapping.get)
+        state = np.zeros(1 << len(ordering), dtype=complex)
+        for index, amplitude in sparse_state.items():
+            state[index] = amplitude
+        simulator = SimulatorBackend(self._random.randint(0, 1024))
+        for qubit_id in ordering:
+            simulator.allocate_qubit(qubit_id)
+        simulator.set_wavefunction(state, ordering)
+        self._simulator = simulator
+
+    def _receive_command(self, cmd):
+        """
+        Handle the command (see Simulator._receive_command) and switch to
+        the dense simulator if the state is no longer sparse.
+
+        Args:
+            cmd (Command): Command to handle.
+        """
+        Simulator._receive_command(self, cmd)
+        if not self.is_sparse or len(self._open_loops) > 0:
+            return
+        mapping, state = self._simulator.cheat_sparse()
+        if (len(mapping) <= self.max_dense_qubits and
+                len(state) > max(_MIN_DENSE_AMPLITUDES,
+                                 self.max_fill_ratio * 2 ** len(mapping))):
+            self._make_dense()
@@ -0,0 +1,105 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Tests for projectq.backends._sim._sparse_simulator.py (the kernels of
+_sparsesim.py are tested by _simulator_test.py).
+"""
+
+import math
+
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import SparseSimulator
+from projectq.libs.math import AddConstantModN
+from projectq.ops import All, CNOT, H, Measure, QubitOperator, X
+
+
+def test_sparse_simulator_arithmetic():
+    sim = SparseSimulator(rnd_seed=1)
+    eng = MainEngine(sim)
+    qureg = eng.allocate_qureg(60)
+    X | qureg[0]
+    X | qureg[2]
+    AddConstantModN(7, 2 ** 40 + 15) | qureg[:41]
+    H | qureg[50]
+    CNOT | (qureg[50], qureg[59])
+    eng.flush()
+    assert sim.is_sparse
+    mapping, state = sim.cheat_sparse()
+    assert len(mapping) == 60
+    assert len(state) == 2
+    bits = [0] * 60
+    bits[2] = bits[3] = 1  # 5 + 7 = 12
+    assert sim.get_amplitude(bits, qureg) == pytest.approx(1. / math.sqrt(2))
+    assert sim.get_probability([0, 0, 1, 1], qureg[:4]) == pytest.approx(1.)
+    assert sim.get_probability([1, 1], qureg[50::9]) == pytest.approx(.5)
+    assert sim.get_expectation_value(QubitOperator("Z50 Z59"),
+                                     qureg) == pytest.approx(1.)
+    All(Measure) | qureg
+    assert int(qureg[50]) == int(qureg[59])
+    assert [int(qubit) for qubit in qureg[:5]] == [0, 0, 1, 1, 0]
+
+
+def test_sparse_simulator_switches_to_dense():
+    sim = SparseSimulator(rnd_seed=1)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(8)
+    All(H) | qureg[:6]
+    eng.flush()
+    # states with at most 64 nonzero amplitudes remain sparse
+    assert sim.is_sparse
+    H | qureg[6]
+    eng.flush()
+    assert not sim.is_sparse
+    mapping, state = sim.cheat_sparse()
+    assert len(state) == 128
+    bits = [1, 0, 1, 0, 1, 0, 1, 0]
+    assert sim.get_amplitude(bits, qureg) == pytest.approx(
+        1. / math.sqrt(128))
+    assert sim.cheat()[0] == mapping
+    All(Measure) | qureg
+    assert int(qureg[7]) == 0
+
+
+def test_sparse_simulator_max_dense_qubits():
+    sim = SparseSimulator(max_dense_qubits=7)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(8)
+    All(H) | qureg
+    eng.flush()
+    assert sim.is_sparse
+    assert len(sim.cheat_sparse()[1]) == 256
+    assert len(sim.cheat()[1]) == 256
+    All(H) | qureg
+    eng.flush()
+    assert sim.cheat_sparse()[1] == {0: pytest.approx(1.)}
+    All(Measure) | qureg
+
+
+def test_sparse_simulator_set_wavefunction():
+    sim = SparseSimulator()
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(40)
+    eng.flush()
+    # the wavefunction may be given by its nonzero amplitudes
+    sim.set_wavefunction({0: .6, 1 << 39: .8j}, qureg)
+    assert sim.get_probability([1], qureg[-1:]) == pytest.approx(.64)
+    assert sim.get_amplitude([0] * 40, qureg) == pytest.approx(.6)
+    with pytest.raises(RuntimeError):
+        sim.set_wavefunction({0: 1.}, qureg[1:])
+    with pytest.raises(RuntimeError):
+        sim._simulator.deallocate_qubit(qureg[-1].id)
+    All(Measure) | qureg
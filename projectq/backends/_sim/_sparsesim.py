@@ -0,0 +1,584 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains a sparse Python simulator, which stores only the nonzero amplitudes
+of the state vector (in a dictionary).
+
+It has the same interface as the (dense) Python and C++ simulators and is
+used by the SparseSimulator backend.
+"""
+
+import cmath
+import random
+import numpy as _np
+
+try:
+    from time import perf_counter as _clock
+except ImportError:  # pragma: no cover
+    from time import time as _clock
+
+# amplitudes of smaller magnitude are dropped from the state
+_TOLERANCE = 1.e-12
+
+# factors of the Pauli matrices: sigma|b> = factor(b) |b xor flip>
+_PAULI_PHASES = {'X': (1., 1.), 'Y': (1j, -1j), 'Z': (1., -1.)}
+
+
+def _spread_bits(value, positions):
+    """
+    Return the index with bit positions[i] set to bit i of value.
+    """
+    index = 0
+    for i, pos in enumerate(positions):
+        index |= ((value >> i) & 1) << pos
+    return index
+
+
+class Simulator(object):
+    """
+    Sparse Python implementation of a quantum computer simulator.
+
+    The state is a dictionary mapping the indices of the basis states to
+    their (nonzero) amplitudes, such that the cost of all operations scales
+    with the number of nonzero amplitudes instead of 2^n. This pays off for
+    circuits whose states remain sparse, e.g., reversible arithmetic on
+    basis states (see emulate_math).
+    """
+    def __init__(self, rnd_seed, *args, **kwargs):
+        """
+        Initialize the simulator.
+
+        Args:
+            rnd_seed (int): Seed to initialize the random number generator.
+            args: Dummy argument to allow an interface identical to the c++
+                simulator.
+            kwargs: Same as args.
+        """
+        self._random = random.Random(rnd_seed)
+        self._state = {0: 1. + 0j}
+        self._map = dict()
+        self._num_qubits = 0
+        self.reset_stats()
+
+    def stats(self):
+        """
+        Return the counters of the simulator (see Simulator.stats of the
+        ProjectQ simulator backend). Gates are applied one by one, i.e., each
+        fused block consists of a single gate; bytes and flops are counted
+        for the nonzero amplitudes only.
+        """
+        stats = dict(self._stats)
+        stats["kernel_calls"] = dict(stats["kernel_calls"])
+        stats["fused_block_sizes"] = dict(stats["fused_block_sizes"])
+        stats["time"] = dict(stats["time"])
+        return stats
+
+    def reset_stats(self):
+        """
+        Reset all counters of the simulator to zero.
+        """
+        self._stats = {"kernel_calls": dict(),
+                       "fused_block_sizes": dict(),
+                       "time": {"fusion": 0., "kernel": 0., "measure": 0.,
+                                "allocation": 0., "emulate_math": 0.,
+                                "time_evolution": 0.},
+                       "emulate_math_gil_time": 0.,
+                       "bytes": 0.,
+                       "flops": 0.}
+
+    def _add_time(self, phase, start):
+        self._stats["time"][phase] += _clock() - start
+
+    def cheat(self):
+        """
+        Return the qubit index to bit location map and the corresponding state
+        vector (as a dense array of 2^n amplitudes, see cheat_sparse).
+
+        Returns:
+            A tuple where the first entry is a dictionary mapping qubit indices
+            to bit-locations and the second entry is the corresponding state
+            vector
+        """
+        state = _np.zeros(1 << self._num_qubits, dtype=_np.complex128)
+        for i, amplitude in self._state.items():
+            state[i] = amplitude
+        return (self._map, state)
+
+    def cheat_sparse(self):
+        """
+        Return the qubit index to bit location map and the nonzero amplitudes
+        of the state vector.
+
+        Returns:
+            A tuple where the first entry is a dictionary mapping qubit indices
+            to bit-locations and the second entry is a dictionary mapping the
+            indices of the basis states to their nonzero amplitudes.
+        """
+        return (self._map, self._state)
+
+    def measure_qubits(self, ids):
+        """
+        Measure the qubits with IDs ids and return a list of measurement
+        outcomes (True/False).
+
+        Args:
+            ids (list<int>): List of qubit IDs to measure.
+
+        Returns:
+            List of measurement results (containing either True or False).
+        """
+        start = _clock()
+        P = self._random.random()
+        val = 0.
+        i_picked = None
+        for i, amplitude in self._state.items():
+            i_picked = i
+            val += abs(amplitude) ** 2
+            if val >= P:
+                break
+
+        pos = [self._map[ID] for ID in ids]
+        res = [((i_picked >> p) & 1) == 1 for p in pos]
+        mask = _spread_bits((1 << len(pos)) - 1, pos)
+        val = _spread_bits(sum(int(r) << i for i, r in enumerate(res)), pos)
+        self._collapse(mask, val)
+        self._add_time("measure", start)
+        return res
+
+    def _collapse(self, mask, val):
+        """
+        Project the state onto the basis states i with (i & mask) == val and
+        normalize it (returning the norm before normalization).
+        """
+        state = dict((i, amplitude) for i, amplitude in self._state.items()
+                     if (i & mask) == val)
+        nrm = sum(abs(amplitude) ** 2 for amplitude in state.values())
+        if nrm > 0.:
+            inv_nrm = 1. / _np.sqrt(nrm)
+            for i in state:
+                state[i] *= inv_nrm
+            self._state = state
+        return nrm
+
+    def allocate_qubit(self, ID):
+        """
+        Allocate a qubit.
+
+        Args:
+            ID (int): ID of the qubit which is being allocated.
+        """
+        self._map[ID] = self._num_qubits
+        self._num_qubits += 1
+
+    def get_classical_value(self, ID, tol=1.e-10):
+        """
+        Return the classical value of a classical bit (i.e., a qubit which has
+        been measured / uncomputed).
+
+        Args:
+            ID (int): ID of the qubit of which to get the classical value.
+            tol (float): Tolerance for numerical errors when determining
+                whether the qubit is indeed classical.
+
+        Raises:
+            RuntimeError: If the qubit is in a superposition, i.e., has not
+                been measured / uncomputed.
+        """
+        pos = self._map[ID]
+        up = down = False
+        for i, amplitude in self._state.items():
+            if abs(amplitude) > tol:
+                if (i >> pos) & 1:
+                    down = True
+                else:
+                    up = True
+                if up and down:
+                    raise RuntimeError("Qubit has not been measured / "
+                                       "uncomputed. Cannot access its "
+                                       "classical value and/or deallocate a "
+                                       "qubit in superposition!")
+        return down
+
+    def deallocate_qubit(self, ID):
+        """
+        Deallocate a qubit (if it has been measured / uncomputed).
+
+        Args:
+            ID (int): ID of the qubit to deallocate.
+
+        Raises:
+            RuntimeError: If the qubit is in a superposition, i.e., has not
+                been measured / uncomputed.
+        """
+        start = _clock()
+        pos = self._map[ID]
+        cv = int(self.get_classical_value(ID))
+        low = (1 << pos) - 1
+        self._state = dict(((i & low) | ((i >> (pos + 1)) << pos), amplitude)
+                           for i, amplitude in self._state.items()
+                           if (i >> pos) & 1 == cv)
+        newmap = dict()
+        for key, value in self._map.items():
+            if value > pos:
+                newmap[key] = value - 1
+            elif key != ID:
+                newmap[key] = value
+        self._map = newmap
+        self._num_qubits -= 1
+        self._add_time("allocation", start)
+
+    def _get_control_mask(self, ctrlids):
+        """
+        Get control mask from list of control qubit IDs.
+
+        Returns:
+            A mask which represents the control qubits in binary.
+        """
+        mask = 0
+        for ctrlid in ctrlids:
+            mask |= (1 << self._map[ctrlid])
+        return mask
+
+    def emulate_math(self, f, qubit_ids, ctrlqubit_ids):
+        """
+        Emulate a math function (e.g., BasicMathGate).
+
+        Only the nonzero amplitudes are permuted, i.e., f is evaluated once
+        per nonzero amplitude.
+
+        Args:
+            f (function): Function executing the operation to emulate.
+            qubit_ids (list<list<int>>): List of lists of qubit IDs to which
+                the gate is being applied. Every gate is applied to a tuple of
+                quantum registers, which corresponds to this 'list of lists'.
+            ctrlqubit_ids (list<int>): List of control qubit ids.
+        """
+        start = _clock()
+        mask = self._get_control_mask(ctrlqubit_ids)
+        qb_locs = [[self._map[qubit_id] for qubit_id in qureg]
+                   for qureg in qubit_ids]
+        qureg_masks = [_spread_bits((1 << len(locs)) - 1, locs)
+                       for locs in qb_locs]
+        newstate = dict()
+        for i, amplitude in self._state.items():
+            if (mask & i) == mask:
+                arg_list = [sum(((i >> loc) & 1) << qb_i
+                                for qb_i, loc in enumerate(locs))
+                            for locs in qb_locs]
+                res = f(arg_list)
+                new_i = i
+                for qr_i, locs in enumerate(qb_locs):
+                    new_i = ((new_i & ~qureg_masks[qr_i]) |
+                             _spread_bits(res[qr_i], locs))
+                newstate[new_i] = amplitude
+            else:
+                newstate[i] = amplitude
+        self._state = newstate
+        # all of the emulation is executed holding the GIL
+        duration = _clock() - start
+        self._stats["time"]["emulate_math"] += duration
+        self._stats["emulate_math_gil_time"] += duration
+
+    def _apply_term(self, term, ids, state):
+        """
+        Return a Pauli string (one term of a QubitOperator) applied to a
+        (sparse) state.
+
+        Args:
+            term: One term of QubitOperator.terms
+            ids (list[int]): Term index to Qubit ID mapping
+            state (dict): State to which to apply the term.
+        """
+        flip = 0
+        phases = []
+        for index, action in term:
+            pos = self._map[ids[index]]
+            if action != 'Z':
+                flip |= 1 << pos
+            phases.append((pos, _PAULI_PHASES[action]))
+        result = dict()
+        for i, amplitude in state.items():
+            for pos, phase in phases:
+                amplitude *= phase[(i >> pos) & 1]
+            result[i ^ flip] = amplitude
+        return result
+
+    def get_expectation_value(self, terms_dict, ids):
+        """
+        Return the expectation value of a qubit operator w.r.t. qubit ids.
+
+        Args:
+            terms_dict (dict): Operator dictionary (see QubitOperator.terms)
+            ids (list[int]): List of qubit ids upon which the operator acts.
+
+        Returns:
+            Expectation value
+        """
+        expectation = 0.
+        for term, coefficient in terms_dict:
+            applied = self._apply_term(term, ids, self._state)
+            overlap = sum(self._state.get(i, 0.).conjugate() * amplitude
+                          for i, amplitude in applied.items())
+            expectation += coefficient * overlap.real
+        return expectation
+
+    def _add_scaled(self, result, state, coefficient):
+        """ Add coefficient times state to result (in place). """
+        for i, amplitude in state.items():
+            result[i] = result.get(i, 0.) + coefficient * amplitude
+
+    def _drop_zeros(self, state):
+        """ Return the state without (numerically) vanishing amplitudes. """
+        return dict((i, amplitude) for i, amplitude in state.items()
+                    if abs(amplitude) > _TOLERANCE)
+
+    def apply_qubit_operator(self, terms_dict, ids):
+        """
+        Apply a (possibly non-unitary) qubit operator to qubits.
+
+        Args:
+            terms_dict (dict): Operator dictionary (see QubitOperator.terms)
+            ids (list[int]): List of qubit ids upon which the operator acts.
+        """
+        new_state = dict()
+        for term, coefficient in terms_dict:
+            self._add_scaled(new_state, self._apply_term(term, ids,
+                                                         self._state),
+                             coefficient)
+        self._state = self._drop_zeros(new_state)
+
+    def get_probability(self, bit_string, ids):
+        """
+        Return the probability of the outcome `bit_string` when measuring
+        the qubits given by the list of ids.
+
+        Args:
+            bit_string (list[bool|int]): Measurement outcome.
+            ids (list[int]): List of qubit ids determining the ordering.
+
+        Returns:
+            Probability of measuring the provided bit string.
+
+        Raises:
+            RuntimeError if an unknown qubit id was provided.
+        """
+        if not all(ID in self._map for ID in ids):
+            raise RuntimeError("get_probability(): Unknown qubit id. "
+                               "Please make sure you have called "
+                               "eng.flush().")
+        mask = 0
+        bit_str = 0
+        for i in range(len(ids)):
+            mask |= (1 << self._map[ids[i]])
+            bit_str |= (int(bit_string[i]) << self._map[ids[i]])
+        return sum(abs(amplitude) ** 2
+                   for i, amplitude in self._state.items()
+                   if (i & mask) == bit_str)
+
+    def get_amplitude(self, bit_string, ids):
+        """
+        Return the probability amplitude of the supplied `bit_string`.
+        The ordering is given by the list of qubit ids.
+
+        Args:
+            bit_string (list[bool|int]): Computational basis state
+            ids (list[int]): List of qubit ids determining the
+                ordering. Must contain all allocated qubits.
+
+        Returns:
+            Probability amplitude of the provided bit string.
+
+        Raises:
+            RuntimeError if the second argument is not a permutation of all
+            allocated qubits.
+        """
+        if not set(ids) == set(self._map):
+            raise RuntimeError("The second argument to get_amplitude() must"
+                               " be a permutation of all allocated qubits. "
+                               "Please make sure you have called "
+                               "eng.flush().")
+        index = 0
+        for i in range(len(ids)):
+            index |= (int(bit_string[i]) << self._map[ids[i]])
+        return self._state.get(index, 0j)
+
+    def emulate_time_evolution(self, terms_dict, time, ids, ctrlids):
+        """
+        Applies exp(-i*time*H) to the wave function, i.e., evolves under
+        the Hamiltonian H for a given time. The terms in the Hamiltonian
+        are not required to commute.
+
+        This function computes the action of the matrix exponential using
+        the same truncated Taylor series as the (dense) Python simulator.
+
+        Args:
+            terms_dict (dict): Operator dictionary (see QubitOperator.terms)
+                defining the Hamiltonian.
+            time (scalar): Time to evolve for
+            ids (list): A list of qubit IDs to which to apply the evolution.
+            ctrlids (list): A list of control qubit IDs.
+        """
+        start = _clock()
+        tr = sum([c for (t, c) in terms_dict if len(t) == 0])
+        terms_dict = [(t, c) for (t, c) in terms_dict if len(t) > 0]
+        op_nrm = abs(time) * sum([abs(c) for (_, c) in terms_dict])
+        s = int(op_nrm + 1.)
+        correction = cmath.exp(-1j * time * tr / float(s))
+        # the terms act on the target qubits only, such that the subspace
+        # with all controls 1 evolves independently (and the rest is left
+        # unchanged)
+        mask = self._get_control_mask(ctrlids)
+        state = dict((i, amplitude) for i, amplitude in self._state.items()
+                     if (i & mask) == mask)
+        for i in range(s):
+            output_state = dict(state)
+            j = 0
+            nrm_change = 1.
+            while nrm_change > 1.e-12:
+                coeff = (-time * 1j) / float(s * (j + 1))
+                update = dict()
+                for t, c in terms_dict:
+                    self._add_scaled(update, self._apply_term(t, ids, state),
+                                     coeff * c)
+                self._add_scaled(output_state, update, 1.)
+                state = update
+                nrm_change = _np.sqrt(sum(abs(amplitude) ** 2
+                                          for amplitude in update.values()))
+                j += 1
+            state = self._drop_zeros(output_state)
+            for index in state:
+                state[index] *= correction
+        for i, amplitude in self._state.items():
+            if (i & mask) != mask:
+                state[i] = amplitude
+        self._state = state
+        self._add_time("time_evolution", start)
+
+    def apply_controlled_gate(self, m, ids, ctrlids):
+        """
+        Applies the k-qubit gate matrix m to the qubits with indices ids,
+        using ctrlids as control qubits.
+
+        Each nonzero amplitude is mapped to the nonzero entries of the
+        corresponding column of m, i.e., permutation gates (such as X, CNOT
+        or Swap) keep the number of nonzero amplitudes unchanged.
+
+        Args:
+            m (list[list] or numpy.ndarray): 2^k x 2^k complex matrix
+                describing the k-qubit gate.
+            ids (list): A list containing the qubit IDs to which to apply the
+                gate.
+            ctrlids (list): A list of control qubit IDs (i.e., the gate is
+                only applied where these qubits are 1).
+        """
+        start = _clock()
+        m = _np.asarray(m)
+        mask = self._get_control_mask(ctrlids)
+        pos = [self._map[ID] for ID in ids]
+        target_mask = _spread_bits((1 << len(pos)) - 1, pos)
+        offsets = [_spread_bits(value, pos) for value in range(len(m))]
+        # nonzero entries (row offset, value) of each column
+        columns = [[(offsets[row], complex(m[row, col]))
+                    for row in range(len(m)) if m[row, col] != 0]
+                   for col in range(len(m))]
+        column_of_offset = dict((offset, columns[col])
+                                for col, offset in enumerate(offsets))
+        newstate = dict()
+        num_entries = 0
+        for i, amplitude in self._state.items():
+            if (i & mask) != mask:
+                newstate[i] = newstate.get(i, 0.) + amplitude
+                continue
+            base = i & ~target_mask
+            column = column_of_offset[i & target_mask]
+            num_entries += len(column)
+            for offset, value in column:
+                index = base | offset
+                newstate[index] = newstate.get(index, 0.) + value * amplitude
+        self._state = self._drop_zeros(newstate)
+        self._add_time("kernel", start)
+        stats = self._stats
+        kernel_calls = stats["kernel_calls"]
+        kernel_calls[len(ids)] = kernel_calls.get(len(ids), 0) + 1
+        block_sizes = stats["fused_block_sizes"]
+        block_sizes[1] = block_sizes.get(1, 0) + 1
+        stats["bytes"] += 16. * (len(self._state) + num_entries)
+        stats["flops"] += 8. * num_entries
+
+    def set_wavefunction(self, wavefunction, ordering):
+        """
+        Set wavefunction and qubit ordering.
+
+        Args:
+            wavefunction (list[complex] or dict): Array of complex amplitudes
+                describing the wavefunction (must be normalized), or a
+                dictionary mapping the indices of basis states to their
+                amplitudes (see cheat).
+            ordering (list): List of ids describing the new ordering of qubits
+                (i.e., the ordering of the provided wavefunction).
+        """
+        if isinstance(wavefunction, dict):
+            state = dict((i, complex(amplitude))
+                         for i, amplitude in wavefunction.items())
+        else:
+            # wavefunction contains 2^n values for n qubits
+            assert len(wavefunction) == (1 << len(ordering))
+            state = dict((i, complex(amplitude))
+                         for i, amplitude in enumerate(wavefunction))
+        # all qubits must have been allocated before
+        if (not all([Id in self._map for Id in ordering])
+                or len(self._map) != len(ordering)):
+            raise RuntimeError("set_wavefunction(): Invalid mapping provided."
+                               " Please make sure all qubits have been "
+                               "allocated previously (call eng.flush()).")
+        self._state = self._drop_zeros(state)
+        self._map = {ordering[i]: i for i in range(len(ordering))}
+
+    def collapse_wavefunction(self, ids, values):
+        """
+        Collapse a quantum register onto a classical basis state.
+
+        Args:
+            ids (list[int]): Qubit IDs to collapse.
+            values (list[bool]): Measurement outcome for each of the qubit IDs
+                in `ids`.
+        Raises:
+            RuntimeError: If probability of outcome is ~0 or unknown qubits
+                are provided.
+        """
+        assert len(ids) == len(values)
+        # all qubits must have been allocated before
+        if not all([Id in self._map for Id in ids]):
+            raise RuntimeError("collapse_wavefunction(): Unknown qubit id(s)"
+                               " provided. Try calling eng.flush() before "
+                               "invoking this function.")
+        mask = 0
+        val = 0
+        for i in range(len(ids)):
+            pos = self._map[ids[i]]
+            mask |= (1 << pos)
+            val |= (int(values[i]) << pos)
+        nrm = sum(abs(amplitude) ** 2 for i, amplitude in self._state.items()
+                  if (i & mask) == val)
+        if nrm < 1.e-12:
+            raise RuntimeError("collapse_wavefunction(): Invalid collapse! "
+                               "Probability is ~0.")
+        self._collapse(mask, val)
+
+    def run(self):
+        """
+        Dummy function to implement the same interface as the c++ simulator.
+        """
+        pass
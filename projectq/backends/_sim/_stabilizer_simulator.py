@@ -0,0 +1,454 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the StabilizerSimulator, which simulates Clifford circuits on
+stabilizer states using the tableau algorithm of Aaronson and Gottesman
+("Improved simulation of stabilizer circuits", Phys. Rev. A 70, 052328).
+"""
+
+import math
+import random
+
+import numpy as np
+
+from projectq.cengines import BasicEngine
+from projectq.meta import get_control_count
+from projectq.ops import (AllocateQubitGate,
+                          DaggeredGate,
+                          DeallocateQubitGate,
+                          FlushGate,
+                          HGate,
+                          MeasureGate,
+                          Ph,
+                          R,
+                          Rx,
+                          Ry,
+                          Rz,
+                          SGate,
+                          SwapGate,
+                          XGate,
+                          YGate,
+                          ZGate)
+
+# rotation angles which differ from a multiple of pi/2 by less than this are
+# Clifford gates
+_ANGLE_TOLERANCE = 1.e-9
+
+# number of qubits for which the tableau is allocated initially (it doubles
+# whenever it is full)
+_INITIAL_CAPACITY = 8
+
+
+def _get_quarter_turns(gate):
+    """
+    Return the number of quarter turns k (0 <= k < 4) of a rotation gate
+    Rx, Ry, Rz or R whose angle is a multiple k * pi/2 (modulo 2 pi), or None
+    if the angle is no such multiple (or symbolic).
+    """
+    if len(gate.parameters) > 0:
+        return None
+    turns = gate._angle / (.5 * math.pi)
+    rounded = int(round(turns))
+    if abs(turns - rounded) > _ANGLE_TOLERANCE:
+        return None
+    return rounded % 4
+
+
+class StabilizerSimulator(BasicEngine):
+    """
+    StabilizerSimulator is a backend which simulates Clifford circuits on
+    stabilizer states, such that circuits on hundreds or thousands of qubits
+    (e.g., for error correction or randomized benchmarking) can be run.
+
+    The state of n qubits is stored as a tableau of n stabilizer and n
+    destabilizer generators (see Aaronson and Gottesman), such that each
+    gate takes O(n) and each measurement O(n^2) time.
+
+    The supported gates are H, S, Sdag, X, Y, Z, Swap, CNOT, CZ, CY (i.e., X,
+    Y and Z with one control qubit), rotations Rx, Ry, Rz and R by multiples
+    of pi/2 and global phases Ph (which are ignored), as well as
+    measurement, allocation and deallocation. All other gates are reported
+    unavailable (see is_available), such that an AutoReplacer decomposes
+    them into these gates.
+
+    Single-qubit rotations are reported available for all angles: All
+    decomposition rules for single-qubit gates end in rotations, and the
+    rotations of, e.g., T * T are only merged into a Clifford gate by a
+    LocalOptimizer following the AutoReplacer. (Global phases are reported
+    unavailable, such that the AutoReplacer removes them instead of leaving
+    them between rotations which could be merged.) Rotations by other angles
+    than multiples of pi/2 which reach the StabilizerSimulator (e.g., of a
+    single T gate or of a Toffoli gate) raise a ValueError.
+
+    Example:
+        .. code-block:: python
+
+            eng = MainEngine(StabilizerSimulator())
+            qureg = eng.allocate_qureg(1000)
+            H | qureg[0]
+            for i in range(999):
+                CNOT | (qureg[i], qureg[i + 1])
+            All(Measure) | qureg
+    """
+    def __init__(self, rnd_seed=None):
+        """
+        Initialize the StabilizerSimulator.
+
+        Args:
+            rnd_seed (int): Random seed for the measurements.
+        """
+        BasicEngine.__init__(self)
+        self._random = random.Random(rnd_seed)
+        # maps qubit ids to their columns of the tableau; the other columns
+        # are free qubits in state |0> (deallocated qubits are reset to |0>
+        # and reused)
+        self._columns = dict()
+        self._free_columns = []
+        self._capacity = 0
+        # rows 0..capacity-1 are the destabilizers, rows capacity.. are the
+        # stabilizers
+        self._x = np.zeros((0, 0), dtype=bool)
+        self._z = np.zeros((0, 0), dtype=bool)
+        self._r = np.zeros(0, dtype=bool)
+        self._grow(_INITIAL_CAPACITY)
+
+    def is_available(self, cmd):
+        """
+        Return True if the command is a Clifford gate supported by the
+        StabilizerSimulator, a single-qubit rotation (which must be a
+        Clifford gate once it is executed, see the class documentation), a
+        measurement, an allocation or a deallocation.
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        gate = cmd.gate
+        num_controls = get_control_count(cmd)
+        if isinstance(gate, (MeasureGate, AllocateQubitGate,
+                             DeallocateQubitGate, FlushGate)):
+            return num_controls == 0
+        if isinstance(gate, (XGate, YGate, ZGate)):
+            return num_controls <= 1
+        if num_controls > 0:
+            return False
+        if isinstance(gate, (HGate, SGate, SwapGate)):
+            return True
+        if isinstance(gate, DaggeredGate):
+            return isinstance(gate._gate, SGate)
+        return isinstance(gate, (Rx, Ry, Rz, R))
+
+    def get_probability(self, bit_string, qureg):
+        """
+        Return the probability of the outcome `bit_string` when measuring
+        the qubits given by qureg (without changing the state).
+
+        Args:
+            bit_string (list[bool|int]): Measurement outcome.
+            qureg (Qureg|list[Qubit]): Qubits to measure.
+
+        Returns:
+            Probability of measuring the provided bit string (which is 0 or
+            a power of 1/2).
+
+        Raises:
+            RuntimeError: If a qubit is unknown (call eng.flush() first).
+        """
+        columns = [self._get_column(qubit.id) for qubit in qureg]
+        tableau = (self._x, self._z, self._r)
+        self._x, self._z, self._r = (self._x.copy(), self._z.copy(),
+                                     self._r.copy())
+        probability = 1.
+        try:
+            for column, bit in zip(columns, bit_string):
+                result, is_random = self._measure(column, bool(bit))
+                if is_random:
+                    probability *= .5
+                elif result != bool(bit):
+                    return 0.
+        finally:
+            self._x, self._z, self._r = tableau
+        return probability
+
+    def get_expectation_value(self, qubit_operator, qureg):
+        """
+        Return the expectation value of a qubit operator (which is a
+        weighted sum of Pauli strings, each with expectation value 1, -1 or
+        0).
+
+        Args:
+            qubit_operator (projectq.ops.QubitOperator): Operator to measure.
+            qureg (Qureg|list[Qubit]): Qubits the operator acts on.
+
+        Returns:
+            Expectation value
+
+        Raises:
+            Exception: If `qubit_operator` acts on more qubits than present in
+                the `qureg` argument.
+        """
+        expectation = 0.
+        num_rows = self._capacity
+        for term, coeff in qubit_operator.terms.items():
+            if not term == () and term[-1][0] >= len(qureg):
+                raise Exception("qubit_operator acts on more qubits than "
+                                "contained in the qureg.")
+            # Pauli string (Y is represented by x = z = 1, as in the tableau)
+            x = np.zeros(num_rows, dtype=bool)
+            z = np.zeros(num_rows, dtype=bool)
+            for index, action in term:
+                column = self._get_column(qureg[index].id)
+                x[column] = action in 'XY'
+                z[column] = action in 'YZ'
+            # generators which anticommute with the Pauli string
+            anticommuting = ((self._x & z).sum(axis=1) +
+                             (self._z & x).sum(axis=1)) % 2 == 1
+            if np.any(anticommuting[num_rows:]):
+                continue
+            # otherwise, the Pauli string is (up to its sign) the product of
+            # the stabilizers whose destabilizers anticommute with it
+            sign = self._get_product(
+                num_rows + np.flatnonzero(anticommuting[:num_rows]))[2]
+            expectation += -coeff.real if sign else coeff.real
+        return expectation
+
+    def _get_column(self, qubit_id):
+        try:
+            return self._columns[qubit_id]
+        except KeyError:
+            raise RuntimeError("StabilizerSimulator: Unknown qubit id {} "
+                               "(call eng.flush() first).".format(qubit_id))
+
+    def _grow(self, capacity):
+        """
+        Increase the number of qubits of the tableau to capacity (the new
+        qubits are free and in state |0>).
+        """
+        old = self._capacity
+        x = np.zeros((2 * capacity, capacity), dtype=bool)
+        z = np.zeros((2 * capacity, capacity), dtype=bool)
+        r = np.zeros(2 * capacity, dtype=bool)
+        for rows, new_rows in ((slice(0, old), slice(0, old)),
+                               (slice(old, 2 * old),
+                                slice(capacity, capacity + old))):
+            x[new_rows, :old] = self._x[rows]
+            z[new_rows, :old] = self._z[rows]
+            r[new_rows] = self._r[rows]
+        for column in range(old, capacity):
+            x[column, column] = True
+            z[capacity + column, column] = True
+        self._x, self._z, self._r = x, z, r
+        self._free_columns.extend(range(capacity - 1, old - 1, -1))
+        self._capacity = capacity
+
+    def _rowsum(self, targets, source, x=None, z=None, r=None):
+        """
+        Multiply the generators (rows) targets by the generator source,
+        keeping track of the signs (rowsum of Aaronson and Gottesman).
+
+        If x, z and r are given, they are the rows to multiply (and are
+        updated in place) instead of the rows targets of the tableau.
+        """
+        in_tableau = x is None
+        if in_tableau:
+            x, z, r = self._x[targets], self._z[targets], self._r[targets]
+        x_source, z_source = self._x[source], self._z[source]
+        x_int, z_int = x.astype(np.int8), z.astype(np.int8)
+        # exponent of i of the product of the single-qubit Paulis
+        phase = np.where(x_source & z_source, z_int - x_int,
+                         np.where(x_source, z_int * (2 * x_int - 1),
+                                  np.where(z_source, x_int * (1 - 2 * z_int),
+                                           0)))
+        total = (phase.sum(axis=-1) + 2 * r.astype(np.int64) +
+                 2 * int(self._r[source])) % 4
+        r[...] = total == 2
+        x ^= x_source
+        z ^= z_source
+        if in_tableau:
+            self._x[targets], self._z[targets], self._r[targets] = x, z, r
+
+    def _get_product(self, rows):
+        """
+        Return the product (x, z, r) of the generators rows of the tableau.
+        """
+        x = np.zeros(self._capacity, dtype=bool)
+        z = np.zeros(self._capacity, dtype=bool)
+        r = np.zeros((), dtype=bool)
+        for row in rows:
+            self._rowsum(None, row, x, z, r)
+        return x, z, bool(r)
+
+    def _measure(self, column, outcome=None):
+        """
+        Measure the qubit of a column in the computational basis.
+
+        Args:
+            column (int): Column of the qubit.
+            outcome (bool): Outcome to choose if it is random (random by
+                default).
+
+        Returns:
+            Tuple of the outcome and whether it was random.
+        """
+        capacity = self._capacity
+        anticommuting = np.flatnonzero(self._x[capacity:, column])
+        if len(anticommuting) == 0:
+            destabilizers = np.flatnonzero(self._x[:capacity, column])
+            return self._get_product(capacity + destabilizers)[2], False
+        pivot = capacity + anticommuting[0]
+        targets = np.flatnonzero(self._x[:, column])
+        targets = targets[targets != pivot]
+        if len(targets) > 0:
+            self._rowsum(targets, pivot)
+        # the destabilizer becomes the old stabilizer, which is replaced by
+        # +-Z of the measured qubit
+        destabilizer = pivot - capacity
+        self._x[destabilizer] = self._x[pivot]
+        self._z[destabilizer] = self._z[pivot]
+        self._r[destabilizer] = self._r[pivot]
+        self._x[pivot] = False
+        self._z[pivot] = False
+        self._z[pivot, column] = True
+        if outcome is None:
+            outcome = self._random.random() < .5
+        self._r[pivot] = outcome
+        return outcome, True
+
+    def _apply_h(self, a):
+        self._r ^= self._x[:, a] & self._z[:, a]
+        x = self._x[:, a].copy()
+        self._x[:, a] = self._z[:, a]
+        self._z[:, a] = x
+
+    def _apply_s(self, a):
+        self._r ^= self._x[:, a] & self._z[:, a]
+        self._z[:, a] ^= self._x[:, a]
+
+    def _apply_sdag(self, a):
+        self._r ^= self._x[:, a] & ~self._z[:, a]
+        self._z[:, a] ^= self._x[:, a]
+
+    def _apply_pauli(self, a, action):
+        if action in 'XY':
+            self._r ^= self._z[:, a]
+        if action in 'YZ':
+            self._r ^= self._x[:, a]
+
+    def _apply_cnot(self, a, b):
+        x, z = self._x, self._z
+        self._r ^= x[:, a] & z[:, b] & ~(x[:, b] ^ z[:, a])
+        x[:, b] ^= x[:, a]
+        z[:, a] ^= z[:, b]
+
+    def _apply_rotation(self, gate, a):
+        """ Apply Rx, Ry, Rz or R by a multiple of pi/2 (up to a phase). """
+        turns = _get_quarter_turns(gate)
+        if isinstance(gate, Ry):
+            self._apply_sdag(a)
+        if isinstance(gate, (Rx, Ry)):
+            self._apply_h(a)
+        for _ in range(turns):
+            self._apply_s(a)
+        if isinstance(gate, (Rx, Ry)):
+            self._apply_h(a)
+        if isinstance(gate, Ry):
+            self._apply_s(a)
+
+    def _allocate(self, qubit_id):
+        if len(self._free_columns) == 0:
+            self._grow(2 * self._capacity)
+        self._columns[qubit_id] = self._free_columns.pop()
+
+    def _deallocate(self, qubit_id):
+        column = self._get_column(qubit_id)
+        capacity = self._capacity
+        if np.any(self._x[capacity:, column]):
+            raise RuntimeError("StabilizerSimulator: Qubit has not been "
+                               "measured / uncomputed! There is most likely "
+                               "a bug in your code.")
+        # reset the (classical) qubit to |0> and free its column
+        if self._measure(column)[0]:
+            self._apply_pauli(column, 'X')
+        del self._columns[qubit_id]
+        self._free_columns.append(column)
+
+    def _handle(self, cmd):
+        gate = cmd.gate
+        if isinstance(gate, FlushGate):
+            return
+        if isinstance(gate, AllocateQubitGate):
+            self._allocate(cmd.qubits[0][0].id)
+            return
+        if isinstance(gate, DeallocateQubitGate):
+            self._deallocate(cmd.qubits[0][0].id)
+            return
+        if isinstance(gate, MeasureGate):
+            for qureg in cmd.qubits:
+                for qubit in qureg:
+                    outcome = self._measure(self._get_column(qubit.id))[0]
+                    self.main_engine.set_measurement_result(qubit, outcome)
+            return
+        if isinstance(gate, Ph) and len(cmd.control_qubits) == 0:
+            return
+        columns = [self._get_column(qubit.id)
+                   for qureg in cmd.qubits for qubit in qureg]
+        controls = [self._get_column(qubit.id)
+                    for qubit in cmd.control_qubits]
+        if not self.is_available(cmd):
+            raise ValueError("StabilizerSimulator: {} is no supported "
+                             "Clifford gate (add an AutoReplacer to the "
+                             "compiler engines).".format(cmd))
+        if (isinstance(gate, (Rx, Ry, Rz, R)) and
+                _get_quarter_turns(gate) is None):
+            raise ValueError("StabilizerSimulator: {} is no Clifford gate "
+                             "(its angle is no multiple of pi/2).".format(cmd))
+        a = columns[0]
+        if len(controls) > 0:
+            if isinstance(gate, XGate):
+                self._apply_cnot(controls[0], a)
+            elif isinstance(gate, ZGate):
+                self._apply_h(a)
+                self._apply_cnot(controls[0], a)
+                self._apply_h(a)
+            else:
+                self._apply_sdag(a)
+                self._apply_cnot(controls[0], a)
+                self._apply_s(a)
+        elif isinstance(gate, (XGate, YGate, ZGate)):
+            self._apply_pauli(a, str(gate))
+        elif isinstance(gate, HGate):
+            self._apply_h(a)
+        elif isinstance(gate, SGate):
+            self._apply_s(a)
+        elif isinstance(gate, DaggeredGate):
+            self._apply_sdag(a)
+        elif isinstance(gate, SwapGate):
+            b = columns[1]
+            for array in (self._x, self._z):
+                array[:, [a, b]] = array[:, [b, a]]
+        else:
+            self._apply_rotation(gate, a)
+
+    def receive(self, command_list):
+        """
+        Simulate the commands (and send them on if the StabilizerSimulator
+        is not the last engine).
+
+        Args:
+            command_list (list<Command>): List of commands to execute.
+        """
+        for cmd in command_list:
+            self._handle(cmd)
+        if not self.is_last_engine:
+            self.send(command_list)
@@ -0,0 +1,194 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.backends._sim._stabilizer_simulator.py."""
+
+import math
+import random
+
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import Simulator, StabilizerSimulator
+from projectq.meta import Control
+from projectq.ops import (All, C, CNOT, Command, Deallocate, Entangle, H,
+                          Measure, Parameter, Ph, QubitOperator, R, Rx, Ry,
+                          Rz, S, Sdag, Swap, T, Toffoli, X, Y, Z)
+from projectq.setups.default import default_engines
+from projectq.types import WeakQubitRef
+
+
+def _random_clifford_circuit(eng, qureg, seed):
+    rnd = random.Random(seed)
+    single_qubit_gates = [H, S, Sdag, X, Y, Z, Rx(math.pi / 2), Ry(math.pi),
+                          Ry(-math.pi / 2), Rz(3 * math.pi / 2), R(math.pi),
+                          Ph(0.3)]
+    for _ in range(40):
+        a, b = rnd.sample(range(len(qureg)), 2)
+        kind = rnd.randrange(5)
+        if kind == 0:
+            with Control(eng, qureg[a]):
+                rnd.choice([X, Y, Z]) | qureg[b]
+        elif kind == 1:
+            Swap | (qureg[a], qureg[b])
+        else:
+            rnd.choice(single_qubit_gates) | qureg[a]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stabilizer_simulator_random_clifford_circuits(seed):
+    eng = MainEngine(StabilizerSimulator(rnd_seed=seed), [])
+    qureg = eng.allocate_qureg(4)
+    _random_clifford_circuit(eng, qureg, seed)
+    eng.flush()
+    ref_eng = MainEngine(Simulator(), [])
+    ref_qureg = ref_eng.allocate_qureg(4)
+    _random_clifford_circuit(ref_eng, ref_qureg, seed)
+    ref_eng.flush()
+    for value in range(16):
+        bits = [(value >> i) & 1 for i in range(4)]
+        assert eng.backend.get_probability(bits, qureg) == pytest.approx(
+            ref_eng.backend.get_probability(bits, ref_qureg))
+    rnd = random.Random(seed)
+    for _ in range(10):
+        term = tuple((i, rnd.choice("XYZ")) for i in range(4)
+                     if rnd.random() < .7)
+        operator = QubitOperator(term, .5) + QubitOperator((), .25)
+        assert eng.backend.get_expectation_value(
+            operator, qureg) == pytest.approx(
+                ref_eng.backend.get_expectation_value(operator, ref_qureg))
+    # measurement outcomes are possible and collapse the state
+    All(Measure) | qureg
+    outcome = [int(qubit) for qubit in qureg]
+    assert ref_eng.backend.get_probability(outcome, ref_qureg) > 0.1
+    assert eng.backend.get_probability(outcome, qureg) == 1.
+    All(Measure) | ref_qureg
+
+
+def test_stabilizer_simulator_ghz():
+    sim = StabilizerSimulator(rnd_seed=4)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(300)
+    H | qureg[0]
+    for i in range(299):
+        CNOT | (qureg[i], qureg[i + 1])
+    eng.flush()
+    assert sim.get_probability([1] * 300, qureg) == pytest.approx(.5)
+    assert sim.get_probability([0, 1], qureg[7:9]) == 0.
+    assert sim.get_expectation_value(QubitOperator("Z3 Z250"),
+                                     qureg) == pytest.approx(1.)
+    assert sim.get_expectation_value(QubitOperator("Z3"), qureg) == 0.
+    with pytest.raises(Exception):
+        sim.get_expectation_value(QubitOperator("Z300"), qureg)
+    All(Measure) | qureg
+    assert len(set(int(qubit) for qubit in qureg)) == 1
+
+
+def test_stabilizer_simulator_measurement_statistics():
+    sim = StabilizerSimulator(rnd_seed=1)
+    eng = MainEngine(sim, [])
+    outcomes = []
+    for _ in range(100):
+        qubit = eng.allocate_qubit()
+        H | qubit
+        Measure | qubit
+        outcomes.append(int(qubit))
+        del qubit
+    assert 20 < sum(outcomes) < 80
+
+
+def test_stabilizer_simulator_deallocation():
+    sim = StabilizerSimulator()
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    eng.flush()
+    with pytest.raises(RuntimeError):
+        sim.receive([Command(eng, Deallocate, ([qureg[1]],))])
+    CNOT | (qureg[0], qureg[1])
+    X | qureg[1]
+    del qureg[1]
+    eng.flush()
+    # the column of the deallocated qubit is reset to |0> and reused
+    ancilla = eng.allocate_qubit()
+    eng.flush()
+    assert sim.get_probability([0], ancilla) == 1.
+    with pytest.raises(RuntimeError):
+        sim.get_probability([0, 0, 0], [ancilla[0], qureg[0],
+                                        WeakQubitRef(eng, 1000)])
+    H | qureg[0]
+    All(Measure) | qureg + ancilla
+
+
+def test_stabilizer_simulator_is_available():
+    sim = StabilizerSimulator()
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(3)
+
+    def available(gate, qubits, controls=[]):
+        return sim.is_available(Command(eng, gate, tuple([qubit]
+                                                         for qubit in qubits),
+                                        controls=controls))
+
+    for gate in [H, S, Sdag, X, Y, Z, Rx(math.pi), Ry(-math.pi / 2),
+                 Rz(math.pi / 2), R(3 * math.pi / 2), Measure]:
+        assert available(gate, qureg[:1])
+    # rotations by other angles may still be merged into Clifford gates
+    for gate in [Rx(0.1), Rz(Parameter("theta"))]:
+        assert available(gate, qureg[:1])
+        assert not available(gate, qureg[:1], qureg[1:2])
+        with pytest.raises(ValueError):
+            sim.receive([Command(eng, gate, (qureg[:1],))])
+    assert available(Swap, qureg[:2])
+    for gate in [X, Y, Z]:
+        assert available(gate, qureg[:1], qureg[1:2])
+        assert not available(gate, qureg[:1], qureg[1:])
+    # global phases are removed by an AutoReplacer (but ignored otherwise)
+    for gate in [T, Ph(0.1), Ph(Parameter("phi"))]:
+        assert not available(gate, qureg[:1])
+    sim.receive([Command(eng, Ph(0.1), (qureg[:1],))])
+    assert not available(H, qureg[:1], qureg[1:2])
+    assert not available(Measure, qureg[:1], qureg[1:2])
+    with pytest.raises(ValueError):
+        sim.receive([Command(eng, T, (qureg[:1],))])
+
+
+def test_stabilizer_simulator_auto_replacer():
+    sim = StabilizerSimulator(rnd_seed=2)
+    eng = MainEngine(sim, default_engines())
+    qureg = eng.allocate_qureg(3)
+    # lowered into H and CNOT gates
+    Entangle | qureg
+    C(Rz(math.pi)) | (qureg[0], qureg[2])
+    S | qureg[0]
+    # merged into H * S * H
+    H | qureg[1]
+    T | qureg[1]
+    T | qureg[1]
+    H | qureg[1]
+    H | qureg[1]
+    Sdag | qureg[1]
+    H | qureg[1]
+    eng.flush()
+    assert sim.get_expectation_value(QubitOperator("Y0 X1 Y2"),
+                                     qureg) == pytest.approx(1.)
+    # non-Clifford gates are rejected
+    with pytest.raises(ValueError):
+        T | qureg[0]
+        eng.flush()
+    with pytest.raises(ValueError):
+        Toffoli | (qureg[0], qureg[1], qureg[2])
+        eng.flush()
+    All(Measure) | qureg
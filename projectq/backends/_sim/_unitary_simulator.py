@@ -0,0 +1,189 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the UnitarySimulator, which computes the unitary of a circuit by
+simulating it on all basis states at once.
+"""
+
+import numpy as np
+
+from ._batched_simulator import BatchedSimulator
+
+
+class UnitarySimulator(BatchedSimulator):
+    """
+    UnitarySimulator is a backend which computes the unitary matrix of the
+    circuit it receives (e.g., to verify decomposition rules).
+
+    The columns of the unitary are the images of the basis states. They are
+    simulated as the batch of a BatchedSimulator, such that every gate is
+    applied to all columns by one vectorized operation. Allocating a qubit
+    adds it as an input of the unitary (doubling the number of columns);
+    deallocating it keeps only the columns in which its input was 0, i.e.,
+    ancilla qubits have to be returned to a classical state which does not
+    depend on the input.
+
+    Measurements collapse each column separately (with outcomes which may
+    differ between the columns), after which the matrix is no longer
+    unitary; they are only supported such that qubits can be measured before
+    they are deallocated (measured qubits may be deallocated regardless of
+    the input).
+
+    Example:
+        .. code-block:: python
+
+            sim = UnitarySimulator()
+            eng = MainEngine(sim, [AutoReplacer(rule_set),
+                                   InstructionFilter(is_decomposed)])
+            qureg = eng.allocate_qureg(2)
+            with Control(eng, qureg[1]):
+                gate | qureg[0]
+            eng.flush()
+            assert sim.get_distance(expected_matrix, qureg) < 1.e-12
+    """
+    def __init__(self, rnd_seed=None):
+        """
+        Initialize the UnitarySimulator.
+
+        Args:
+            rnd_seed (int): Random seed for the measurements.
+        """
+        BatchedSimulator.__init__(self, 1, rnd_seed)
+        # maps qubit ids to the bit of the column index of their input
+        self._columns = dict()
+
+    def bind(self, values):
+        """
+        Set the values of the symbolic parameters (see Parameter) of all
+        gates which are executed from now on.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values.
+        """
+        self._parameter_values.update(values)
+
+    def cheat(self):
+        """
+        Return the ordering of the qubits and the unitary.
+
+        Returns:
+            A tuple where the first entry is a dictionary mapping qubit ids
+            to bit-locations (of both the row and the column index) and the
+            second entry is the unitary as a 2^n x 2^n matrix.
+        """
+        order = sorted(self._axes, key=lambda qubit_id: self._axes[qubit_id])
+        return (dict((qubit_id, bit) for bit, qubit_id in enumerate(order)),
+                self._get_matrix(order))
+
+    def get_unitary(self, qureg):
+        """
+        Return the unitary of the circuit.
+
+        Args:
+            qureg (list<Qubit>): All allocated qubits, where bit i of the row
+                and column index corresponds to qureg[i].
+
+        Returns:
+            The unitary as a 2^n x 2^n matrix.
+
+        Raises:
+            RuntimeError: If qureg does not contain all allocated qubits.
+        """
+        ids = [qubit.id for qubit in qureg]
+        if len(ids) != len(self._axes) or set(ids) != set(self._axes):
+            raise RuntimeError("UnitarySimulator: The qureg must contain all "
+                               "allocated qubits (call eng.flush() first).")
+        return self._get_matrix(ids)
+
+    def get_distance(self, target, qureg):
+        """
+        Return the distance of the unitary U of the circuit to a target
+        unitary V up to a global phase, i.e., the minimum of the Frobenius
+        norm of U - exp(i phi) V over all phases phi.
+
+        Args:
+            target: Target unitary (2^n x 2^n matrix, see get_unitary).
+            qureg (list<Qubit>): All allocated qubits, where bit i of the row
+                and column index corresponds to qureg[i].
+
+        Raises:
+            ValueError: If the target matrix has the wrong shape.
+            RuntimeError: If qureg does not contain all allocated qubits.
+        """
+        unitary = self.get_unitary(qureg)
+        target = np.asarray(target)
+        if target.shape != unitary.shape:
+            raise ValueError("UnitarySimulator: The target matrix must be of "
+                             "shape {}.".format(unitary.shape))
+        overlap = abs(np.vdot(target, unitary))
+        return np.sqrt(max(0., 2. * len(unitary) - 2. * overlap))
+
+    def _get_matrix(self, order):
+        """
+        Return the unitary, where bit i of the row and column index
+        corresponds to the qubit with id order[i].
+        """
+        num_qubits = len(order)
+        # split the batch into one axis per column bit (most significant
+        # first), followed by the row axes of the state
+        tensor = self._state.reshape((2,) * num_qubits +
+                                     self._state.shape[1:])
+        axes = ([num_qubits - 1 + self._axes[qubit_id]
+                 for qubit_id in reversed(order)] +
+                [num_qubits - 1 - self._columns[qubit_id]
+                 for qubit_id in reversed(order)])
+        return tensor.transpose(axes).reshape(1 << num_qubits,
+                                              1 << num_qubits)
+
+    def _get_matrices(self, gate, num_qubits):
+        if len(gate.parameters) > 0:
+            gate = gate.bind(self._parameter_values)
+        return BatchedSimulator._get_matrices(self, gate, num_qubits)
+
+    def _allocate(self, qubit_id):
+        # the new qubit is the most significant bit of the column index and
+        # its row axis equals its input
+        state = np.zeros((2,) + self._state.shape + (2,), dtype=complex)
+        state[0, ..., 0] = self._state
+        state[1, ..., 1] = self._state
+        self._columns[qubit_id] = len(self._columns)
+        self.batch_size *= 2
+        self._state = state.reshape((self.batch_size,) + state.shape[2:])
+        self._axes[qubit_id] = self._state.ndim - 1
+
+    def _deallocate(self, qubit_id):
+        axis = self._get_axis(qubit_id)
+        bit = self._columns[qubit_id]
+        shape = self._state.shape[1:]
+        batch_size = self.batch_size // 2
+        state = self._state.reshape(
+            (batch_size >> bit, 2, 1 << bit) + shape)[:, 0].reshape(
+                (batch_size,) + shape)
+        # unless it has been measured, the qubit must be in the same
+        # classical state for all inputs
+        one = np.take(state, 1, axis=axis).reshape(batch_size, -1)
+        probability = np.sum(np.abs(one) ** 2, axis=1)
+        if (qubit_id not in self._measurement_results and
+                np.ptp(probability) > 1.e-12):
+            raise RuntimeError("UnitarySimulator: Qubit has not been "
+                               "measured / uncomputed! There is most likely "
+                               "a bug in your code.")
+        del self._columns[qubit_id]
+        for other_id, other_bit in self._columns.items():
+            if other_bit > bit:
+                self._columns[other_id] = other_bit - 1
+        self.batch_size = batch_size
+        self._state = state
+        BatchedSimulator._deallocate(self, qubit_id)
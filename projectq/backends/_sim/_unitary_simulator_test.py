@@ -0,0 +1,186 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.backends._sim._unitary_simulator.py."""
+
+import numpy
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import Simulator, UnitarySimulator
+from projectq.cengines import (AutoReplacer, DecompositionRuleSet,
+                               InstructionFilter)
+from projectq.meta import Control
+from projectq.ops import (All, BasicGate, CNOT, Command, Deallocate, H,
+                          Measure, Parameter, Ph, QubitOperator, Rx, Ry, Rz,
+                          Swap, TimeEvolution, Toffoli, X, XGate, Z)
+from projectq.setups.decompositions import carb1qubit2cnotrzandry as carb1q
+from projectq.setups.default import default_engines
+
+
+def _circuit(eng, qureg):
+    H | qureg[0]
+    Rx(0.3) | qureg[1]
+    CNOT | (qureg[0], qureg[2])
+    with Control(eng, qureg[2]):
+        Ry(-1.1) | qureg[1]
+    Swap | (qureg[0], qureg[1])
+    TimeEvolution(0.6, QubitOperator("X0 Z2", 0.5)) | qureg
+    Toffoli | (qureg[2], qureg[0], qureg[1])
+
+
+def test_unitary_simulator_circuit():
+    sim = UnitarySimulator()
+    eng = MainEngine(sim, default_engines())
+    qureg = eng.allocate_qureg(3)
+    _circuit(eng, qureg)
+    eng.flush()
+    unitary = sim.get_unitary(qureg)
+    assert numpy.allclose(unitary.conj().T.dot(unitary), numpy.identity(8))
+    # each column is the image of a basis state
+    for column in range(8):
+        ref_eng = MainEngine(Simulator(), [])
+        ref_qureg = ref_eng.allocate_qureg(3)
+        ref_eng.flush()
+        wavefunction = [0.] * 8
+        wavefunction[column] = 1.
+        ref_eng.backend.set_wavefunction(wavefunction, ref_qureg)
+        _circuit(ref_eng, ref_qureg)
+        ref_eng.flush()
+        for row in range(8):
+            bits = [(row >> i) & 1 for i in range(3)]
+            assert unitary[row, column] == pytest.approx(
+                ref_eng.backend.get_amplitude(bits, ref_qureg))
+        All(Measure) | ref_qureg
+    # the order of the qubits determines the bits of the indices
+    reordered = sim.get_unitary(qureg[::-1])
+    permutation = [int(format(i, "03b")[::-1], 2) for i in range(8)]
+    assert numpy.allclose(reordered, unitary[permutation][:, permutation])
+    mapping, matrix = sim.cheat()
+    assert sorted(mapping.values()) == [0, 1, 2]
+    ordered = sorted(qureg, key=lambda qubit: mapping[qubit.id])
+    assert numpy.allclose(matrix, sim.get_unitary(ordered))
+    All(Measure) | qureg
+    eng.flush(deallocate_qubits=True)
+
+
+def test_unitary_simulator_cnot():
+    sim = UnitarySimulator()
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    CNOT | (qureg[0], qureg[1])
+    eng.flush()
+    # bit 0 of the indices is the control qubit
+    assert numpy.allclose(sim.get_unitary(qureg), [[1, 0, 0, 0],
+                                                   [0, 0, 0, 1],
+                                                   [0, 0, 1, 0],
+                                                   [0, 1, 0, 0]])
+    with pytest.raises(RuntimeError):
+        sim.get_unitary(qureg[:1])
+    with pytest.raises(RuntimeError):
+        sim.get_unitary([qureg[0], qureg[0]])
+    CNOT | (qureg[0], qureg[1])
+
+
+def test_unitary_simulator_ancilla():
+    sim = UnitarySimulator()
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    ancilla = eng.allocate_qubit()
+    eng.flush()
+    assert sim.get_unitary(qubit + ancilla).shape == (4, 4)
+    CNOT | (qubit, ancilla)
+    Z | ancilla
+    CNOT | (qubit, ancilla)
+    del ancilla
+    eng.flush()
+    assert numpy.allclose(sim.get_unitary(qubit), [[1, 0], [0, -1]])
+    # ancilla qubits which are not uncomputed cannot be deallocated
+    ancilla = eng.allocate_qubit()
+    CNOT | (qubit, ancilla)
+    eng.flush()
+    with pytest.raises(RuntimeError):
+        sim.receive([Command(eng, Deallocate, ([ancilla[0]],))])
+    CNOT | (qubit, ancilla)
+
+
+def test_unitary_simulator_decomposition_rule():
+    # compare a decomposition rule against the matrix of the gate, using all
+    # basis states at once
+    def filter_decomposed(eng, cmd):
+        return (len(cmd.control_qubits) == 0 or
+                isinstance(cmd.gate, (XGate, Ph)))
+
+    gate = BasicGate()
+    gate.matrix = numpy.matrix(Rx(0.7).matrix.dot(Rz(-0.4).matrix) *
+                               numpy.exp(0.3j))
+    rule_set = DecompositionRuleSet(modules=[carb1q])
+    sim = UnitarySimulator()
+    eng = MainEngine(sim, [AutoReplacer(rule_set),
+                           InstructionFilter(filter_decomposed)])
+    qubit = eng.allocate_qubit()
+    ctrl_qubit = eng.allocate_qubit()
+    with Control(eng, ctrl_qubit):
+        gate | qubit
+    eng.flush()
+    # bit 1 of the indices is the control qubit
+    expected = numpy.identity(4, dtype=complex)
+    expected[2:, 2:] = gate.matrix
+    assert numpy.allclose(sim.get_unitary(qubit + ctrl_qubit), expected,
+                          rtol=1e-12, atol=1e-12)
+    All(Measure) | qubit + ctrl_qubit
+
+
+def test_unitary_simulator_distance():
+    sim = UnitarySimulator()
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    Ph(0.7) | qubit
+    X | qubit
+    eng.flush()
+    assert sim.get_distance([[0, 1], [1, 0]], qubit) == pytest.approx(0.)
+    assert sim.get_distance(numpy.identity(2), qubit) == pytest.approx(2.)
+    with pytest.raises(ValueError):
+        sim.get_distance(numpy.identity(4), qubit)
+    X | qubit
+
+
+def test_unitary_simulator_bind():
+    sim = UnitarySimulator()
+    eng = MainEngine(sim, [])
+    qubit = eng.allocate_qubit()
+    with pytest.raises(ValueError):
+        Rx(Parameter("theta")) | qubit
+        eng.flush()
+    sim.bind({"theta": 0.4})
+    Rx(2 * Parameter("theta")) | qubit
+    eng.flush()
+    assert numpy.allclose(sim.get_unitary(qubit), Rx(0.8).matrix)
+    Rx(-0.8) | qubit
+
+
+def test_unitary_simulator_measure():
+    sim = UnitarySimulator(rnd_seed=3)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    Measure | qureg
+    eng.flush()
+    results = sim.get_measurement_results(qureg)
+    assert results.shape == (4, 2)
+    # the parity of the outcomes is the input of qureg[1]
+    assert numpy.all(results[:, 0] ^ results[:, 1] == [0, 0, 1, 1])
+    eng.flush(deallocate_qubits=True)
+    assert sim.cheat()[1].shape == (1, 1)
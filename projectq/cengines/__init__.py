@@ -12,18 +12,33 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from projectq._lazy import lazy_import as _lazy_import
+
 from ._basics import (BasicEngine,
                       LastEngineException,
                       ForwarderEngine)
 from ._cmdmodifier import CommandModifier
-from ._ibmcnotmapper import IBMCNOTMapper
+from ._cmdbatcher import CommandBatcher
 from ._main import (MainEngine,
                     NotYetMeasuredError,
                     UnsupportedEngineError)
 from ._optimize import LocalOptimizer
+from ._profiler import PipelineProfiler, EngineStats
 from ._replacer import (AutoReplacer,
                         InstructionFilter,
                         DecompositionRuleSet,
-                        DecompositionRule)
+                        DecompositionRule,
+                        DecompositionCache,
+                        CostDecompositionChooser)
 from ._tagremover import TagRemover
+from ._tape import Tape, TapeRecorder
+from ._tapefile import (TapeWriter,
+                        read_tape,
+                        write_tape,
+                        CompiledCircuitCache)
 from ._testengine import CompareEngine, DummyEngine
+
+# the IBMCNOTMapper needs the IBMBackend, which in turn needs the engines
+# above: import it once it is accessed to avoid an import cycle
+__getattr__, __dir__ = _lazy_import(
+    globals(), {"IBMCNOTMapper": "._ibmcnotmapper"})
@@ -35,6 +35,23 @@ class LastEngineException(Exception):
                                   ).format(engine.__class__.__name__))
 
 
+# maximal number of cached answers of is_available per engine
+_MAX_CACHED_AVAILABILITIES = 10000
+
+
+def _forwards_availability(engine):
+    """
+    Return True if the engine uses the default implementation of
+    is_available (i.e., if it forwards the question to the next engine).
+    """
+    if "is_available" in engine.__dict__:
+        return False
+    is_available = type(engine).is_available
+    return (getattr(is_available, "__func__", is_available) is
+            getattr(BasicEngine.is_available, "__func__",
+                    BasicEngine.is_available))
+
+
 class BasicEngine(object):
     """
     Basic compiler engine: All compiler engines are derived from this class.
@@ -50,6 +67,10 @@ class BasicEngine(object):
         main_engine (MainEngine): Reference to the main compiler engine.
         is_last_engine (bool): True for the last engine, which is the back-end.
     """
+    # meta contexts which are active on this engine (see send); engines
+    # which support them (e.g., MainEngine) replace this by a list
+    _context_stack = ()
+
     def __init__(self):
         """
         Initialize the basic engine.
@@ -60,6 +81,7 @@ class BasicEngine(object):
         self.main_engine = None
         self.next_engine = None
         self.is_last_engine = False
+        self._availability_cache = None
 
     def is_available(self, cmd):
         """
@@ -67,6 +89,11 @@ class BasicEngine(object):
         Ask the next engine whether a command is available, i.e.,
         whether it can be executed by the next engine(s).
 
+        Engines which do not override is_available only forward the question.
+        They are skipped and the first engine further down the pipeline which
+        decides is asked directly. If that engine provides an availability
+        key (see get_availability_key), its answer is cached per key.
+
         Args:
             cmd (Command): Command for which to check availability.
 
@@ -77,10 +104,70 @@ class BasicEngine(object):
             LastEngineException: If is_last_engine is True but is_available
                 is not implemented.
         """
-        if not self.is_last_engine:
-            return self.next_engine.is_available(cmd)
-        else:
+        if self.is_last_engine:
             raise LastEngineException(self)
+        engine, answers = self._get_availability_cache()
+        key = None if answers is None else engine.get_availability_key(cmd)
+        if key is None:
+            return engine.is_available(cmd)
+        try:
+            return answers[key]
+        except KeyError:
+            available = engine.is_available(cmd)
+            if len(answers) >= _MAX_CACHED_AVAILABILITIES:
+                answers.clear()
+            answers[key] = available
+            return available
+
+    def get_availability_key(self, cmd):
+        """
+        Return a (hashable) key such that is_available(cmd) only depends on
+        the key, or None if the availability of cmd cannot be cached.
+
+        Engines which override is_available may also override this function
+        if their answer only depends on, e.g., the gate class and the number
+        of control qubits. The key is not used if is_available is not
+        overridden, as such engines simply forward the question.
+
+        Args:
+            cmd (Command): Command for which to check availability.
+
+        Returns:
+            Key of the command (or None, which is the default).
+        """
+        return None
+
+    def _get_availability_cache(self):
+        """
+        Return the first engine after this one which decides whether commands
+        are available, together with the dictionary of cached answers (None if
+        the engine does not derive from BasicEngine).
+
+        The cache is rebuilt if the engines have been rearranged (e.g., by
+        inserting a new engine).
+        """
+        cache = getattr(self, "_availability_cache", None)
+        if cache is not None:
+            path, engine, answers = cache
+            for eng, next_eng in path:
+                if eng.next_engine is not next_eng:
+                    break
+            else:
+                return engine, answers
+        path = []
+        engine = self
+        while True:
+            path.append((engine, engine.next_engine))
+            engine = engine.next_engine
+            if not isinstance(engine, BasicEngine):
+                # unknown engine (duck typing): nothing can be cached
+                answers = None
+                break
+            answers = dict()
+            if engine.is_last_engine or not _forwards_availability(engine):
+                break
+        self._availability_cache = (path, engine, answers)
+        return engine, answers
 
     def allocate_qubit(self, dirty=False):
         """
@@ -95,10 +182,10 @@ class BasicEngine(object):
         freed.
 
         All allocated qubits are added to the MainEngine's set of active
-        qubits as weak references. This allows proper clean-up at the end of
-        the Python program (using atexit), deallocating all qubits which are
-        still alive. Qubit ids of dirty qubits are registered in MainEngine's
-        dirty_qubits set.
+        qubits (and to its index of active qubits by id) as weak references.
+        This allows proper clean-up at the end of the Python program (using
+        atexit), deallocating all qubits which are still alive. Qubit ids of
+        dirty qubits are registered in MainEngine's dirty_qubits set.
 
         Args:
             dirty (bool): If True, indicates that the allocated qubit may be
@@ -116,6 +203,7 @@ class BasicEngine(object):
                 cmd.tags += [DirtyQubitTag()]
                 self.main_engine.dirty_qubits.add(qb[0].id)
         self.main_engine.active_qubits.add(qb[0])
+        self.main_engine.active_qubit_index[new_id] = qb[0]
         self.send([cmd])
         return qb
 
@@ -182,7 +270,15 @@ class BasicEngine(object):
     def send(self, command_list):
         """
         Forward the list of commands to the next engine in the pipeline.
+
+        The meta contexts which are active on this engine (see
+        projectq.meta.Control) modify the commands first, innermost context
+        first, exactly as if they were engines right after this one.
         """
+        if self._context_stack:
+            for context in reversed(self._context_stack):
+                for cmd in command_list:
+                    context._handle_command(cmd)
         self.next_engine.receive(command_list)
 
 
@@ -207,6 +303,7 @@ class ForwarderEngine(BasicEngine):
         BasicEngine.__init__(self)
         self.main_engine = engine.main_engine
         self.next_engine = engine
+        self._context_stack = []
         if cmd_mod_fun is None:
             cmd_mod_fun = lambda cmd: cmd
 
@@ -23,12 +23,13 @@ import pytest
 
 from projectq import MainEngine
 from projectq.types import Qubit
-from projectq.cengines import DummyEngine, InstructionFilter
+from projectq.cengines import DummyEngine, InstructionFilter, TagRemover
 from projectq.meta import DirtyQubitTag
 from projectq.ops import (AllocateQubitGate,
                           DeallocateQubitGate,
-                          H, FastForwardingGate,
-                          ClassicalInstructionGate)
+                          H, X, FastForwardingGate,
+                          ClassicalInstructionGate,
+                          Command)
 
 from projectq.cengines import _basics
 
@@ -58,6 +59,75 @@ def test_basic_engine_is_available():
     assert not eng.is_available("something else")
 
 
+class AvailabilityCountingEngine(_basics.BasicEngine):
+    def __init__(self):
+        _basics.BasicEngine.__init__(self)
+        self.calls = 0
+
+    def is_available(self, cmd):
+        self.calls += 1
+        return cmd.gate == H
+
+    def get_availability_key(self, cmd):
+        if len(cmd.tags) > 0:
+            return None
+        return type(cmd.gate)
+
+    def receive(self, command_list):
+        pass
+
+
+def test_basic_engine_is_available_cache():
+    backend = AvailabilityCountingEngine()
+    forwarders = [TagRemover(), TagRemover()]
+    eng = MainEngine(backend=backend, engine_list=forwarders)
+    qubit = eng.allocate_qubit()
+    cmd = Command(eng, H, ([qubit[0]],))
+    cmd2 = Command(eng, X, ([qubit[0]],))
+    for _ in range(3):
+        assert forwarders[0].is_available(cmd)
+        assert not forwarders[0].is_available(cmd2)
+    assert backend.calls == 2
+    # Each engine has its own cache
+    assert eng.is_available(cmd)
+    assert backend.calls == 3
+    # Commands without key are not cached
+    cmd.tags = ["some tag"]
+    assert forwarders[0].is_available(cmd)
+    assert forwarders[0].is_available(cmd)
+    assert backend.calls == 5
+    # Changing the pipeline invalidates the cache
+    instruction_filter = InstructionFilter(lambda self, cmd: False)
+    forwarders[1].next_engine = instruction_filter
+    instruction_filter.next_engine = backend
+    assert not forwarders[0].is_available(cmd2)
+    assert not forwarders[0].is_available(
+        Command(eng, H, ([qubit[0]],)))
+    assert backend.calls == 5
+
+
+def test_instruction_filter_is_available_cache():
+    calls = []
+
+    def filterfun(self, cmd):
+        calls.append(cmd)
+        return cmd.gate == H
+
+    def keyfun(self, cmd):
+        return type(cmd.gate)
+
+    instruction_filter = InstructionFilter(filterfun, keyfun)
+    eng = MainEngine(backend=DummyEngine(),
+                     engine_list=[TagRemover(), instruction_filter])
+    qubit = eng.allocate_qubit()
+    for _ in range(3):
+        H | qubit
+        assert eng.next_engine.is_available(Command(eng, H, ([qubit[0]],)))
+        assert not eng.next_engine.is_available(
+            Command(eng, X, ([qubit[0]],)))
+    assert len(calls) == 2
+
+
 def test_basic_engine_allocate_and_deallocate_qubit_and_qureg():
     eng = _basics.BasicEngine()
     # custom receive function which checks that main_engine does not send
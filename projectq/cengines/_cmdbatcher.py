@@ -0,0 +1,79 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains a CommandBatcher engine, which collects commands and sends them on
+in batches, such that the following engines process lists of commands
+instead of single commands.
+"""
+from projectq.cengines import BasicEngine
+from projectq.ops import FlushGate, MeasureGate
+
+
+class CommandBatcher(BasicEngine):
+    """
+    CommandBatcher is a compiler engine which buffers incoming commands and
+    sends them on as one list once batch_size commands have been collected.
+
+    Measurements and flush gates are never delayed: They are sent on right
+    away (together with all buffered commands), such that measurement results
+    are available as soon as they would be without the CommandBatcher.
+
+    Place the CommandBatcher right after the MainEngine, i.e., as first
+    engine in the engine list.
+
+    Example:
+        .. code-block:: python
+
+            from projectq.setups.default import default_engines
+            eng = MainEngine(engine_list=[CommandBatcher(256)] +
+                             default_engines())
+    """
+    def __init__(self, batch_size=100):
+        """
+        Initialize a CommandBatcher.
+
+        Args:
+            batch_size (int): Number of commands to collect before sending
+                them on.
+
+        Raises:
+            ValueError: If batch_size is smaller than 1.
+        """
+        BasicEngine.__init__(self)
+        if batch_size < 1:
+            raise ValueError("The batch size must be >= 1.")
+        self._batch_size = batch_size
+        self._buffer = []
+
+    def _send_buffer(self):
+        """ Send on all buffered commands. """
+        command_list = self._buffer
+        self._buffer = []
+        self.send(command_list)
+
+    def receive(self, command_list):
+        """
+        Receive a list of commands from the previous engine and buffer them.
+        The buffer is sent on if it is full or if a measurement or flush gate
+        arrives.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        for cmd in command_list:
+            self._buffer.append(cmd)
+            if (len(self._buffer) >= self._batch_size or
+                    isinstance(cmd.gate, (FlushGate, MeasureGate))):
+                self._send_buffer()
@@ -0,0 +1,83 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.cengines._cmdbatcher.py."""
+
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import Simulator
+from projectq.cengines import DummyEngine
+from projectq.ops import All, CNOT, H, Measure, X
+
+from projectq.cengines import _cmdbatcher
+
+
+class ListCountingEngine(DummyEngine):
+    def __init__(self):
+        DummyEngine.__init__(self, save_commands=True)
+        self.lists = []
+
+    def receive(self, command_list):
+        self.lists.append(len(command_list))
+        DummyEngine.receive(self, command_list)
+
+
+def test_command_batcher_init():
+    with pytest.raises(ValueError):
+        _cmdbatcher.CommandBatcher(0)
+
+
+def test_command_batcher_sends_batches():
+    backend = ListCountingEngine()
+    batcher = _cmdbatcher.CommandBatcher(batch_size=4)
+    eng = MainEngine(backend=backend, engine_list=[batcher])
+    qureg = eng.allocate_qureg(2)
+    assert backend.lists == []
+    H | qureg[0]
+    X | qureg[1]
+    assert backend.lists == [4]
+    H | qureg[0]
+    eng.flush()
+    assert backend.lists == [4, 2]
+    assert [str(cmd) for cmd in backend.received_commands[:4]] == [
+        "Allocate | Qureg[0]", "Allocate | Qureg[1]", "H | Qureg[0]",
+        "X | Qureg[1]"]
+
+
+def test_command_batcher_measurement():
+    eng = MainEngine(backend=Simulator(),
+                     engine_list=[_cmdbatcher.CommandBatcher(1000)])
+    qureg = eng.allocate_qureg(3)
+    X | qureg[0]
+    for i in range(2):
+        CNOT | (qureg[i], qureg[i + 1])
+    All(Measure) | qureg
+    # results are available without flushing
+    assert [int(qubit) for qubit in qureg] == [1, 1, 1]
+
+
+def test_command_batcher_default_pipeline():
+    from projectq.setups.default import default_engines
+    backend = ListCountingEngine()
+    eng = MainEngine(backend=backend,
+                     engine_list=[_cmdbatcher.CommandBatcher(50)] +
+                     default_engines())
+    qureg = eng.allocate_qureg(5)
+    for _ in range(10):
+        All(H) | qureg
+        for i in range(4):
+            CNOT | (qureg[i], qureg[i + 1])
+    eng.flush()
+    assert len(backend.lists) < len(backend.received_commands) / 2
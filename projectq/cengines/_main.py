@@ -22,8 +22,7 @@ import weakref
 import projectq
 from projectq.cengines import BasicEngine
 from projectq.ops import Command, FlushGate
-from projectq.types import WeakQubitRef
-from projectq.backends import Simulator
+from projectq.types import BasicQubit, WeakQubitRef
 
 
 class NotYetMeasuredError(Exception):
@@ -46,7 +45,8 @@ class MainEngine(BasicEngine):
     Attributes:
         next_engine (BasicEngine): Next compiler engine (or the back-end).
         main_engine (MainEngine): Self.
-        active_qubits (WeakSet): WeakSet containing all active qubits
+        active_qubits (WeakSet): WeakSet containing all active qubits (see
+            also get_active_qubit)
         dirty_qubits (Set): Containing all dirty qubit ids
         backend (BasicEngine): Access the back-end.
 
@@ -87,6 +87,7 @@ class MainEngine(BasicEngine):
         BasicEngine.__init__(self)
 
         if backend is None:
+            from projectq.backends import Simulator
             backend = Simulator()
         else:  # Test that backend is BasicEngine object
             if not isinstance(backend, BasicEngine):
@@ -136,8 +137,12 @@ class MainEngine(BasicEngine):
         self.next_engine = engine_list[0]
         self.main_engine = self
         self.active_qubits = weakref.WeakSet()
+        # weak index of the active qubits by id (see get_active_qubit)
+        self.active_qubit_index = weakref.WeakValueDictionary()
         self._measurements = dict()
         self.dirty_qubits = set()
+        # meta contexts (e.g., Control) applied to all commands sent on
+        self._context_stack = []
 
         # In order to terminate an example code without eng.flush or Measure
         self._delfun = lambda x: x.flush(deallocate_qubits=True)
@@ -191,7 +196,24 @@ class MainEngine(BasicEngine):
                 H | qubit
                 Measure | qubit
                 eng.get_measurement_result(qubit[0]) == int(qubit)
+
+        Note:
+            If the back-end executes commands asynchronously (i.e., if it has
+            a wait function, see AsyncBackend), this function waits for the
+            back-end before concluding that the result is not available.
+            If the result is still not available, the commands acting on the
+            qubit (and the ones they depend on) are flushed, see flush.
         """
+        if qubit.id not in self._measurements:
+            try:
+                wait = self.backend.wait
+            except AttributeError:
+                pass
+            else:
+                wait()
+        if qubit.id not in self._measurements and qubit.id != -1:
+            # the measurement may still be cached by a compiler engine
+            self.flush(qubits=[qubit])
         if qubit.id in self._measurements:
             return self._measurements[qubit.id]
         else:
@@ -205,6 +227,23 @@ class MainEngine(BasicEngine):
                 "underlying backend failed to register "
                 "the measurement result\n")
 
+    def get_active_qubit(self, qubit_id):
+        """
+        Return the active qubit with the given id in constant time.
+
+        Args:
+            qubit_id (int): Id of the qubit.
+
+        Returns:
+            The Qubit object with id qubit_id if it is (still) in
+            active_qubits, and None otherwise.
+        """
+        qubit = self.active_qubit_index.get(qubit_id)
+        if (qubit is None or qubit.id != qubit_id or
+                qubit not in self.active_qubits):
+            return None
+        return qubit
+
     def get_new_qubit_id(self):
         """
         Returns a unique qubit id to be used for the next qubit allocation.
@@ -225,18 +264,39 @@ class MainEngine(BasicEngine):
         """
         self.send(command_list)
 
-    def flush(self, deallocate_qubits=False):
+    def flush(self, deallocate_qubits=False, qubits=None):
         """
         Flush the entire circuit down the pipeline, clearing potential buffers
         (of, e.g., optimizers).
 
+        If qubits are given, only the commands acting on these qubits and the
+        commands they depend on have to be sent on; the other commands may
+        stay in the buffers (see LocalOptimizer). Compiler engines which do
+        not distinguish the two cases flush the entire circuit.
+
         Args:
             deallocate_qubits (bool): If True, deallocates all qubits that are
                 still alive (invalidating references to them by setting their
                 id to -1).
+            qubits (list<BasicQubit>): Qubits to flush (default: all).
+
+        Example:
+            .. code-block:: python
+
+                Measure | ctrl_qubit
+                eng.flush(qubits=ctrl_qubit)
+                print(int(ctrl_qubit))
         """
         if deallocate_qubits:
             for qb in self.active_qubits:
                 qb.__del__()
             self.active_qubits = weakref.WeakSet()
-        self.receive([Command(self, FlushGate(), ([WeakQubitRef(self, -1)],))])
+            self.active_qubit_index = weakref.WeakValueDictionary()
+            qubits = None
+        if qubits is None:
+            flush_qubits = [WeakQubitRef(self, -1)]
+        else:
+            if isinstance(qubits, BasicQubit):
+                qubits = [qubits]
+            flush_qubits = [WeakQubitRef(self, qubit.id) for qubit in qubits]
+        self.receive([Command(self, FlushGate(), (flush_qubits,))])
@@ -102,6 +102,26 @@ def test_main_engine_get_qubit_id():
     assert len(set(ids)) == 10
 
 
+def test_main_engine_get_active_qubit():
+    eng = _main.MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
+    qureg = eng.allocate_qureg(3)
+    for qubit in qureg:
+        assert eng.get_active_qubit(qubit.id) is qubit
+    assert eng.get_active_qubit(3) is None
+    # the index only holds weak references
+    qubit_id = qureg[1].id
+    del qureg[1]
+    assert eng.get_active_qubit(qubit_id) is None
+    # qubits which are no longer active are not returned
+    qubit_id = qureg[0].id
+    qureg[0].id = -1
+    assert eng.get_active_qubit(qubit_id) is None
+    qubit_id = qureg[1].id
+    assert eng.get_active_qubit(qubit_id) is qureg[1]
+    eng.flush(deallocate_qubits=True)
+    assert eng.get_active_qubit(qubit_id) is None
+
+
 def test_main_engine_flush():
     backend = DummyEngine(save_commands=True)
     eng = _main.MainEngine(backend=backend, engine_list=[DummyEngine()])
@@ -117,3 +137,38 @@ def test_main_engine_flush():
     assert backend.received_commands[3].gate == DeallocateQubitGate()
     # keep the qubit alive until at least here
     assert len(str(qubit)) != 0
+
+
+def test_main_engine_flush_qubits():
+    backend = DummyEngine(save_commands=True)
+    eng = _main.MainEngine(backend=backend, engine_list=[DummyEngine()])
+    qureg = eng.allocate_qureg(3)
+    eng.flush(qubits=qureg[1:])
+    assert backend.received_commands[-1].gate == FlushGate()
+    assert [qb.id for qb in backend.received_commands[-1].qubits[0]] == [
+        qureg[1].id, qureg[2].id]
+    eng.flush(qubits=qureg[0])
+    assert backend.received_commands[-1].qubits[0][0].id == qureg[0].id
+    eng.flush(deallocate_qubits=True, qubits=qureg[0])
+    assert backend.received_commands[-1].qubits[0][0].id == -1
+
+
+def test_main_engine_lazy_flush_on_measurement_result():
+    class MeasureOnFlushBackend(DummyEngine):
+        def receive(self, command_list):
+            for cmd in command_list:
+                if cmd.gate == FlushGate():
+                    for qubit in cmd.qubits[0]:
+                        self.main_engine.set_measurement_result(qubit, 1)
+            DummyEngine.receive(self, command_list)
+
+    backend = MeasureOnFlushBackend(save_commands=True)
+    eng = _main.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(2)
+    assert int(qureg[1]) == 1
+    flush_cmd = backend.received_commands[-1]
+    assert flush_cmd.gate == FlushGate()
+    assert [qb.id for qb in flush_cmd.qubits[0]] == [qureg[1].id]
+    # no further flush if the result is available
+    assert int(qureg[1]) == 1
+    assert len(backend.received_commands) == 3
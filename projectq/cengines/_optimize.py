@@ -21,6 +21,21 @@ from projectq.cengines import LastEngineException, BasicEngine
 from projectq.ops import FlushGate, FastForwardingGate, NotMergeable
 
 
+def _is_fast_forwarding(cmd):
+    """
+    Return True if the command cmd must be sent on right away, i.e., if it
+    has a FastForwardingGate or depends on measurement results (see
+    ClassicalControl): The latter must not be overtaken by a later
+    measurement of the qubits it depends on.
+    """
+    if isinstance(cmd.gate, FastForwardingGate):
+        return True
+    if len(cmd.tags) == 0:
+        return False
+    from projectq.meta import get_classical_control_tags
+    return len(get_classical_control_tags(cmd)) > 0
+
+
 class LocalOptimizer(BasicEngine):
     """
     LocalOptimizer is a compiler engine which optimizes locally (merging
@@ -44,6 +59,10 @@ class LocalOptimizer(BasicEngine):
         BasicEngine.__init__(self)
         self._l = [[]]  # list of lists containing operations for each qubit
         self._m = m  # wait for m gates before sending on
+        # commands to send on (together) at the end of receive
+        self._send_buffer = []
+        # loop tags of the last command (see _check_loop_boundary)
+        self._loop_tags = []
 
     # sends n gate operations of the qubit with index idx
     def _send_qubit_pipeline(self, idx, n):
@@ -79,7 +98,7 @@ class LocalOptimizer(BasicEngine):
 
             # all qubits that need to be flushed have been flushed
             # --> send on the n-qubit gate
-            self.send([il[i]])
+            self._send_buffer.append(il[i])
         # n operations have been sent on --> resize our gate list
         self._l[idx] = self._l[idx][n:]
 
@@ -192,14 +211,13 @@ class LocalOptimizer(BasicEngine):
         """
         for i in range(len(self._l)):
             if (len(self._l[i]) >= self._m or len(self._l[i]) > 0
-               and isinstance(self._l[i][-1].gate, FastForwardingGate)):
+               and _is_fast_forwarding(self._l[i][-1])):
                 self._optimize(i)
                 if (len(self._l[i]) >= self._m
-                   and not isinstance(self._l[i][-1].gate,
-                                      FastForwardingGate)):
+                   and not _is_fast_forwarding(self._l[i][-1])):
                     self._send_qubit_pipeline(i, len(self._l[i]) - self._m + 1)
                 elif (len(self._l[i]) > 0 and
-                      isinstance(self._l[i][-1].gate, FastForwardingGate)):
+                      _is_fast_forwarding(self._l[i][-1])):
                     self._send_qubit_pipeline(i, len(self._l[i]))
 
     def _cache_cmd(self, cmd):
@@ -224,16 +242,69 @@ class LocalOptimizer(BasicEngine):
 
         self._check_and_send()
 
+    def _flush_pipelines(self, ids=None):
+        """
+        Optimize and send on all cached commands.
+
+        Args:
+            ids (list<int>): If not None, only the commands acting on the
+                qubits with these ids (and the commands before them on the
+                other qubits involved) are sent on.
+        """
+        if ids is None:
+            ids = range(len(self._l))
+        for i in ids:
+            if i < len(self._l):
+                self._optimize(i)
+                self._send_qubit_pipeline(i, len(self._l[i]))
+
+    def _get_flush_ids(self, cmd):
+        """
+        Return the ids of the qubits whose pipelines a flush gate requires to
+        be sent on (or None for all of them).
+
+        Args:
+            cmd (Command): Command with a flush gate.
+        """
+        ids = [qubit.id for qubit in cmd.qubits[0]]
+        # the body of a loop must not be split by the flush
+        if -1 in ids or len(self._loop_tags) > 0:
+            return None
+        return ids
+
+    def _check_loop_boundary(self, cmd):
+        """
+        Send on all cached commands if cmd enters or leaves a loop body (i.e.,
+        if its loop tags differ from the ones of the previous command).
+
+        Commands of a loop body which is handled by a later engine (see
+        LoopTag) are thus sent on contiguously, without commands from
+        before or after the loop in between.
+
+        Args:
+            cmd (Command): Command which is about to be cached.
+        """
+        from projectq.meta import LoopTag
+        loop_tags = [tag for tag in cmd.tags if isinstance(tag, LoopTag)]
+        if loop_tags != self._loop_tags:
+            self._flush_pipelines()
+            self._loop_tags = loop_tags
+
     def receive(self, command_list):
         """
         Receive commands from the previous engine and cache them.
-        If a flush gate arrives, the entire buffer is sent on.
+        If a flush gate arrives, the entire buffer (or only the part which
+        the flushed qubits depend on, see MainEngine.flush) is sent on.
         """
         for cmd in command_list:
             if cmd.gate == FlushGate():  # flush gate --> optimize and flush
-                for i in range(len(self._l)):
-                    self._optimize(i)
-                    self._send_qubit_pipeline(i, len(self._l[i]))
-                self.send([cmd])
+                self._flush_pipelines(self._get_flush_ids(cmd))
+                self._send_buffer.append(cmd)
             else:
+                self._check_loop_boundary(cmd)
                 self._cache_cmd(cmd)
+        # send on all commands which left the pipelines in one list
+        if len(self._send_buffer) > 0:
+            command_list = self._send_buffer
+            self._send_buffer = []
+            self.send(command_list)
@@ -18,8 +18,10 @@ import pytest
 
 from projectq import MainEngine
 from projectq.cengines import DummyEngine
+from projectq.meta import Loop, LoopTag
 from projectq.ops import (CNOT, H, Rx, Ry, AllocateQubitGate, X,
-                          FastForwardingGate, ClassicalInstructionGate)
+                          FastForwardingGate, ClassicalInstructionGate,
+                          FlushGate)
 
 from projectq.cengines import _optimize
 
@@ -70,6 +72,90 @@ def test_local_optimizer_flush_gate():
     assert len(backend.received_commands) == 5
 
 
+def test_local_optimizer_partial_flush():
+    local_optimizer = _optimize.LocalOptimizer(m=5)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    qb2 = eng.allocate_qubit()
+    H | qb1
+    CNOT | (qb1, qb0)
+    Rx(0.5) | qb1
+    H | qb2
+    Rx(0.1) | qb0
+    assert len(backend.received_commands) == 0
+    eng.flush(qubits=qb0)
+    # qb0 depends on the allocation of qb1, H on qb1 and the CNOT
+    assert [cmd.gate for cmd in backend.received_commands] == [
+        AllocateQubitGate(), AllocateQubitGate(), H, X, Rx(0.1), FlushGate()]
+    assert backend.received_commands[-1].qubits[0][0].id == qb0[0].id
+    # the remaining pipelines are kept and still optimized
+    Rx(0.3) | qb1
+    eng.flush()
+    assert [cmd.gate for cmd in backend.received_commands[6:]] == [
+        Rx(0.8), AllocateQubitGate(), H, FlushGate()]
+    assert backend.received_commands[-1].qubits[0][0].id == -1
+
+
+def test_local_optimizer_partial_flush_in_loop():
+    local_optimizer = _optimize.LocalOptimizer(m=4)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    cmd0 = H.generate_command(qb0)
+    cmd0.tags = [LoopTag(2)]
+    cmd1 = H.generate_command(qb1)
+    cmd1.tags = [LoopTag(2)]
+    local_optimizer.receive([cmd0, cmd1])
+    eng.flush(qubits=qb0)
+    # the loop body is not split
+    assert len(backend.received_commands) == 5
+
+
+def test_local_optimizer_classically_controlled_command():
+    from projectq.meta import ClassicalControlTag
+    local_optimizer = _optimize.LocalOptimizer(m=4)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    H | qb0
+    cmd = X.generate_command(qb1)
+    cmd.tags = [ClassicalControlTag([qb0[0].id])]
+    local_optimizer.receive([cmd])
+    # sent on right away, such that no later measurement can overtake it
+    assert [cmd.gate for cmd in backend.received_commands] == [
+        AllocateQubitGate(), X]
+
+
+def test_local_optimizer_loop_boundary():
+    class LoopTagHandler(DummyEngine):
+        def is_meta_tag_handler(self, tag):
+            return tag == LoopTag
+
+    local_optimizer = _optimize.LocalOptimizer(m=4)
+    backend = LoopTagHandler(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    H | qb0
+    with Loop(eng, 3):
+        # entering the loop sends on all cached commands
+        Rx(0.5) | qb1
+        assert len(backend.received_commands) == 3
+        H | qb1
+    # leaving the loop sends on the loop body
+    Ry(0.2) | qb0
+    assert len(backend.received_commands) == 5
+    eng.flush()
+    gates = [cmd.gate for cmd in backend.received_commands]
+    assert gates[3:6] == [Rx(0.5), H, Ry(0.2)]
+    assert all(LoopTag in [type(tag) for tag in cmd.tags]
+               for cmd in backend.received_commands[3:5])
+
+
 def test_local_optimizer_fast_forwarding_gate():
     local_optimizer = _optimize.LocalOptimizer(m=4)
     backend = DummyEngine(save_commands=True)
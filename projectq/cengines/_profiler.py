@@ -0,0 +1,253 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the PipelineProfiler, which measures how many commands each engine
+of a compiler engine pipeline processes and how much time it takes.
+"""
+import json
+import threading
+
+try:
+    from time import perf_counter as _clock
+except ImportError:  # pragma: no cover
+    from time import time as _clock
+
+
+class EngineStats(object):
+    """
+    Statistics of one engine, collected by the PipelineProfiler.
+
+    Attributes:
+        name (str): Position and class name of the engine, e.g.,
+            "2:LocalOptimizer".
+        calls (int): Number of calls to receive.
+        commands_in (int): Number of received commands.
+        commands_out (int): Number of commands sent on.
+        total_time (float): Time spent in receive (in seconds), including the
+            time of all engines further down the pipeline.
+        self_time (float): Time spent in receive (in seconds), excluding the
+            time of the other profiled engines.
+        gate_counts (dict): Number of received commands by gate class name.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.commands_in = 0
+        self.commands_out = 0
+        self.total_time = 0.
+        self.self_time = 0.
+        self.gate_counts = dict()
+
+
+class PipelineProfiler(object):
+    """
+    PipelineProfiler measures the number of commands and the time spent in
+    each engine of a compiler engine pipeline.
+
+    While attached, it wraps the receive and send functions of the engines
+    (by setting instance attributes, which shadow the methods of the
+    classes). Detaching removes the wrappers again, such that the profiler
+    costs nothing when it is not in use. Engines which are inserted
+    temporarily (e.g., by Compute or Dagger) are not profiled themselves;
+    their time is excluded from the self time of the engine calling them.
+
+    Example:
+        .. code-block:: python
+
+            profiler = PipelineProfiler(trace=True)
+            with profiler.profile(eng):
+                QFT | qureg
+                eng.flush()
+            print(profiler)
+            profiler.save_trace("trace.json")  # Chrome tracing / Perfetto
+
+    Attributes:
+        stats (list<EngineStats>): Statistics of the engines, in the order of
+            the pipeline (starting with the MainEngine).
+    """
+    def __init__(self, trace=False):
+        """
+        Initialize a PipelineProfiler.
+
+        Args:
+            trace (bool): If True, a timeline event is recorded for each call
+                to receive (see get_trace and save_trace).
+        """
+        self.stats = []
+        self._trace = trace
+        self._events = []
+        self._engines = []
+        self._local = threading.local()
+        self._start = _clock()
+
+    def attach(self, engine):
+        """
+        Start profiling all engines of the pipeline of engine.
+
+        Args:
+            engine (BasicEngine): First engine to profile (usually the
+                MainEngine).
+
+        Raises:
+            RuntimeError: If the profiler is attached already.
+        """
+        if len(self._engines) > 0:
+            raise RuntimeError("The PipelineProfiler is attached already.")
+        index = 0
+        while engine is not None:
+            name = "{}:{}".format(index, type(engine).__name__)
+            stats = self._get_stats(name)
+            engine.receive = self._wrap_receive(engine.receive, stats)
+            engine.send = self._wrap_send(engine.send, stats)
+            self._engines.append(engine)
+            engine = getattr(engine, "next_engine", None)
+            index += 1
+
+    def detach(self):
+        """ Stop profiling (the collected statistics are kept). """
+        for engine in self._engines:
+            del engine.receive
+            del engine.send
+        self._engines = []
+
+    def profile(self, engine):
+        """
+        Return a context manager which profiles the pipeline of engine while
+        the with-block is executed.
+
+        Args:
+            engine (BasicEngine): First engine to profile (usually the
+                MainEngine).
+        """
+        return _ProfilingContext(self, engine)
+
+    def reset(self):
+        """ Clear all collected statistics and timeline events. """
+        for stats in self.stats:
+            stats.__init__(stats.name)
+        self._events = []
+        self._start = _clock()
+
+    def _get_stats(self, name):
+        for stats in self.stats:
+            if stats.name == name:
+                return stats
+        stats = EngineStats(name)
+        self.stats.append(stats)
+        return stats
+
+    def _get_call_stack(self):
+        """ Return the stack of the receive calls of the current thread. """
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _wrap_receive(self, receive, stats):
+        """
+        Return a function which calls receive and records the time spent.
+
+        Each entry of the call stack holds the time spent in nested (i.e.,
+        profiled) receive calls, which is excluded from the self time.
+        """
+        def profiled_receive(command_list):
+            stack = self._get_call_stack()
+            stack.append(0.)
+            start = _clock()
+            try:
+                receive(command_list)
+            finally:
+                duration = _clock() - start
+                nested = stack.pop()
+                if len(stack) > 0:
+                    stack[-1] += duration
+                stats.calls += 1
+                stats.commands_in += len(command_list)
+                stats.total_time += duration
+                stats.self_time += duration - nested
+                gate_counts = stats.gate_counts
+                for cmd in command_list:
+                    gate_name = type(cmd.gate).__name__
+                    gate_counts[gate_name] = gate_counts.get(gate_name, 0) + 1
+                if self._trace:
+                    self._events.append(
+                        {"name": stats.name, "cat": "engine", "ph": "X",
+                         "ts": (start - self._start) * 1e6,
+                         "dur": duration * 1e6, "pid": 0,
+                         "tid": threading.current_thread().ident,
+                         "args": {"commands": len(command_list)}})
+        return profiled_receive
+
+    def _wrap_send(self, send, stats):
+        """ Return a function which calls send and counts the commands. """
+        def profiled_send(command_list):
+            stats.commands_out += len(command_list)
+            send(command_list)
+        return profiled_send
+
+    def get_trace(self):
+        """
+        Return the recorded timeline in the Trace Event Format, which can be
+        loaded into Chrome tracing (chrome://tracing) or Perfetto.
+
+        Returns:
+            Dictionary which can be serialized using json.
+        """
+        return {"traceEvents": list(self._events),
+                "displayTimeUnit": "ms"}
+
+    def save_trace(self, filename):
+        """
+        Write the recorded timeline (see get_trace) to a json file.
+
+        Args:
+            filename (str): Name of the file to write.
+        """
+        with open(filename, "w") as trace_file:
+            json.dump(self.get_trace(), trace_file)
+
+    def __str__(self):
+        """
+        Return a table of the statistics of all engines.
+        """
+        if len(self.stats) == 0:
+            return "(No engines profiled)"
+        lines = ["{:<28}{:>9}{:>12}{:>12}{:>12}{:>12}".format(
+            "engine", "calls", "cmds in", "cmds out", "total [s]",
+            "self [s]")]
+        for stats in self.stats:
+            lines.append("{:<28}{:>9}{:>12}{:>12}{:>12.4f}{:>12.4f}".format(
+                stats.name, stats.calls, stats.commands_in,
+                stats.commands_out, stats.total_time, stats.self_time))
+            gates = sorted(stats.gate_counts.items(), key=lambda x: -x[1])
+            if len(gates) > 0:
+                lines.append("    " + ", ".join("{} : {}".format(name, num)
+                                                for name, num in gates))
+        return "\n".join(lines)
+
+
+class _ProfilingContext(object):
+    """ Context manager returned by PipelineProfiler.profile. """
+    def __init__(self, profiler, engine):
+        self._profiler = profiler
+        self._engine = engine
+
+    def __enter__(self):
+        self._profiler.attach(self._engine)
+        return self._profiler
+
+    def __exit__(self, type, value, traceback):
+        self._profiler.detach()
@@ -0,0 +1,105 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.cengines._profiler.py."""
+
+import json
+
+import pytest
+
+from projectq import MainEngine
+from projectq.cengines import DummyEngine, LocalOptimizer
+from projectq.meta import Compute, Uncompute
+from projectq.ops import H, Rx, X
+
+from projectq.cengines import _profiler
+
+
+def test_profiler_counts_commands():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[LocalOptimizer(m=5)])
+    profiler = _profiler.PipelineProfiler()
+    assert str(profiler) == "(No engines profiled)"
+    qubit = eng.allocate_qubit()
+    with profiler.profile(eng) as prof:
+        assert prof is profiler
+        Rx(0.1) | qubit
+        Rx(0.2) | qubit
+        with Compute(eng):
+            H | qubit
+        X | qubit
+        Uncompute(eng)
+        eng.flush()
+    H | qubit
+    assert [stats.name for stats in profiler.stats] == [
+        "0:MainEngine", "1:LocalOptimizer", "2:DummyEngine"]
+    main_stats, optimizer_stats, backend_stats = profiler.stats
+    assert main_stats.calls == 5
+    assert main_stats.commands_in == 5
+    assert main_stats.commands_out == 5
+    assert main_stats.gate_counts == {"Rx": 2, "HGate": 1, "XGate": 1,
+                                      "FlushGate": 1}
+    # the uncomputation is sent by the (temporary) UncomputeEngine
+    assert optimizer_stats.commands_in == 6
+    assert optimizer_stats.gate_counts["HGate"] == 2
+    # the rotations were merged; the allocation was cached before profiling
+    assert backend_stats.commands_in == 6
+    assert backend_stats.commands_out == 0
+    assert backend_stats.gate_counts == {"AllocateQubitGate": 1, "Rx": 1,
+                                         "HGate": 2, "XGate": 1,
+                                         "FlushGate": 1}
+    for stats in profiler.stats:
+        assert 0 <= stats.self_time <= stats.total_time
+    assert main_stats.total_time >= backend_stats.total_time
+    assert "1:LocalOptimizer" in str(profiler)
+    assert "Rx : 2" in str(profiler)
+    # the profiler is detached
+    for engine in (eng, eng.next_engine, backend):
+        assert "receive" not in engine.__dict__
+        assert "send" not in engine.__dict__
+    assert main_stats.calls == 5
+    profiler.reset()
+    assert main_stats.calls == 0
+    assert main_stats.gate_counts == dict()
+
+
+def test_profiler_attach_twice():
+    eng = MainEngine(backend=DummyEngine(), engine_list=[])
+    profiler = _profiler.PipelineProfiler()
+    profiler.attach(eng)
+    with pytest.raises(RuntimeError):
+        profiler.attach(eng)
+    profiler.detach()
+    profiler.attach(eng)
+    profiler.detach()
+    assert len(profiler.stats) == 2
+
+
+def test_profiler_trace(tmpdir):
+    eng = MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
+    profiler = _profiler.PipelineProfiler(trace=True)
+    with profiler.profile(eng):
+        qubit = eng.allocate_qubit()
+        H | qubit
+    events = profiler.get_trace()["traceEvents"]
+    # the allocation is sent by the MainEngine without receiving it
+    assert len(events) == 5
+    assert [event["name"] for event in events] == [
+        "2:DummyEngine", "1:DummyEngine",
+        "2:DummyEngine", "1:DummyEngine", "0:MainEngine"]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    filename = str(tmpdir.join("trace.json"))
+    profiler.save_trace(filename)
+    with open(filename) as trace_file:
+        assert json.load(trace_file)["traceEvents"] == events
@@ -14,6 +14,8 @@
 
 from ._decomposition_rule import DecompositionRule, ThisIsNotAGateClassError
 from ._decomposition_rule_set import DecompositionRuleSet
+from ._decomposition_cache import DecompositionCache
+from ._decomposition_chooser import CostDecompositionChooser
 from ._replacer import (AutoReplacer,
                         InstructionFilter,
                         NoGateDecompositionError)
@@ -0,0 +1,316 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the DecompositionCache, which stores the fully decomposed command
+sequence of a command (see AutoReplacer) such that later occurrences of the
+same gate can be replayed without running the decomposition rules again.
+"""
+
+from collections import OrderedDict
+
+from projectq.ops import Allocate, BasicGate, Deallocate, Command, Measure
+from projectq.types import WeakQubitRef
+
+# attributes of gates which carry no parameters
+_BASIC_GATE_ATTRIBUTES = frozenset(vars(BasicGate()))
+
+
+def _gate_signature(gate):
+    """
+    Return a hashable signature of a gate.
+
+    The signature consists of the gate class, its string representation and,
+    if available, its matrix. It is only used as a hint for hashing; two gates
+    with equal signature are still compared using ==.
+
+    Args:
+        gate (BasicGate): Gate of which to get the signature.
+    """
+    try:
+        matrix = gate.matrix
+        matrix = (str(matrix.dtype), matrix.shape, matrix.tobytes())
+    except:
+        matrix = None
+    cls = type(gate)
+    if cls.__str__ is object.__str__ and cls.__repr__ is object.__repr__:
+        # default representation contains the address of the gate object
+        name = None
+    else:
+        name = str(gate)
+    return (cls, name, matrix)
+
+
+def _is_cacheable_gate(gate):
+    """
+    Return True if gates with the same signature as gate (see
+    _gate_signature) which compare equal are also the same gate, i.e., if
+    the gate can be decomposed using a template recorded for another gate.
+
+    This is the case for gates which define their own comparison (e.g.,
+    rotation gates or AddConstant), gates with a matrix, and gates without
+    any attributes besides the ones of BasicGate. Other gates, e.g., a
+    BasicMathGate with a custom function, compare equal to all gates of
+    their class (and have the same string representation).
+
+    Args:
+        gate (BasicGate): Gate to check.
+    """
+    if type(gate).__eq__ is not BasicGate.__eq__:
+        return True
+    try:
+        gate.matrix
+        return True
+    except:
+        pass
+    return set(vars(gate)) <= _BASIC_GATE_ATTRIBUTES
+
+
+def get_command_signature(cmd):
+    """
+    Return the signature of a command, i.e., the signature of its gate
+    together with the number of control qubits and the number of qubits in
+    each quantum register.
+
+    Args:
+        cmd (Command): Command of which to get the signature.
+    """
+    return (_gate_signature(cmd.gate),
+            len(cmd.control_qubits),
+            tuple(len(qureg) for qureg in cmd.qubits))
+
+
+class _DecompositionTemplate(object):
+    """
+    Recorded sequence of fully decomposed commands of a command.
+
+    Qubits are stored as slots: Non-negative slots refer to the position of
+    the qubit in the decomposed command (control qubits first, then all
+    target qubits), negative slots refer to ancilla qubits which are
+    allocated (and deallocated) within the decomposition.
+    """
+    def __init__(self, cmd):
+        """
+        Start recording the decomposition of the command cmd.
+
+        Args:
+            cmd (Command): Command which is being decomposed.
+        """
+        self.gate = cmd.gate
+        self.cacheable = _is_cacheable_gate(cmd.gate)
+        self._slots = dict()
+        for i, qubit in enumerate(_flatten(cmd)):
+            self._slots[qubit.id] = i
+        self._num_tags = len(cmd.tags)
+        self._tags = cmd.tags[:]
+        self._num_ancillas = 0
+        self._alive_ancillas = set()
+        self._commands = []
+
+    def _get_slot(self, qubit_id):
+        try:
+            return self._slots[qubit_id]
+        except KeyError:
+            self.cacheable = False
+            return None
+
+    def record(self, cmd):
+        """
+        Record a command which was sent on as part of the decomposition.
+
+        Args:
+            cmd (Command): Fully decomposed command.
+        """
+        if not self.cacheable:
+            return
+        if cmd.gate == Measure or cmd.tags[:self._num_tags] != self._tags:
+            self.cacheable = False
+            return
+        if cmd.gate == Allocate:
+            qubit_id = cmd.qubits[0][0].id
+            if qubit_id in self._slots:
+                self.cacheable = False
+                return
+            self._num_ancillas += 1
+            self._slots[qubit_id] = -self._num_ancillas
+            self._alive_ancillas.add(qubit_id)
+        elif cmd.gate == Deallocate:
+            self._alive_ancillas.discard(cmd.qubits[0][0].id)
+        ctrl_slots = tuple(self._get_slot(qb.id) for qb in cmd.control_qubits)
+        qubit_slots = tuple(tuple(self._get_slot(qb.id) for qb in qureg)
+                            for qureg in cmd.qubits)
+        self._commands.append((cmd.gate, qubit_slots, ctrl_slots,
+                               cmd.tags[self._num_tags:]))
+
+    def finalize(self):
+        """
+        Finish recording.
+
+        Returns:
+            True if the template can be cached, i.e., if it does not contain
+            measurements and all ancilla qubits have been deallocated.
+        """
+        if len(self._alive_ancillas) > 0:
+            self.cacheable = False
+        if self.cacheable:
+            from projectq.meta import DirtyQubitTag
+            self.cacheable = not any(isinstance(tag, DirtyQubitTag)
+                                     for cmd in self._commands
+                                     for tag in cmd[3])
+        self._slots = None
+        self._tags = None
+        self._alive_ancillas = None
+        return self.cacheable
+
+    def replay(self, cmd, engine):
+        """
+        Create the decomposed commands of cmd.
+
+        Args:
+            cmd (Command): Command to decompose, i.e., a command which has the
+                same signature as the command that was recorded.
+            engine (MainEngine): Owner of the new commands, which also
+                provides the ids of new ancilla qubits.
+
+        Returns:
+            List of the decomposed commands.
+        """
+        ids = [qubit.id for qubit in _flatten(cmd)]
+        ids += [engine.get_new_qubit_id()
+                for _ in range(self._num_ancillas)][::-1]
+        tags = cmd.tags
+        commands = []
+        for gate, qubit_slots, ctrl_slots, new_tags in self._commands:
+            qubits = tuple([WeakQubitRef(engine, ids[slot]) for slot in qureg]
+                           for qureg in qubit_slots)
+            controls = [WeakQubitRef(engine, ids[slot]) for slot in ctrl_slots]
+            commands.append(Command(engine, gate, qubits, controls,
+                                    tags + new_tags))
+        return commands
+
+
+def _flatten(cmd):
+    """ Return all qubits of a command (control qubits first). """
+    return [qubit for qureg in cmd.all_qubits for qubit in qureg]
+
+
+class DecompositionCache(object):
+    """
+    Least-recently-used cache of decomposition templates.
+
+    When an AutoReplacer has a DecompositionCache, it records the fully
+    decomposed command sequence of each command it decomposes. Later commands
+    with the same signature (same gate, same number of control qubits and the
+    same number of qubits per quantum register) are then replaced by the
+    recorded sequence with remapped qubit ids, instead of running the
+    decomposition rules again.
+
+    Decompositions which measure qubits, which leave ancilla qubits allocated
+    or which use dirty qubits are never cached, and neither are the
+    decompositions of gates which cannot be told apart by their signature
+    and comparison (e.g., BasicMathGates with custom functions).
+
+    Note:
+        The cache assumes that the decomposition of a command only depends on
+        its signature and that the availability of commands (see
+        BasicEngine.is_available) does not change over time. Use one cache
+        per AutoReplacer.
+
+        The tags of a command are not part of its signature: The same
+        decomposition is assumed for all tags, and the recorded commands are
+        replayed with the tags of the command being replaced.
+
+    Attributes:
+        hits (int): Number of commands that were replaced using a recorded
+            template.
+        misses (int): Number of commands for which no template was recorded.
+        maxsize (int): Maximal number of templates to store.
+
+    Example:
+        .. code-block:: python
+
+            cache = DecompositionCache(maxsize=256)
+            replacer = AutoReplacer(rule_set, decomposition_cache=cache)
+            ...
+            print(cache.hits, cache.misses)
+    """
+    def __init__(self, maxsize=1024):
+        """
+        Initialize a DecompositionCache.
+
+        Args:
+            maxsize (int): Maximal number of templates to store. If the cache
+                is full, the least recently used template is dropped.
+        """
+        if maxsize < 1:
+            raise ValueError("The maximal size of the cache must be >= 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._templates = OrderedDict()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def clear(self):
+        """ Remove all templates and reset the statistics. """
+        self._templates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, cmd):
+        """
+        Return the template for the command cmd (or None if there is none).
+
+        Args:
+            cmd (Command): Command to decompose.
+        """
+        key = get_command_signature(cmd)
+        try:
+            template = self._templates.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._templates[key] = template  # mark as most recently used
+        if template.gate == cmd.gate:
+            self.hits += 1
+            return template
+        self.misses += 1
+        return None
+
+    def start_recording(self, cmd):
+        """
+        Return a new (empty) template to record the decomposition of cmd.
+
+        Args:
+            cmd (Command): Command which is about to be decomposed.
+        """
+        return _DecompositionTemplate(cmd)
+
+    def store(self, cmd, template):
+        """
+        Store a recorded template (if it is cacheable).
+
+        Args:
+            cmd (Command): Command which has been decomposed.
+            template: Template which was returned by start_recording(cmd) and
+                which recorded the decomposition of cmd.
+        """
+        if not template.finalize():
+            return
+        key = get_command_signature(cmd)
+        self._templates.pop(key, None)
+        self._templates[key] = template
+        if len(self._templates) > self.maxsize:
+            self._templates.popitem(last=False)
@@ -0,0 +1,194 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.cengines._replacer._decomposition_cache.py."""
+
+import pytest
+
+import projectq.setups.decompositions
+from projectq import MainEngine
+from projectq.cengines import (AutoReplacer,
+                               DecompositionCache,
+                               DecompositionRule,
+                               DecompositionRuleSet,
+                               DummyEngine,
+                               InstructionFilter)
+from projectq.meta import Control, get_control_count
+from projectq.setups.decompositions import (cnu2toffoliandcu,
+                                             crz2cxandrz,
+                                             toffoli2cnotandtgate)
+from projectq.ops import (BasicGate, BasicMathGate, ClassicalInstructionGate,
+                          Command, H, Measure, QFT, Rx, Rz, Toffoli, X)
+
+
+def _low_level_gates(eng, cmd):
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return True
+    if get_control_count(cmd) == 1 and cmd.gate == X:
+        return True
+    try:
+        return get_control_count(cmd) == 0 and len(cmd.gate.matrix) == 2
+    except AttributeError:
+        return False
+
+
+def _run(circuit, cache=None, modules=[projectq.setups.decompositions]):
+    backend = DummyEngine(save_commands=True)
+    rule_set = DecompositionRuleSet(modules=modules)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set,
+                                               decomposition_cache=cache),
+                                  InstructionFilter(_low_level_gates)])
+    circuit(eng)
+    eng.flush(deallocate_qubits=True)
+    return [str(cmd) for cmd in backend.received_commands]
+
+
+def _circuit(eng):
+    qureg = eng.allocate_qureg(5)
+    for i in range(3):
+        Rx(0.3) | qureg[i]
+        Toffoli | (qureg[i], qureg[i + 1], qureg[i + 2])
+    QFT | qureg[:3]
+    QFT | qureg[2:]
+    X | qureg[0]
+    Rx(0.3) | qureg[4]
+
+
+def test_cache_replays_identical_commands():
+    cache = DecompositionCache()
+    assert _run(_circuit, cache) == _run(_circuit)
+    assert cache.hits > 0
+    assert cache.misses > 0
+    misses = cache.misses
+    # Running the same circuit again only hits the cache
+    _run(_circuit, cache)
+    assert cache.misses == misses
+
+
+def test_cache_replays_ancilla_qubits():
+    def circuit(eng):
+        qureg = eng.allocate_qureg(5)
+        for i in range(3):
+            with Control(eng, qureg[:4]):
+                Rz(0.5) | qureg[4]
+
+    modules = [crz2cxandrz, cnu2toffoliandcu, toffoli2cnotandtgate]
+    cache = DecompositionCache()
+    commands = _run(circuit, cache, modules)
+    assert commands == _run(circuit, None, modules)
+    assert len([cmd for cmd in commands if cmd.startswith("Allocate")]) == 23
+    assert cache.hits >= 2
+
+
+def test_cache_keeps_tags():
+    class MyTag(object):
+        def __eq__(self, other):
+            return isinstance(other, MyTag)
+
+        def __ne__(self, other):
+            return not self.__eq__(other)
+
+    backend = DummyEngine(save_commands=True)
+    rule_set = DecompositionRuleSet(modules=[projectq.setups.decompositions])
+    cache = DecompositionCache()
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set,
+                                               decomposition_cache=cache),
+                                  InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(3)
+    Toffoli | (qureg[0], qureg[1], qureg[2])
+    cmd = Command(eng, X, ([qureg[0]],), controls=qureg[1:], tags=[MyTag()])
+    eng.send([cmd])
+    eng.flush()
+    assert cache.hits == 1
+    tagged = [c for c in backend.received_commands if MyTag() in c.tags]
+    untagged = [c for c in backend.received_commands
+                if c.gate != X or len(c.control_qubits) > 0]
+    assert len(tagged) == 15
+    assert len(untagged) > len(tagged)
+
+
+def test_cache_lru_eviction():
+    cache = DecompositionCache(maxsize=2)
+    rule_set = DecompositionRuleSet(modules=[projectq.setups.decompositions])
+    eng = MainEngine(backend=DummyEngine(),
+                     engine_list=[AutoReplacer(rule_set,
+                                               decomposition_cache=cache),
+                                  InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(2)
+    with Control(eng, qureg[0]):
+        for angle in [0.1, 0.2, 0.3]:
+            Rz(angle) | qureg[1]
+        assert len(cache) == 2
+        assert cache.misses == 3
+        Rz(0.1) | qureg[1]
+        assert cache.misses == 4
+        Rz(0.3) | qureg[1]
+        assert cache.hits == 1
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == 0 and cache.misses == 0
+    with pytest.raises(ValueError):
+        DecompositionCache(maxsize=0)
+
+
+def test_cache_skips_measurements():
+    class MeasuringGate(BasicGate):
+        pass
+
+    def decompose(cmd):
+        H | cmd.qubits
+        Measure | cmd.qubits
+
+    rule_set = DecompositionRuleSet(rules=[
+        DecompositionRule(MeasuringGate, decompose)])
+    cache = DecompositionCache()
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set,
+                                               decomposition_cache=cache),
+                                  InstructionFilter(_low_level_gates)])
+    qubit = eng.allocate_qubit()
+    MeasuringGate() | qubit
+    MeasuringGate() | qubit
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert len(backend.received_commands) == 5
+
+
+def test_cache_skips_indistinguishable_gates():
+    def decompose(cmd):
+        # apply the math function to the basis state |0>
+        value = cmd.gate.get_math_function(cmd.qubits)([0])[0]
+        for i, qubit in enumerate(cmd.qubits[0]):
+            if (value >> i) & 1:
+                X | qubit
+
+    rule_set = DecompositionRuleSet(rules=[
+        DecompositionRule(BasicMathGate, decompose)])
+    cache = DecompositionCache()
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set,
+                                               decomposition_cache=cache),
+                                  InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(2)
+    # both gates are printed as "MATH" and compare equal
+    BasicMathGate(lambda x: (x + 1,)) | qureg
+    BasicMathGate(lambda x: (x + 2,)) | qureg
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert [cmd.qubits[0][0].id
+            for cmd in backend.received_commands[2:]] == [qureg[0].id,
+                                                         qureg[1].id]
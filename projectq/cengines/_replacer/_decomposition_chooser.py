@@ -0,0 +1,291 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the CostDecompositionChooser, a decomposition chooser for the
+AutoReplacer which picks the decomposition with the lowest cost after full
+decomposition.
+"""
+
+from projectq.cengines import BasicEngine, ForwarderEngine
+from projectq.ops import (Allocate,
+                          ClassicalInstructionGate,
+                          Command,
+                          Deallocate,
+                          FlushGate,
+                          Measure)
+from projectq.types import WeakQubitRef
+from ._decomposition_cache import get_command_signature
+
+
+class _CyclicDecompositionError(Exception):
+    """ Raised when a dry run runs into a cycle of decompositions. """
+    pass
+
+
+class _CostCounter(BasicEngine):
+    """
+    Back-end of a dry run, which accumulates the cost of all commands it
+    receives.
+    """
+    def __init__(self, weight):
+        BasicEngine.__init__(self)
+        self.reset(weight)
+
+    def reset(self, weight):
+        """ Reset the cost to zero and set the weight function (or None). """
+        self._weight = weight
+        self._depth = dict()
+        self._ancillas = 0
+        self.gate_count = 0
+        self.depth = 0
+        self.max_ancillas = 0
+        self.weighted_cost = 0
+
+    def is_available(self, cmd):
+        return True
+
+    def receive(self, command_list):
+        for cmd in command_list:
+            if isinstance(cmd.gate, FlushGate):
+                continue
+            if cmd.gate == Allocate:
+                self._ancillas += 1
+                self.max_ancillas = max(self.max_ancillas, self._ancillas)
+                self._depth[cmd.qubits[0][0].id] = 0
+                continue
+            if cmd.gate == Deallocate:
+                self._ancillas -= 1
+                continue
+            if cmd.gate == Measure:
+                for qureg in cmd.qubits:
+                    for qubit in qureg:
+                        self.main_engine.set_measurement_result(qubit, 0)
+            if self._weight is not None:
+                self.weighted_cost += self._weight(cmd)
+            if isinstance(cmd.gate, ClassicalInstructionGate):
+                continue
+            self.gate_count += 1
+            ids = [qb.id for qureg in cmd.all_qubits for qb in qureg]
+            depth = max(self._depth.get(i, 0) for i in ids) + 1
+            for i in ids:
+                self._depth[i] = depth
+            self.depth = max(self.depth, depth)
+
+
+class _GuardedDecomposition(object):
+    """
+    Decomposition which marks the command signature as being decomposed while
+    running the decomposition (used during dry runs to detect cycles).
+    """
+    def __init__(self, active, key, decomposition):
+        self._active = active
+        self._key = key
+        self._decomposition = decomposition
+
+    def decompose(self, cmd):
+        self._active.add(self._key)
+        try:
+            self._decomposition.decompose(cmd)
+        finally:
+            self._active.discard(self._key)
+
+
+class CostDecompositionChooser(object):
+    """
+    Decomposition chooser which returns the decomposition with the lowest
+    cost after full decomposition.
+
+    To determine the cost of a decomposition, the command is decomposed in a
+    separate (dry-run) compiler engine pipeline, which uses the same
+    decomposition rules and asks the AutoReplacer using this chooser which
+    commands are available. Decompositions of the resulting sub-commands are
+    chosen recursively in the same way. The choice is memoized per command
+    signature (gate, number of control qubits and number of qubits per
+    quantum register).
+
+    Decompositions which run into a cycle (i.e., which require decomposing
+    the command which is currently being decomposed) are considered to have
+    infinite cost.
+
+    Note:
+        The memoized choices depend on which commands are available. Use one
+        CostDecompositionChooser per AutoReplacer.
+
+    Example:
+        .. code-block:: python
+
+            rule_set = DecompositionRuleSet(modules=[decompositions])
+            chooser = CostDecompositionChooser(metric="depth")
+            engines = [AutoReplacer(rule_set, chooser), ...]
+    """
+    _METRICS = ("gates", "depth", "ancillas")
+
+    def __init__(self, metric="gates"):
+        """
+        Initialize a CostDecompositionChooser.
+
+        Args:
+            metric (str or function): Cost to minimize. Either "gates" (number
+                of gates, without allocation, deallocation and classical
+                instructions), "depth" (circuit depth), "ancillas" (maximal
+                number of simultaneously allocated ancilla qubits) or a
+                function which returns the cost of a fully decomposed command
+                when called with the command as argument (e.g., to estimate
+                the simulation cost). Ties are broken by the number of gates
+                (or the depth if metric="gates").
+
+        Raises:
+            ValueError: If metric is neither a function nor one of the above.
+        """
+        if not callable(metric) and metric not in self._METRICS:
+            raise ValueError("Unknown metric '{}'. Use one of {} or a "
+                             "function.".format(metric, self._METRICS))
+        self.metric = metric
+        self._choices = dict()
+        self._active = set()
+        # dry-run pipelines by id of the AutoReplacer they imitate
+        self._dry_runs = dict()
+
+    def __call__(self, cmd, decomposition_list):
+        """
+        Return the decomposition of cmd with the lowest cost.
+
+        Args:
+            cmd (Command): Command to decompose.
+            decomposition_list (list): Decompositions which apply to cmd.
+        """
+        key = get_command_signature(cmd)
+        if key in self._active:
+            raise _CyclicDecompositionError()
+        if len(decomposition_list) == 1:
+            return self._guard(key, decomposition_list[0])
+        if key in self._choices:
+            return self._guard(key, decomposition_list[self._choices[key]])
+
+        replacer = self._find_replacer(cmd)
+        if replacer is None:
+            return decomposition_list[0]
+
+        self._active.add(key)
+        try:
+            costs = [self._get_cost(cmd, decomp, replacer)
+                     for decomp in decomposition_list]
+        finally:
+            self._active.remove(key)
+
+        feasible = [i for i in range(len(costs)) if costs[i] is not None]
+        if len(feasible) == 0:
+            if len(self._active) > 0:
+                # all decompositions run into a cycle: so does the caller's
+                raise _CyclicDecompositionError()
+            return decomposition_list[0]
+        best = min(feasible, key=lambda i: costs[i])
+        self._choices[key] = best
+        return decomposition_list[best]
+
+    def _guard(self, key, decomposition):
+        """
+        Return the decomposition, which, during a dry run, is wrapped such
+        that cycles through the command signature key are detected.
+        """
+        if len(self._active) == 0:
+            return decomposition
+        return _GuardedDecomposition(self._active, key, decomposition)
+
+    def _find_replacer(self, cmd):
+        """
+        Return the AutoReplacer in the pipeline of cmd which uses this
+        chooser (or None if there is none).
+        """
+        from ._replacer import AutoReplacer
+        engine = cmd.engine.main_engine
+        while engine is not None:
+            if (isinstance(engine, AutoReplacer) and
+                    engine._decomp_chooser is self):
+                return engine
+            engine = engine.next_engine
+        return None
+
+    def _get_dry_run(self, replacer):
+        """
+        Return the dry-run pipeline (MainEngine, AutoReplacer and cost
+        counter) imitating the given AutoReplacer.
+
+        The pipelines are built once and reused, as every MainEngine registers
+        an exit handler (which cannot be removed on Python 2). A pipeline is
+        never used by two dry runs at once: nested dry runs imitate the
+        AutoReplacer of the enclosing dry run.
+
+        Args:
+            replacer (AutoReplacer): AutoReplacer which is decomposing
+                commands using this chooser.
+        """
+        try:
+            return self._dry_runs[id(replacer)][1:]
+        except KeyError:
+            pass
+        from projectq.cengines import MainEngine
+        from ._replacer import AutoReplacer, InstructionFilter
+
+        counter = _CostCounter(None)
+        dry_replacer = AutoReplacer(replacer.decompositionRuleSet, self)
+        dry_filter = InstructionFilter(lambda eng, c: replacer.is_available(c))
+        dry_eng = MainEngine(backend=counter,
+                             engine_list=[dry_replacer, dry_filter])
+        # keep the replacer alive, such that its id is not reused
+        self._dry_runs[id(replacer)] = (replacer, dry_eng, dry_replacer,
+                                        counter)
+        return dry_eng, dry_replacer, counter
+
+    def _get_cost(self, cmd, decomposition, replacer):
+        """
+        Return the cost of decomposing cmd using the given decomposition (or
+        None if the decomposition cannot be carried out).
+
+        Args:
+            cmd (Command): Command to decompose.
+            decomposition: Decomposition to use for cmd.
+            replacer (AutoReplacer): AutoReplacer which is decomposing cmd.
+        """
+        from ._replacer import NoGateDecompositionError
+
+        dry_eng, dry_replacer, counter = self._get_dry_run(replacer)
+        counter.reset(self.metric if callable(self.metric) else None)
+        # use fresh qubit ids for ancilla qubits
+        dry_eng._qubit_idx = replacer.main_engine._qubit_idx
+
+        qubits = tuple([WeakQubitRef(dry_eng, qb.id) for qb in qureg]
+                       for qureg in cmd.qubits)
+        controls = [WeakQubitRef(dry_eng, qb.id) for qb in cmd.control_qubits]
+        old_tags = cmd.tags[:]
+
+        def cmd_mod_fun(new_cmd):
+            new_cmd.tags = old_tags[:] + new_cmd.tags
+            new_cmd.engine = dry_eng
+            return new_cmd
+        dry_cmd = Command(dry_eng, cmd.gate, qubits, controls, cmd.tags[:])
+        dry_cmd.engine = ForwarderEngine(dry_replacer, cmd_mod_fun)
+        try:
+            decomposition.decompose(dry_cmd)
+        except (_CyclicDecompositionError, NoGateDecompositionError):
+            return None
+
+        if callable(self.metric):
+            return (counter.weighted_cost, counter.gate_count)
+        if self.metric == "gates":
+            return (counter.gate_count, counter.depth)
+        if self.metric == "depth":
+            return (counter.depth, counter.gate_count)
+        return (counter.max_ancillas, counter.gate_count)
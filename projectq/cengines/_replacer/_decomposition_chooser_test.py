@@ -0,0 +1,216 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.cengines._replacer._decomposition_chooser.py."""
+
+import pytest
+
+import projectq.setups.decompositions
+from projectq import MainEngine
+from projectq.cengines import (AutoReplacer,
+                               CostDecompositionChooser,
+                               DecompositionRule,
+                               DecompositionRuleSet,
+                               DummyEngine,
+                               InstructionFilter)
+from projectq.meta import Control, get_control_count
+from projectq.ops import (BasicGate, ClassicalInstructionGate, CNOT, H, Rz, S,
+                          T, X, Y)
+
+
+class MyGate(BasicGate):
+    pass
+
+
+class OtherGate(BasicGate):
+    pass
+
+
+def _low_level_gates(eng, cmd):
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return True
+    if get_control_count(cmd) == 1 and cmd.gate == X:
+        return True
+    try:
+        return get_control_count(cmd) == 0 and len(cmd.gate.matrix) == 2
+    except AttributeError:
+        return False
+
+
+def _run(rules, chooser, num_qubits=1, gate=MyGate):
+    backend = DummyEngine(save_commands=True)
+    rule_set = DecompositionRuleSet(rules=rules)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set, chooser),
+                                  InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(num_qubits)
+    gate() | tuple(qureg)
+    eng.flush()
+    return [cmd for cmd in backend.received_commands
+            if not isinstance(cmd.gate, ClassicalInstructionGate)]
+
+
+def test_chooser_picks_fewest_gates():
+    def expensive(cmd):
+        H | cmd.qubits
+        S | cmd.qubits
+        H | cmd.qubits
+
+    def cheap(cmd):
+        T | cmd.qubits
+
+    rules = [DecompositionRule(MyGate, expensive),
+             DecompositionRule(MyGate, cheap)]
+    assert len(_run(rules, lambda cmd, decomps: decomps[0])) == 3
+    commands = _run(rules, CostDecompositionChooser())
+    assert len(commands) == 1
+    assert commands[0].gate == T
+
+
+def test_chooser_includes_sub_decompositions():
+    # OtherGate looks cheap but decomposes into many gates
+    def via_other_gate(cmd):
+        OtherGate() | cmd.qubits
+
+    def direct(cmd):
+        H | cmd.qubits
+        T | cmd.qubits
+
+    def decompose_other(cmd):
+        for i in range(3):
+            H | cmd.qubits
+            S | cmd.qubits
+
+    rules = [DecompositionRule(MyGate, via_other_gate),
+             DecompositionRule(MyGate, direct),
+             DecompositionRule(OtherGate, decompose_other)]
+    assert len(_run(rules, CostDecompositionChooser())) == 2
+
+
+def test_chooser_metrics():
+    def parallel(cmd):
+        for qb in cmd.qubits:
+            H | qb
+            T | qb
+
+    def sequential(cmd):
+        CNOT | (cmd.qubits[0][0], cmd.qubits[1][0])
+        CNOT | (cmd.qubits[1][0], cmd.qubits[2][0])
+        H | cmd.qubits[2]
+
+    def with_ancilla(cmd):
+        ancilla = cmd.engine.allocate_qubit()
+        CNOT | (cmd.qubits[0][0], ancilla[0])
+        del ancilla
+
+    rules = [DecompositionRule(MyGate, parallel),
+             DecompositionRule(MyGate, sequential)]
+    assert len(_run(rules, CostDecompositionChooser("gates"), 3)) == 3
+    assert len(_run(rules, CostDecompositionChooser("depth"), 3)) == 6
+
+    rules = [DecompositionRule(MyGate, with_ancilla),
+             DecompositionRule(MyGate, parallel)]
+    assert len(_run(rules, CostDecompositionChooser("gates"), 3)) == 1
+    assert len(_run(rules, CostDecompositionChooser("ancillas"), 3)) == 6
+
+    # user-defined weights: controlled gates are expensive
+    def weight(cmd):
+        return 10 if len(cmd.all_qubits[0]) > 0 else 1
+
+    rules = [DecompositionRule(MyGate, sequential),
+             DecompositionRule(MyGate, parallel)]
+    assert len(_run(rules, CostDecompositionChooser(weight), 3)) == 6
+
+
+def test_chooser_memoizes_choice():
+    calls = []
+
+    def first(cmd):
+        calls.append(1)
+        H | cmd.qubits
+        H | cmd.qubits
+
+    def second(cmd):
+        calls.append(2)
+        Y | cmd.qubits
+
+    rules = [DecompositionRule(MyGate, first),
+             DecompositionRule(MyGate, second)]
+    chooser = CostDecompositionChooser()
+    rule_set = DecompositionRuleSet(rules=rules)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set, chooser),
+                                  InstructionFilter(_low_level_gates)])
+    qubit = eng.allocate_qubit()
+    for _ in range(5):
+        MyGate() | qubit
+    # two dry runs and five actual decompositions
+    assert calls == [1, 2] + 5 * [2]
+
+
+def test_chooser_avoids_cyclic_decompositions():
+    # Using the first decomposition, the multi-controlled rotation gates are
+    # decomposed into themselves (when only CNOT and single-qubit gates are
+    # available).
+    rule_set = DecompositionRuleSet(modules=[projectq.setups.decompositions])
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set,
+                                               CostDecompositionChooser()),
+                                  InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(4)
+    with Control(eng, qureg[:3]):
+        Rz(0.5) | qureg[3]
+    eng.flush()
+    assert len(backend.received_commands) > 10
+    for cmd in backend.received_commands:
+        assert _low_level_gates(eng, cmd)
+
+
+def test_chooser_reuses_dry_runs(monkeypatch):
+    # every MainEngine registers an exit handler: the dry runs must not
+    # create a new MainEngine each
+    import atexit
+    handlers = []
+    monkeypatch.setattr(atexit, "register",
+                        lambda *args: handlers.append(args))
+    chooser = CostDecompositionChooser()
+    costs = []
+    get_cost = chooser._get_cost
+
+    def counting_get_cost(*args):
+        costs.append(get_cost(*args))
+        return costs[-1]
+    monkeypatch.setattr(chooser, "_get_cost", counting_get_cost)
+    rule_set = DecompositionRuleSet(modules=[projectq.setups.decompositions])
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend,
+                     engine_list=[AutoReplacer(rule_set, chooser),
+                                  InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(4)
+    with Control(eng, qureg[:3]):
+        Rz(0.5) | qureg[3]
+        X | qureg[3]
+    with Control(eng, qureg[:2]):
+        H | qureg[3]
+    eng.flush()
+    assert len(costs) > 10
+    assert len(handlers) == 1 + len(chooser._dry_runs)
+    assert len(chooser._dry_runs) < len(costs)
+
+
+def test_chooser_invalid_metric():
+    with pytest.raises(ValueError):
+        CostDecompositionChooser("qubits")
@@ -12,7 +12,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from projectq.meta import Dagger
+from projectq.meta._dagger import Dagger
 
 
 class DecompositionRuleSet:
@@ -39,7 +39,7 @@ class InstructionFilter(BasicEngine):
     this function, which then returns whether this command can be executed
     (True) or needs replacement (False).
     """
-    def __init__(self, filterfun):
+    def __init__(self, filterfun, keyfun=None):
         """
         Initializer: The provided filterfun returns True for all commands
         which do not need replacement and False for commands that do.
@@ -48,9 +48,26 @@ class InstructionFilter(BasicEngine):
             filterfun (function): Filter function which returns True for
                 available commands, and False otherwise. filterfun will be
                 called as filterfun(self, cmd).
+            keyfun (function): Optional function which returns a key such
+                that the result of filterfun only depends on this key (or
+                None if it cannot be cached). The results of filterfun are
+                then cached per key (see BasicEngine.get_availability_key).
+                keyfun will be called as keyfun(self, cmd).
+
+        Example:
+            .. code-block:: python
+
+                def filterfun(eng, cmd):
+                    return get_control_count(cmd) <= 1
+
+                def keyfun(eng, cmd):
+                    return get_control_count(cmd)
+
+                instruction_filter = InstructionFilter(filterfun, keyfun)
         """
         BasicEngine.__init__(self)
         self._filterfun = filterfun
+        self._keyfun = keyfun
 
     def is_available(self, cmd):
         """
@@ -62,6 +79,18 @@ class InstructionFilter(BasicEngine):
         """
         return self._filterfun(self, cmd)
 
+    def get_availability_key(self, cmd):
+        """
+        Return the key of cmd according to the key function given to the
+        constructor (or None if there is none).
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        if self._keyfun is None:
+            return None
+        return self._keyfun(self, cmd)
+
     def receive(self, command_list):
         """
         Forward all commands to the next engine.
@@ -81,7 +110,8 @@ class AutoReplacer(BasicEngine):
     """
     def __init__(self, decompositionRuleSet,
                  decomposition_chooser=lambda cmd,
-                 decomposition_list: decomposition_list[0]):
+                 decomposition_list: decomposition_list[0],
+                 decomposition_cache=None):
         """
         Initialize an AutoReplacer.
 
@@ -90,6 +120,10 @@ class AutoReplacer(BasicEngine):
                 Command to decompose and a list of potential Decomposition
                 objects, determines (and then returns) the 'best'
                 decomposition.
+            decomposition_cache (DecompositionCache): Cache in which to record
+                the fully decomposed command sequences, which are then
+                replayed for later commands with the same signature (see
+                DecompositionCache). No caching is done if None.
 
         The default decomposition chooser simply returns the first list
         element, i.e., calling
@@ -109,21 +143,42 @@ class AutoReplacer(BasicEngine):
         BasicEngine.__init__(self)
         self._decomp_chooser = decomposition_chooser
         self.decompositionRuleSet = decompositionRuleSet
+        self.decomposition_cache = decomposition_cache
+        # templates which are currently recording (nested decompositions)
+        self._recording = []
+
+    def _record(self, cmd):
+        """
+        Record a command which needs no (further) decomposition in all
+        templates which are currently recording.
+
+        Args:
+            cmd (Command): Command which is sent on.
+        """
+        for template in self._recording:
+            template.record(cmd)
 
     def _process_command(self, cmd):
         """
-        Check whether a command cmd can be handled by further engines and,
-        if not, replace it using the decomposition rules loaded with the setup
-        (e.g., setups.default).
+        Replace a command cmd which cannot be handled by further engines,
+        using the decomposition cache or the decomposition rules loaded with
+        the setup (e.g., setups.default).
 
         Args:
-            cmd (Command): Command to process.
+            cmd (Command): Command to process (which is not available, see
+                is_available).
 
         Raises:
             Exception if no replacement is available in the loaded setup.
         """
-        if self.is_available(cmd):
-            self.send([cmd])
+        cache = self.decomposition_cache
+        template = cache.lookup(cmd) if cache is not None else None
+        if template is not None:
+            # replay the commands recorded for an equal command
+            command_list = template.replay(cmd, self.main_engine)
+            for new_cmd in command_list:
+                self._record(new_cmd)
+            self.send(command_list)
         else:
             # check for decomposition rules
             decomp_list = []
@@ -198,7 +253,28 @@ class AutoReplacer(BasicEngine):
             cmd.engine = forwarder_eng  # send gates directly to forwarder
             # (and not to main engine, which would screw up the ordering).
 
-            chosen_decomp.decompose(cmd)  # run the decomposition
+            self._decompose(cmd, chosen_decomp)  # run the decomposition
+
+    def _decompose(self, cmd, decomposition):
+        """
+        Run the decomposition of cmd and, if a decomposition cache is used,
+        record the fully decomposed commands for later replay.
+
+        Args:
+            cmd (Command): Command to decompose.
+            decomposition (DecompositionRule): Decomposition to run.
+        """
+        cache = self.decomposition_cache
+        if cache is None:
+            decomposition.decompose(cmd)
+            return
+        template = cache.start_recording(cmd)
+        self._recording.append(template)
+        try:
+            decomposition.decompose(cmd)
+        finally:
+            self._recording.pop()
+        cache.store(cmd, template)
 
     def receive(self, command_list):
         """
@@ -209,8 +285,18 @@ class AutoReplacer(BasicEngine):
         Args:
             command_list (list<Command>): List of commands to handle.
         """
+        # commands which need no decomposition are sent on together
+        available = []
         for cmd in command_list:
-            if not isinstance(cmd.gate, FlushGate):
-                self._process_command(cmd)
+            if isinstance(cmd.gate, FlushGate):
+                available.append(cmd)
+            elif self.is_available(cmd):
+                self._record(cmd)
+                available.append(cmd)
             else:
-                self.send([cmd])
+                if len(available) > 0:
+                    self.send(available)
+                    available = []
+                self._process_command(cmd)
+        if len(available) > 0:
+            self.send(available)
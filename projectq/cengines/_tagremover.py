@@ -18,7 +18,7 @@ Compute/Uncompute), thus enabling optimization across meta statements (loops
 after unrolling, compute/uncompute, ...)
 """
 from projectq.cengines import BasicEngine
-from projectq.meta import ComputeTag, UncomputeTag
+from projectq.meta._compute import ComputeTag, UncomputeTag
 
 
 class TagRemover(BasicEngine):
@@ -55,4 +55,4 @@ class TagRemover(BasicEngine):
         for cmd in command_list:
             for tag in self._tags:
                 cmd.tags = [t for t in cmd.tags if not isinstance(t, tag)]
-            self.send([cmd])
+        self.send(command_list)
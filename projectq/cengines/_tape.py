@@ -0,0 +1,287 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the TapeRecorder, which records the compiled command stream into a
+Tape such that it can be replayed on the backend without running the
+compiler engines again.
+"""
+from array import array
+
+from projectq.cengines import BasicEngine
+from projectq.ops import (AllocateQubitGate, Command, DeallocateQubitGate,
+                          FlushGate)
+from projectq.types import BasicQubit, Qubit, WeakQubitRef
+
+
+class Tape(object):
+    """
+    Compact record of a command stream.
+
+    The gates and tag lists are stored once in a table each; every command
+    is encoded as integers in the array `commands`: the index of its gate,
+    the index of its tags, the number of qubit registers followed by their
+    lengths, and the number of control qubits. The ids of the qubits (the
+    registers first, then the controls) are stored in the array `qubit_ids`.
+
+    Attributes:
+        gates (list<BasicGate>): Distinct gate objects of the commands.
+        tags (list<list>): Distinct tag lists of the commands.
+        commands (array): Encoded commands (see above).
+        qubit_ids (array): Ids of the qubits of all commands.
+    """
+    def __init__(self):
+        self.gates = []
+        self.tags = [[]]
+        self.commands = array('l')
+        self.qubit_ids = array('l')
+        self._num_commands = 0
+        self._gate_index = dict()
+
+    def __len__(self):
+        """ Return the number of recorded commands. """
+        return self._num_commands
+
+    def append(self, cmd):
+        """
+        Append a command to the tape.
+
+        Args:
+            cmd (Command): Command to record.
+        """
+        # gates are identified by object (they need not be hashable)
+        gate_index = self._gate_index.get(id(cmd.gate))
+        if gate_index is None:
+            gate_index = len(self.gates)
+            self._gate_index[id(cmd.gate)] = gate_index
+            self.gates.append(cmd.gate)
+        tags = cmd.tags
+        if len(tags) == 0:
+            tag_index = 0
+        elif tags == self.tags[-1]:
+            tag_index = len(self.tags) - 1
+        else:
+            tag_index = len(self.tags)
+            self.tags.append(list(tags))
+        commands = self.commands
+        commands.append(gate_index)
+        commands.append(tag_index)
+        commands.append(len(cmd.qubits))
+        for qureg in cmd.qubits:
+            commands.append(len(qureg))
+            self.qubit_ids.extend(qubit.id for qubit in qureg)
+        commands.append(len(cmd.control_qubits))
+        self.qubit_ids.extend(qubit.id for qubit in cmd.control_qubits)
+        self._num_commands += 1
+
+    def __iter__(self):
+        """
+        Iterate over the recorded commands.
+
+        Yields:
+            Tuples (gate, qubit_ids, control_ids, tags), where qubit_ids is
+            a list of lists of qubit ids (one per register) and control_ids
+            is a list of qubit ids.
+        """
+        commands = self.commands
+        qubit_ids = self.qubit_ids
+        pos = 0
+        id_pos = 0
+        while pos < len(commands):
+            gate = self.gates[commands[pos]]
+            tags = self.tags[commands[pos + 1]]
+            num_quregs = commands[pos + 2]
+            pos += 3
+            quregs = []
+            for _ in range(num_quregs):
+                length = commands[pos]
+                quregs.append(qubit_ids[id_pos:id_pos + length].tolist())
+                id_pos += length
+                pos += 1
+            num_ctrls = commands[pos]
+            controls = qubit_ids[id_pos:id_pos + num_ctrls].tolist()
+            id_pos += num_ctrls
+            pos += 1
+            yield gate, quregs, controls, tags
+
+
+class TapeRecorder(BasicEngine):
+    """
+    TapeRecorder is a compiler engine which records the commands it receives
+    into a Tape (while recording) and sends them on unchanged.
+
+    Place it as the last compiler engine, i.e., right before the backend. A
+    recorded tape can then be replayed on the backend, which skips all
+    compiler engines (e.g., the decomposition and optimization of the
+    circuit) in later iterations of, e.g., a variational algorithm.
+
+    Example:
+        .. code-block:: python
+
+            recorder = TapeRecorder()
+            eng = MainEngine(Simulator(), default_engines() + [recorder])
+            qureg = eng.allocate_qureg(4)
+            with recorder.record() as tape:
+                circuit(eng, qureg)
+            for i in range(100):
+                recorder.replay(tape)
+                ...
+    """
+    def __init__(self):
+        """
+        Initialize a TapeRecorder (which is not recording).
+        """
+        BasicEngine.__init__(self)
+        self._tape = None
+
+    def start(self):
+        """
+        Flush the pipeline (such that no commands issued before are
+        recorded) and start recording into a new tape.
+
+        Returns:
+            The Tape (which is filled until stop is called).
+
+        Raises:
+            RuntimeError: If the TapeRecorder is recording already.
+        """
+        if self._tape is not None:
+            raise RuntimeError("The TapeRecorder is recording already.")
+        self.main_engine.flush()
+        self._tape = Tape()
+        return self._tape
+
+    def stop(self):
+        """
+        Flush the pipeline (such that all commands issued so far are
+        recorded) and stop recording.
+
+        Returns:
+            The recorded Tape.
+        """
+        self.main_engine.flush()
+        tape = self._tape
+        self._tape = None
+        return tape
+
+    def record(self):
+        """
+        Return a context manager which records the commands of its
+        with-block and returns the Tape upon entering.
+        """
+        return _RecordingContext(self)
+
+    def replay(self, tape, qubit_map=None):
+        """
+        Send the commands of a tape to the next engine (the backend).
+
+        Qubits which were allocated within the recorded section (and are not
+        in qubit_map) receive new ids; all other qubits keep their ids unless
+        qubit_map maps them to different qubits.
+
+        The commands bypass the MainEngine; an AsyncBackend discards the
+        outdated results of replayed measurements once they are queued.
+
+        Args:
+            tape (Tape): Recorded tape to replay.
+            qubit_map (dict): Maps the ids of the recorded qubits to the
+                qubits (or ids) to use instead.
+
+        Returns:
+            A dictionary which maps the ids of the recorded qubits which were
+            allocated but not deallocated within the recorded section to
+            their new qubits. These qubits are owned by the caller (like the
+            qubits returned by allocate_qubit), i.e., they are deallocated
+            once they are no longer referenced.
+
+        Example:
+            .. code-block:: python
+
+                with recorder.record() as tape:
+                    ancilla = eng.allocate_qubit()
+                    CNOT | (qubit, ancilla)
+                new_qubits = recorder.replay(tape)
+                Measure | new_qubits[ancilla[0].id]
+        """
+        main_engine = self.main_engine
+        id_map = dict()
+        if qubit_map is not None:
+            for qubit_id, qubit in qubit_map.items():
+                if isinstance(qubit, BasicQubit):
+                    qubit = qubit.id
+                id_map[qubit_id] = qubit
+        refs = dict()
+
+        def get_ref(qubit_id):
+            try:
+                return refs[qubit_id]
+            except KeyError:
+                new_id = id_map.get(qubit_id, qubit_id)
+                ref = WeakQubitRef(main_engine, new_id)
+                refs[qubit_id] = ref
+                return ref
+
+        # the previous compiler engines may still hold commands which act
+        # on the qubits of the tape
+        main_engine.flush()
+        command_list = []
+        allocated_ids = []
+        deallocated_ids = set()
+        for gate, quregs, controls, tags in tape:
+            if (isinstance(gate, AllocateQubitGate) and
+                    quregs[0][0] not in id_map):
+                # allocated within the recorded section: use a new qubit
+                id_map[quregs[0][0]] = main_engine.get_new_qubit_id()
+                allocated_ids.append(quregs[0][0])
+            elif isinstance(gate, DeallocateQubitGate):
+                deallocated_ids.add(quregs[0][0])
+            command_list.append(Command(
+                main_engine, gate,
+                tuple([get_ref(i) for i in qureg] for qureg in quregs),
+                [get_ref(i) for i in controls], tags))
+        self.send(command_list)
+        # hand the qubits which are still allocated over to the caller
+        new_qubits = dict()
+        for qubit_id in allocated_ids:
+            if qubit_id not in deallocated_ids:
+                qubit = Qubit(main_engine, id_map[qubit_id])
+                main_engine.active_qubits.add(qubit)
+                main_engine.active_qubit_index[qubit.id] = qubit
+                new_qubits[qubit_id] = qubit
+        return new_qubits
+
+    def receive(self, command_list):
+        """
+        Record the commands (while recording) and send them on.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        if self._tape is not None:
+            for cmd in command_list:
+                if not isinstance(cmd.gate, FlushGate):
+                    self._tape.append(cmd)
+        self.send(command_list)
+
+
+class _RecordingContext(object):
+    """ Context manager returned by TapeRecorder.record. """
+    def __init__(self, recorder):
+        self._recorder = recorder
+
+    def __enter__(self):
+        return self._recorder.start()
+
+    def __exit__(self, type, value, traceback):
+        self._recorder.stop()
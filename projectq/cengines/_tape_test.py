@@ -0,0 +1,157 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.cengines._tape.py."""
+
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import AsyncBackend, Simulator
+from projectq.cengines import DummyEngine, LocalOptimizer
+from projectq.meta import ComputeTag
+from projectq.ops import (CNOT, Command, Deallocate, FlushGate, H, Measure,
+                          Rx, Toffoli, X)
+from projectq.setups.default import default_engines
+from projectq.types import WeakQubitRef
+
+from projectq.cengines import _tape
+
+
+def test_tape_encoding():
+    eng = DummyEngine()
+    qb0, qb1, qb2 = [WeakQubitRef(eng, i) for i in range(3)]
+    tape = _tape.Tape()
+    tape.append(Command(eng, H, ([qb0],)))
+    tape.append(Command(eng, X, ([qb2],), controls=[qb1, qb0],
+                        tags=[ComputeTag()]))
+    tape.append(Command(eng, H, ([qb1],), tags=[ComputeTag()]))
+    tape.append(Command(eng, Measure, ([qb0],)))
+    assert len(tape) == 4
+    assert tape.gates == [H, X, Measure]
+    assert tape.tags == [[], [ComputeTag()]]
+    assert list(tape) == [(H, [[0]], [], []),
+                          (X, [[2]], [0, 1], [ComputeTag()]),
+                          (H, [[1]], [], [ComputeTag()]),
+                          (Measure, [[0]], [], [])]
+
+
+def test_tape_recorder_records_compiled_commands():
+    backend = DummyEngine(save_commands=True)
+    recorder = _tape.TapeRecorder()
+    eng = MainEngine(backend, [LocalOptimizer(m=5), recorder])
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    with recorder.record() as tape:
+        with pytest.raises(RuntimeError):
+            recorder.start()
+        Rx(0.1) | qureg[1]
+        Rx(0.2) | qureg[1]
+        CNOT | (qureg[0], qureg[1])
+    # the commands issued before were flushed, the rotations are merged and
+    # flush gates are not recorded
+    assert [gate for gate, _, _, _ in tape] == [Rx(0.3), X]
+    del backend.received_commands[:]
+    recorder.replay(tape, {qureg[0].id: qureg[1], qureg[1].id: qureg[0].id})
+    cmds = backend.received_commands
+    assert [cmd.gate for cmd in cmds] == [FlushGate(), Rx(0.3), X]
+    assert cmds[1].qubits[0][0].id == qureg[0].id
+    assert cmds[2].control_qubits[0].id == qureg[1].id
+    assert cmds[2].qubits[0][0].id == qureg[0].id
+    assert all(cmd.engine is eng for cmd in cmds)
+
+
+def _circuit(eng, qureg):
+    H | qureg[0]
+    H | qureg[1]
+    Toffoli | (qureg[0], qureg[1], qureg[2])
+    ancilla = eng.allocate_qubit()
+    CNOT | (qureg[2], ancilla)
+    Rx(0.3) | ancilla
+    CNOT | (qureg[0], ancilla)
+    Measure | ancilla
+    del ancilla
+
+
+def test_tape_recorder_replay_on_simulator():
+    recorder = _tape.TapeRecorder()
+    sim = Simulator(rnd_seed=5)
+    eng = MainEngine(sim, default_engines() + [recorder])
+    qureg = eng.allocate_qureg(3)
+    with recorder.record() as tape:
+        _circuit(eng, qureg)
+    assert any(gate == Deallocate for gate, _, _, _ in tape)
+    next_id = eng._qubit_idx
+    recorder.replay(tape)
+    # the ancilla received a new id
+    assert eng._qubit_idx == next_id + 1
+    eng.flush()
+    # compare to running the circuit twice
+    sim2 = Simulator(rnd_seed=5)
+    eng2 = MainEngine(sim2, default_engines())
+    qureg2 = eng2.allocate_qureg(3)
+    _circuit(eng2, qureg2)
+    _circuit(eng2, qureg2)
+    eng2.flush()
+    for i in range(8):
+        bits = [(i >> j) & 1 for j in range(3)]
+        assert sim.get_amplitude(bits, qureg) == pytest.approx(
+            sim2.get_amplitude(bits, qureg2))
+    Measure | qureg
+    Measure | qureg2
+
+
+def test_tape_recorder_replay_returns_allocated_qubits():
+    recorder = _tape.TapeRecorder()
+    sim = Simulator()
+    eng = MainEngine(sim, [recorder])
+    qubit = eng.allocate_qubit()
+    with recorder.record() as tape:
+        ancilla = eng.allocate_qubit()
+        temporary = eng.allocate_qubit()
+        H | qubit
+        CNOT | (qubit, ancilla)
+        del temporary
+    with recorder.record() as tape_without_allocations:
+        H | qubit
+    assert recorder.replay(tape_without_allocations) == dict()
+    new_qubits = recorder.replay(tape)
+    # the temporary qubit was deallocated within the recorded section
+    assert list(new_qubits) == [ancilla[0].id]
+    new_ancilla = new_qubits[ancilla[0].id]
+    assert new_ancilla.id not in (qubit[0].id, ancilla[0].id)
+    assert eng.get_active_qubit(new_ancilla.id) is new_ancilla
+    eng.flush()
+    assert len(sim.cheat()[0]) == 3
+    Measure | new_ancilla
+    Measure | qubit + ancilla
+    del new_qubits, new_ancilla
+    eng.flush()
+    assert len(sim.cheat()[0]) == 2
+
+
+def test_tape_recorder_replay_measurement_async():
+    # replayed measurements must not return the result of the previous run
+    recorder = _tape.TapeRecorder()
+    eng = MainEngine(AsyncBackend(Simulator()), [recorder])
+    qubit = eng.allocate_qubit()
+    with recorder.record() as tape:
+        X | qubit
+        Measure | qubit
+    assert int(qubit) == 1
+    for i in range(10):
+        recorder.replay(tape)
+        expected = i % 2 == 1
+        assert eng._measurements.get(qubit[0].id, expected) == expected
+        assert int(qubit) == expected
+    eng.flush()
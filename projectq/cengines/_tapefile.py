@@ -0,0 +1,467 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains a binary file format for compiled command streams (see Tape), an
+engine which writes the commands it receives to such a file (TapeWriter),
+and a cache directory of compiled circuits (CompiledCircuitCache).
+
+File format (little-endian): The header b"PQTAPE" and a format version byte
+are followed by records, each starting with a record type byte:
+
+    * b"G": Gate definition (the gates are numbered in order of definition).
+      A gate is encoded as a kind byte followed by
+        - kind 0: opcode (uint8), followed by the angle (float64) for
+          rotation and phase gates,
+        - kind 1: the encoding of the gate of which it is the inverse
+          (DaggeredGate),
+        - kind 2: length (uint32) and pickle of the gate (other gates,
+          including rotation and phase gates with symbolic angles).
+    * b"T": Tag list definition: length (uint32) and pickle of the list
+      (the tag lists are numbered in order of definition, starting at 1; 0
+      is the empty list).
+    * b"C": Command: gate index (uint32), tag index (uint32), number of qubit
+      registers (uint32) and, for each register, its length (uint32)
+      followed by the qubit ids (int64), then the number of control qubits
+      (uint32) followed by their ids (int64).
+"""
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import types
+
+import projectq
+from projectq.cengines import BasicEngine, DecompositionRuleSet
+from projectq.ops import (AllocateDirtyQubitGate,
+                          AllocateQubitGate,
+                          BasicPhaseGate,
+                          BasicRotationGate,
+                          DaggeredGate,
+                          DeallocateQubitGate,
+                          EntangleGate,
+                          FlushGate,
+                          HGate,
+                          MeasureGate,
+                          Ph,
+                          R,
+                          Rx,
+                          Ry,
+                          Rz,
+                          SGate,
+                          SwapGate,
+                          TGate,
+                          XGate,
+                          YGate,
+                          ZGate)
+from ._tape import Tape
+
+_MAGIC = b"PQTAPE"
+_VERSION = 1
+
+# gate classes which are encoded by their opcode (the index in this list);
+# new classes must be appended to keep existing files readable
+_OPCODE_CLASSES = [HGate, XGate, YGate, ZGate, SGate, TGate, SwapGate,
+                   EntangleGate, MeasureGate, AllocateQubitGate,
+                   DeallocateQubitGate, AllocateDirtyQubitGate, Rx, Ry, Rz,
+                   Ph, R]
+_OPCODES = {cls: opcode for opcode, cls in enumerate(_OPCODE_CLASSES)}
+
+_UINT8 = struct.Struct("<B")
+_UINT32 = struct.Struct("<I")
+_FLOAT64 = struct.Struct("<d")
+
+
+def _encode_gate(gate):
+    opcode = _OPCODES.get(type(gate))
+    if opcode is not None and len(gate.parameters) == 0:
+        data = _UINT8.pack(0) + _UINT8.pack(opcode)
+        if isinstance(gate, (BasicRotationGate, BasicPhaseGate)):
+            data += _FLOAT64.pack(gate._angle)
+        return data
+    if type(gate) is DaggeredGate:
+        return _UINT8.pack(1) + _encode_gate(gate._gate)
+    return _UINT8.pack(2) + _encode_pickle(gate)
+
+
+def _encode_pickle(obj):
+    try:
+        data = pickle.dumps(obj, protocol=2)
+    except Exception as err:
+        raise ValueError("Cannot write {!r} to a tape file: {}"
+                         .format(obj, err))
+    return _UINT32.pack(len(data)) + data
+
+
+class _Reader(object):
+    """ Reads the values of a tape file. """
+    def __init__(self, fileobj):
+        self._file = fileobj
+
+    def read(self, size):
+        data = self._file.read(size)
+        if len(data) != size:
+            raise IOError("Unexpected end of tape file.")
+        return data
+
+    def read_uint8(self):
+        return _UINT8.unpack(self.read(1))[0]
+
+    def read_uint32(self):
+        return _UINT32.unpack(self.read(4))[0]
+
+    def read_ids(self, num):
+        return list(struct.unpack("<{}q".format(num), self.read(8 * num)))
+
+    def read_pickle(self):
+        return pickle.loads(self.read(self.read_uint32()))
+
+    def read_gate(self):
+        kind = self.read_uint8()
+        if kind == 0:
+            cls = _OPCODE_CLASSES[self.read_uint8()]
+            if issubclass(cls, (BasicRotationGate, BasicPhaseGate)):
+                return cls(_FLOAT64.unpack(self.read(8))[0])
+            return cls()
+        if kind == 1:
+            return DaggeredGate(self.read_gate())
+        return self.read_pickle()
+
+
+class _Writer(object):
+    """
+    Writes commands to a tape file, defining their gates and tag lists the
+    first time they occur.
+    """
+    def __init__(self, fileobj):
+        self._file = fileobj
+        self._gate_index = dict()
+        self._gates = []  # keeps the gates alive (they are keyed by id)
+        self._tags = [[]]
+        fileobj.write(_MAGIC + _UINT8.pack(_VERSION))
+
+    def _get_gate_index(self, gate):
+        index = self._gate_index.get(id(gate))
+        if index is None:
+            index = len(self._gates)
+            self._file.write(b"G" + _encode_gate(gate))
+            self._gate_index[id(gate)] = index
+            self._gates.append(gate)
+        return index
+
+    def _get_tag_index(self, tags):
+        if len(tags) == 0:
+            return 0
+        if tags != self._tags[-1]:
+            self._file.write(b"T" + _encode_pickle(list(tags)))
+            self._tags.append(list(tags))
+        return len(self._tags) - 1
+
+    def write(self, gate, quregs, controls, tags):
+        """
+        Write a command (given by its gate, the ids of its qubits and control
+        qubits, and its tags).
+        """
+        data = [b"C", _UINT32.pack(self._get_gate_index(gate)),
+                _UINT32.pack(self._get_tag_index(tags)),
+                _UINT32.pack(len(quregs))]
+        for ids in quregs:
+            data.append(_UINT32.pack(len(ids)))
+            data.append(struct.pack("<{}q".format(len(ids)), *ids))
+        data.append(_UINT32.pack(len(controls)))
+        data.append(struct.pack("<{}q".format(len(controls)), *controls))
+        self._file.write(b"".join(data))
+
+
+def write_tape(tape, fileobj):
+    """
+    Write a tape to a binary file.
+
+    Args:
+        tape (Tape): Tape to write.
+        fileobj: File opened for writing in binary mode.
+
+    Raises:
+        ValueError: If a gate or tag cannot be written (i.e., pickled).
+    """
+    writer = _Writer(fileobj)
+    for gate, quregs, controls, tags in tape:
+        writer.write(gate, quregs, controls, tags)
+
+
+def read_tape(fileobj):
+    """
+    Read a tape from a binary file (see write_tape and TapeWriter).
+
+    Args:
+        fileobj: File opened for reading in binary mode.
+
+    Warning:
+        Gates which have no opcode and tags are unpickled, such that reading
+        a file from an untrusted source can execute arbitrary code.
+
+    Returns:
+        The Tape, which can be replayed using TapeRecorder.replay.
+
+    Raises:
+        IOError: If the file is no (complete) tape file.
+    """
+    reader = _Reader(fileobj)
+    if reader.read(len(_MAGIC)) != _MAGIC:
+        raise IOError("Not a tape file.")
+    version = reader.read_uint8()
+    if version != _VERSION:
+        raise IOError("Unsupported tape file version {}.".format(version))
+    tape = Tape()
+    commands = tape.commands
+    qubit_ids = tape.qubit_ids
+    while True:
+        record_type = fileobj.read(1)
+        if record_type == b"":
+            break
+        if record_type == b"G":
+            tape.gates.append(reader.read_gate())
+        elif record_type == b"T":
+            tape.tags.append(reader.read_pickle())
+        elif record_type == b"C":
+            commands.append(reader.read_uint32())
+            commands.append(reader.read_uint32())
+            num_quregs = reader.read_uint32()
+            commands.append(num_quregs)
+            for _ in range(num_quregs + 1):
+                length = reader.read_uint32()
+                commands.append(length)
+                qubit_ids.extend(reader.read_ids(length))
+            tape._num_commands += 1
+        else:
+            raise IOError("Invalid record in tape file.")
+    return tape
+
+
+class TapeWriter(BasicEngine):
+    """
+    TapeWriter is a compiler engine which writes all commands it receives to
+    a binary tape file (see read_tape) as they arrive, and sends them on.
+
+    Flush gates are not written, but flush the file.
+
+    Example:
+        .. code-block:: python
+
+            with open("circuit.pqtape", "wb") as tape_file:
+                eng = MainEngine(Simulator(),
+                                 default_engines() + [TapeWriter(tape_file)])
+                ...
+                eng.flush()
+    """
+    def __init__(self, fileobj):
+        """
+        Initialize a TapeWriter and write the file header.
+
+        Args:
+            fileobj: File opened for writing in binary mode.
+        """
+        BasicEngine.__init__(self)
+        self._file = fileobj
+        self._writer = _Writer(fileobj)
+
+    def receive(self, command_list):
+        """
+        Write the commands to the file and send them on.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        for cmd in command_list:
+            if isinstance(cmd.gate, FlushGate):
+                self._file.flush()
+            else:
+                quregs = [[qb.id for qb in qureg] for qureg in cmd.qubits]
+                self._writer.write(cmd.gate, quregs,
+                                   [qb.id for qb in cmd.control_qubits],
+                                   cmd.tags)
+        self.send(command_list)
+
+
+def _describe_class(cls):
+    return "{}.{}".format(cls.__module__,
+                          getattr(cls, "__qualname__", cls.__name__))
+
+
+def _describe_function(function):
+    """
+    Return a description of a function: its qualified name and, for Python
+    functions, a hash of its code (to tell apart, e.g., lambda functions).
+    """
+    description = "{}.{}".format(getattr(function, "__module__", None),
+                                 getattr(function, "__qualname__",
+                                         function.__name__))
+    code = getattr(function, "__code__", None)
+    if code is not None:
+        constants = [value for value in code.co_consts
+                     if isinstance(value, (bool, int, float, str))]
+        description += ":" + hashlib.sha256(
+            code.co_code + repr(constants).encode()).hexdigest()[:16]
+    return description
+
+
+def _describe_value(value):
+    """
+    Return a description of a setting of an engine (or None if the value is
+    no setting but state, e.g., a buffer, a cache or another engine).
+
+    Settings are values of simple type (numbers, strings and booleans),
+    functions and other callables (e.g., filter functions and decomposition
+    choosers), decomposition rule sets, and lists, tuples, sets and
+    dictionaries of settings (e.g., the tags removed by a TagRemover).
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+    if isinstance(value, (list, tuple, set, frozenset, dict)):
+        if isinstance(value, dict):
+            descriptions = [(_describe_value(key), _describe_value(item))
+                            for key, item in value.items()]
+            if any(None in item for item in descriptions):
+                # contains state (e.g., buffered commands)
+                return None
+        else:
+            descriptions = [_describe_value(item) for item in value]
+            if None in descriptions:
+                return None
+        descriptions = [repr(item) for item in descriptions]
+        if isinstance(value, (set, frozenset, dict)):
+            descriptions.sort()
+        return "{}{}".format(type(value).__name__, descriptions)
+    if isinstance(value, DecompositionRuleSet):
+        return sorted("{}: {} {}".format(name, _describe_value(rule.decompose),
+                                         _describe_value(rule.check))
+                      for name, rules in value.decompositions.items()
+                      for rule in rules)
+    if isinstance(value, type):
+        return _describe_class(value)
+    if isinstance(value, types.MethodType):
+        return _describe_function(value.__func__)
+    if isinstance(value, (types.FunctionType, types.BuiltinFunctionType)):
+        return _describe_function(value)
+    if callable(value) and not isinstance(value, BasicEngine):
+        return _describe_engine(value)
+    return None
+
+
+def _describe_engine(engine):
+    """
+    Return a description of an engine (or of another object): its class and
+    its settings (see _describe_value).
+    """
+    settings = []
+    for key, value in sorted(vars(engine).items()):
+        description = _describe_value(value)
+        if description is not None:
+            settings.append((key, description))
+    return "{}{}".format(_describe_class(type(engine)), settings)
+
+
+class CompiledCircuitCache(object):
+    """
+    Content-addressed cache directory of compiled circuits (tapes).
+
+    The key of a circuit is a hash of its source (any string which
+    determines the circuit, e.g., the source code of the function building
+    it together with its arguments) and of the configuration of the compiler
+    engines (their classes and settings, including decomposition rules and
+    filter functions), the class of the backend and the ProjectQ version.
+
+    Warning:
+        Tape files may contain pickled gates, which are unpickled when the
+        tape is loaded. Only use cache directories which are trusted (i.e.,
+        which cannot be written by others).
+
+    Example:
+        .. code-block:: python
+
+            cache = CompiledCircuitCache("~/.cache/projectq")
+            key = cache.get_key("shor N=15 a=2", eng)
+            tape = cache.load(key)
+            if tape is None:
+                with recorder.record() as tape:
+                    circuit(eng, qureg)
+                cache.store(key, tape)
+            else:
+                recorder.replay(tape)
+    """
+    def __init__(self, directory):
+        """
+        Initialize the cache (creating the directory if it does not exist).
+
+        Args:
+            directory (str): Directory of the cached tape files.
+        """
+        self.directory = os.path.expanduser(directory)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def get_key(self, source, engine):
+        """
+        Return the key of a circuit.
+
+        Args:
+            source (str): String which determines the circuit.
+            engine (BasicEngine): First engine of the pipeline compiling the
+                circuit (usually the MainEngine); all engines up to the
+                backend and the class of the backend are part of the key.
+        """
+        description = [source, projectq.__version__]
+        engine = getattr(engine, "next_engine", None)
+        while engine is not None and not engine.is_last_engine:
+            description.append(_describe_engine(engine))
+            engine = engine.next_engine
+        # the gate set is decided by the backend (also if it is wrapped,
+        # e.g., by an AsyncBackend)
+        while engine is not None:
+            description.append(_describe_class(type(engine)))
+            engine = getattr(engine, "backend", None)
+        return hashlib.sha256("\n".join(description).encode()).hexdigest()
+
+    def _get_filename(self, key):
+        return os.path.join(self.directory, key + ".pqtape")
+
+    def load(self, key):
+        """
+        Return the cached tape of the given key (or None if there is none).
+        """
+        try:
+            with open(self._get_filename(key), "rb") as tape_file:
+                return read_tape(tape_file)
+        except (IOError, OSError):
+            return None
+
+    def store(self, key, tape):
+        """
+        Store a tape in the cache.
+
+        The file is written to a temporary file first, such that concurrent
+        processes never read incomplete tapes.
+        """
+        handle, filename = tempfile.mkstemp(dir=self.directory,
+                                            suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as tape_file:
+                write_tape(tape, tape_file)
+            # (os.rename does not replace existing files on Windows)
+            getattr(os, "replace", os.rename)(filename,
+                                              self._get_filename(key))
+        except BaseException:
+            os.remove(filename)
+            raise
@@ -0,0 +1,189 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.cengines._tapefile.py."""
+
+import io
+import os
+
+import pytest
+
+from projectq import MainEngine
+from projectq.backends import AsyncBackend, ResourceCounter
+from projectq.cengines import (AutoReplacer, CostDecompositionChooser,
+                               DecompositionRuleSet, DummyEngine,
+                               InstructionFilter, LocalOptimizer, Tape,
+                               TagRemover, TapeRecorder)
+from projectq.meta import ComputeTag, UncomputeTag
+from projectq.ops import (Allocate, BasicMathGate, Command, CNOT, H, Measure,
+                          Parameter, QFT, Rx, Rz, Sdag, Swap, X)
+from projectq.setups import decompositions
+from projectq.setups.decompositions import swap2cnot
+from projectq.types import WeakQubitRef
+
+from projectq.cengines import _tapefile
+
+
+def _make_tape():
+    eng = DummyEngine()
+    qb0, qb1, qb2 = [WeakQubitRef(eng, i) for i in range(3)]
+    tape = Tape()
+    for cmd in [Command(eng, Allocate, ([qb0],)),
+                Command(eng, H, ([qb0],)),
+                Command(eng, Rx(0.5), ([qb1],), controls=[qb0]),
+                Command(eng, Sdag, ([qb2],), tags=[ComputeTag()]),
+                Command(eng, Swap, ([qb0], [qb2])),
+                Command(eng, QFT, ([qb0, qb1, qb2],)),
+                Command(eng, X, ([qb2],), controls=[qb1, qb0]),
+                Command(eng, H, ([qb1],)),
+                Command(eng, Rz(2 * Parameter("theta") + 1), ([qb1],)),
+                Command(eng, Measure, ([qb0],))]:
+        tape.append(cmd)
+    return tape
+
+
+def test_write_read_tape():
+    tape = _make_tape()
+    tape_file = io.BytesIO()
+    _tapefile.write_tape(tape, tape_file)
+    tape_file.seek(0)
+    new_tape = _tapefile.read_tape(tape_file)
+    assert len(new_tape) == len(tape)
+    assert list(new_tape) == list(tape)
+    assert new_tape.commands == tape.commands
+    assert new_tape.qubit_ids == tape.qubit_ids
+
+
+def test_read_tape_errors():
+    with pytest.raises(IOError):
+        _tapefile.read_tape(io.BytesIO(b"NOTAPE"))
+    with pytest.raises(IOError):
+        _tapefile.read_tape(io.BytesIO(b"PQTAPE\x63"))
+    tape_file = io.BytesIO()
+    _tapefile.write_tape(_make_tape(), tape_file)
+    with pytest.raises(IOError):
+        _tapefile.read_tape(io.BytesIO(tape_file.getvalue()[:-3]))
+    with pytest.raises(IOError):
+        _tapefile.read_tape(io.BytesIO(tape_file.getvalue() + b"X"))
+
+
+def test_write_tape_unpicklable_gate():
+    eng = DummyEngine()
+    tape = Tape()
+    tape.append(Command(eng, BasicMathGate(lambda x: (x + 1,)),
+                        ([WeakQubitRef(eng, 0)],)))
+    with pytest.raises(ValueError):
+        _tapefile.write_tape(tape, io.BytesIO())
+
+
+def test_tape_writer():
+    tape_file = io.BytesIO()
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend, [_tapefile.TapeWriter(tape_file)])
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    Measure | qureg[1]
+    eng.flush()
+    # flush gates are not written
+    tape_file.seek(0)
+    tape = _tapefile.read_tape(tape_file)
+    assert len(tape) == len(backend.received_commands) - 1
+    assert [gate for gate, _, _, _ in tape] == [
+        cmd.gate for cmd in backend.received_commands[:-1]]
+
+
+def test_compiled_circuit_cache(tmpdir):
+    directory = str(tmpdir.join("cache"))
+    cache = _tapefile.CompiledCircuitCache(directory)
+    assert os.path.isdir(directory)
+    recorder = TapeRecorder()
+    eng = MainEngine(DummyEngine(save_commands=True),
+                     [LocalOptimizer(m=5), recorder])
+    eng2 = MainEngine(DummyEngine(), [LocalOptimizer(m=6), TapeRecorder()])
+    key = cache.get_key("circuit", eng)
+    assert len(key) == 64
+    assert key == cache.get_key("circuit", eng)
+    assert key != cache.get_key("other circuit", eng)
+    assert key != cache.get_key("circuit", eng2)
+    assert cache.load(key) is None
+
+    qureg = eng.allocate_qureg(2)
+    with recorder.record() as tape:
+        H | qureg[0]
+        CNOT | (qureg[0], qureg[1])
+    cache.store(key, tape)
+    cache.store(key, tape)
+    assert os.listdir(directory) == [key + ".pqtape"]
+    cached_tape = _tapefile.CompiledCircuitCache(directory).load(key)
+    assert list(cached_tape) == list(tape)
+    recorder.replay(cached_tape)
+    assert [cmd.gate for cmd in eng.backend.received_commands[-2:]] == [H, X]
+
+
+def test_compiled_circuit_cache_key_pipeline(tmpdir):
+    cache = _tapefile.CompiledCircuitCache(str(tmpdir))
+
+    def get_key(engine_list, backend=None):
+        eng = MainEngine(backend or DummyEngine(), engine_list)
+        return cache.get_key("circuit", eng)
+
+    def filter_one_control(eng, cmd):
+        return len(cmd.control_qubits) <= 1
+
+    def filter_no_control(eng, cmd):
+        return len(cmd.control_qubits) == 0
+
+    def get_replacer(modules=(decompositions,), **kwargs):
+        return AutoReplacer(DecompositionRuleSet(modules=modules), **kwargs)
+
+    key = get_key([get_replacer()])
+    assert key == get_key([get_replacer()])
+    # rule sets, filter functions, decomposition choosers and backends
+    keys = [key, get_key([get_replacer(modules=[swap2cnot])]),
+            get_key([get_replacer(),
+                     InstructionFilter(filter_one_control)]),
+            get_key([get_replacer(),
+                     InstructionFilter(filter_no_control)]),
+            get_key([get_replacer(),
+                     InstructionFilter(lambda eng, cmd: True)]),
+            get_key([get_replacer(),
+                     InstructionFilter(lambda eng, cmd: False)]),
+            get_key([get_replacer(
+                decomposition_chooser=lambda cmd, rules: rules[-1])]),
+            get_key([get_replacer(
+                decomposition_chooser=CostDecompositionChooser())]),
+            get_key([get_replacer(
+                decomposition_chooser=CostDecompositionChooser("depth"))]),
+            get_key([get_replacer()], backend=ResourceCounter()),
+            get_key([get_replacer()],
+                    backend=AsyncBackend(ResourceCounter())),
+            # list-valued settings
+            get_key([TagRemover([ComputeTag])]),
+            get_key([TagRemover([UncomputeTag])]),
+            get_key([TagRemover([ComputeTag, UncomputeTag])])]
+    assert len(set(keys)) == len(keys)
+    assert (get_key([TagRemover([ComputeTag])]) ==
+            get_key([TagRemover([ComputeTag])]))
+
+
+def test_compiled_circuit_cache_store_error(tmpdir):
+    cache = _tapefile.CompiledCircuitCache(str(tmpdir))
+    eng = DummyEngine()
+    tape = Tape()
+    tape.append(Command(eng, BasicMathGate(lambda x: (x + 1,)),
+                        ([WeakQubitRef(eng, 0)],)))
+    with pytest.raises(ValueError):
+        cache.store("key", tape)
+    assert os.listdir(str(tmpdir)) == []
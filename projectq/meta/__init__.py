@@ -19,6 +19,7 @@ and the compiler in writing/producing efficient code. It includes, e.g.,
 * Loop (with Loop(eng): ...)
 * Compute/Uncompute (with Compute(eng): ..., [...], Uncompute(eng))
 * Control (with Control(eng, ctrl_qubits): ...)
+* ClassicalControl (with ClassicalControl(eng, measured_qubits): ...)
 * Dagger (with Dagger(eng): ...)
 """
 
@@ -35,4 +36,7 @@ from ._compute import (Compute,
 from ._control import (Control,
                        get_control_count)
 from ._dagger import Dagger
+from ._classicalcontrol import (ClassicalControl,
+                                ClassicalControlTag,
+                                get_classical_control_tags)
 from ._util import insert_engine, drop_engine_after
@@ -0,0 +1,189 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the tools to condition an entire section of operations on the
+outcome of previous measurements.
+
+Example:
+    .. code-block:: python
+
+        Measure | qubit1
+        with ClassicalControl(eng, qubit1):
+            X | qubit2
+"""
+
+from projectq.cengines import BasicEngine
+from projectq.ops import ClassicalInstructionGate
+from projectq.types import BasicQubit
+from ._compute import ComputeTag, UncomputeTag
+from ._util import insert_engine, drop_engine_after, push_context, pop_context
+
+
+# tags of commands which are never conditioned on measurement results
+_COMPUTE_TAGS = (ComputeTag(), UncomputeTag())
+
+
+class ClassicalControlTag(object):
+    """
+    Classical control meta tag: The command is only executed if the latest
+    measurement results of all qubits with the given ids were 1.
+
+    Attributes:
+        qubit_ids (tuple<int>): Sorted ids of the measured qubits.
+    """
+    def __init__(self, qubit_ids):
+        self.qubit_ids = tuple(sorted(qubit_ids))
+
+    def __eq__(self, other):
+        return (isinstance(other, ClassicalControlTag) and
+                self.qubit_ids == other.qubit_ids)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(("ClassicalControlTag", self.qubit_ids))
+
+
+def get_classical_control_tags(cmd):
+    """
+    Return the classical control tags of the command cmd (an empty list if
+    it is executed unconditionally).
+
+    Classical instructions (e.g., allocation and measurement) are never
+    conditioned on measurement results.
+
+    Args:
+        cmd (Command): Command to check.
+    """
+    if len(cmd.tags) == 0 or isinstance(cmd.gate, ClassicalInstructionGate):
+        return []
+    return [tag for tag in cmd.tags if isinstance(tag, ClassicalControlTag)]
+
+
+def _is_conditioned(cmd):
+    """
+    Return True if ClassicalControl conditions the command cmd, i.e., if it
+    is no classical instruction and has no compute / uncompute tag.
+
+    Args:
+        cmd (Command): Command to check.
+    """
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return False
+    for tag in cmd.tags:
+        if tag in _COMPUTE_TAGS:
+            return False
+    return True
+
+
+class ClassicalControlEngine(BasicEngine):
+    """
+    Adds a ClassicalControlTag to all commands which are not classical
+    instructions and have no compute / uncompute tags.
+    """
+    def __init__(self, tag):
+        """
+        Initialize the classical control engine.
+
+        Args:
+            tag (ClassicalControlTag): Tag to add to the commands.
+        """
+        BasicEngine.__init__(self)
+        self._tag = tag
+
+    def _handle_command(self, cmd):
+        if _is_conditioned(cmd):
+            cmd.tags.append(self._tag)
+
+    def receive(self, command_list):
+        for cmd in command_list:
+            self._handle_command(cmd)
+        self.send(command_list)
+
+
+class _DropEngine(BasicEngine):
+    """
+    Drops all commands which would be conditioned on measurement results
+    which are not all 1 (used if no engine handles ClassicalControlTag).
+    """
+    def receive(self, command_list):
+        command_list = [cmd for cmd in command_list
+                        if not _is_conditioned(cmd)]
+        if len(command_list) > 0:
+            self.send(command_list)
+
+
+class ClassicalControl(object):
+    """
+    Condition an entire code block on the measurement results of qubits
+    being 1.
+
+    If a later engine (e.g., the Simulator) handles ClassicalControlTag, the
+    commands are tagged and the condition is evaluated by that engine, such
+    that the measurement results do not have to be available right away.
+    Otherwise, the measurement results are read (flushing the measured qubits
+    if necessary, see MainEngine.flush) and the commands are dropped if the
+    condition is not met.
+
+    Classical instructions (e.g., allocation and measurement) within the
+    section are executed unconditionally.
+
+    Example:
+        .. code-block:: python
+
+            Measure | qubit1
+            with ClassicalControl(eng, qubit1):
+                X | qubit2
+    """
+
+    def __init__(self, engine, qubits):
+        """
+        Enter a classically controlled section.
+
+        Args:
+            engine: Engine which handles the commands (usually MainEngine)
+            qubits (list of Qubit objects): Measured qubits to condition on
+
+        Enter the section using a with-statement:
+
+        .. code-block:: python
+
+            with ClassicalControl(eng, measured_qubits):
+                ...
+        """
+        self.engine = engine
+        assert(not isinstance(qubits, tuple))
+        if isinstance(qubits, BasicQubit):
+            qubits = [qubits]
+        self._qubits = qubits
+        self._context_eng = None
+
+    def __enter__(self):
+        if len(self._qubits) == 0:
+            return
+        if self.engine.is_meta_tag_supported(ClassicalControlTag):
+            tag = ClassicalControlTag([qubit.id for qubit in self._qubits])
+            self._context_eng = ClassicalControlEngine(tag)
+            push_context(self.engine, self._context_eng)
+        elif not all(bool(qubit) for qubit in self._qubits):
+            self._context_eng = _DropEngine()
+            insert_engine(self.engine, self._context_eng)
+
+    def __exit__(self, type, value, traceback):
+        if isinstance(self._context_eng, ClassicalControlEngine):
+            pop_context(self.engine, self._context_eng)
+        elif self._context_eng is not None:
+            drop_engine_after(self.engine)
@@ -0,0 +1,90 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.meta._classicalcontrol.py"""
+
+from projectq import MainEngine
+from projectq.cengines import DummyEngine
+from projectq.ops import Allocate, Deallocate, FlushGate, H, Measure, X
+from projectq.meta import (Compute, Uncompute, Control, ComputeTag,
+                           UncomputeTag)
+
+from projectq.meta import _classicalcontrol
+
+
+class ClassicalControlBackend(DummyEngine):
+    def is_meta_tag_handler(self, tag):
+        return tag == _classicalcontrol.ClassicalControlTag
+
+
+def test_classical_control_tag():
+    tag0 = _classicalcontrol.ClassicalControlTag([3, 1])
+    tag1 = _classicalcontrol.ClassicalControlTag([1, 3])
+    tag2 = _classicalcontrol.ClassicalControlTag([1])
+    assert tag0.qubit_ids == (1, 3)
+    assert tag0 == tag1
+    assert not tag0 != tag1
+    assert hash(tag0) == hash(tag1)
+    assert tag0 != tag2
+    assert tag0 != 1
+
+
+def test_classical_control_adds_tags():
+    backend = ClassicalControlBackend(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[DummyEngine()])
+    qureg = eng.allocate_qureg(3)
+    Measure | qureg[0]
+    Measure | qureg[1]
+    with _classicalcontrol.ClassicalControl(eng, qureg[:2]):
+        H | qureg[2]
+        ancilla = eng.allocate_qubit()
+        with Compute(eng):
+            X | ancilla
+        with Control(eng, ancilla):
+            X | qureg[2]
+        Uncompute(eng)
+        Measure | qureg[2]
+    H | qureg[2]
+    assert eng._context_stack == []
+    # the results have not been requested (no flush)
+    assert not any(cmd.gate == FlushGate()
+                   for cmd in backend.received_commands)
+    tag = _classicalcontrol.ClassicalControlTag([qureg[0].id, qureg[1].id])
+    cmds = backend.received_commands[5:]
+    assert [cmd.tags for cmd in cmds] == [[tag], [], [ComputeTag()], [tag],
+                                          [UncomputeTag()], [], []]
+    assert [_classicalcontrol.get_classical_control_tags(cmd)
+            for cmd in cmds] == [[tag], [], [], [tag], [], [], []]
+
+
+def test_classical_control_fallback():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[DummyEngine()])
+    qureg = eng.allocate_qureg(3)
+    eng.set_measurement_result(qureg[0], 1)
+    eng.set_measurement_result(qureg[1], 0)
+    with _classicalcontrol.ClassicalControl(eng, qureg[0]):
+        H | qureg[2]
+    with _classicalcontrol.ClassicalControl(eng, qureg):
+        X | qureg[2]
+        ancilla = eng.allocate_qubit()
+        Measure | ancilla
+        del ancilla
+    with _classicalcontrol.ClassicalControl(eng, []):
+        X | qureg[2]
+    assert eng.next_engine.next_engine is backend
+    gates = [cmd.gate for cmd in backend.received_commands[3:]]
+    # the classical instructions are executed unconditionally
+    assert gates == [H, Allocate, Measure, Deallocate, X]
+    assert all(len(cmd.tags) == 0 for cmd in backend.received_commands)
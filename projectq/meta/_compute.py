@@ -26,7 +26,7 @@ from copy import deepcopy
 import projectq
 from projectq.cengines import BasicEngine
 from projectq.ops import Allocate, Deallocate
-from ._util import insert_engine, drop_engine_after
+from ._util import insert_engine, drop_engine_after, _insert_contexts
 
 
 class QubitManagementError(Exception):
@@ -127,17 +127,12 @@ class ComputeEngine(BasicEngine):
                     # Remove this qubit from MainEngine.active_qubits and
                     # set qubit.id to = -1 in Qubit object such that it won't
                     # send another deallocate when it goes out of scope
-                    qubit_found = False
-                    for active_qubit in self.main_engine.active_qubits:
-                        if active_qubit.id == qubit_id:
-                            active_qubit.id = -1
-                            active_qubit.__del__()
-                            qubit_found = True
-                            break
-                    if not qubit_found:
+                    active_qubit = self.main_engine.get_active_qubit(qubit_id)
+                    if active_qubit is None:
                         raise QubitManagementError(
                             "\nQubit was not found in " +
                             "MainEngine.active_qubits.\n")
+                    active_qubit.id = -1
                     self.send([self._add_uncompute_tag(cmd.get_inverse())])
                 else:
                     self.send([self._add_uncompute_tag(cmd.get_inverse())])
@@ -180,17 +175,12 @@ class ComputeEngine(BasicEngine):
                     # Remove this qubit from MainEngine.active_qubits and
                     # set qubit.id to = -1 in Qubit object such that it won't
                     # send another deallocate when it goes out of scope
-                    qubit_found = False
-                    for active_qubit in self.main_engine.active_qubits:
-                        if active_qubit.id == qubit_id:
-                            active_qubit.id = -1
-                            active_qubit.__del__()
-                            qubit_found = True
-                            break
-                    if not qubit_found:
+                    active_qubit = self.main_engine.get_active_qubit(qubit_id)
+                    if active_qubit is None:
                         raise QubitManagementError(
                             "\nQubit was not found in " +
                             "MainEngine.active_qubits.\n")
+                    active_qubit.id = -1
                     self.send([self._add_uncompute_tag(cmd.get_inverse())])
 
             else:
@@ -382,7 +372,9 @@ class CustomUncompute(object):
         self._deallocated_qubit_ids = set()
 
     def __enter__(self):
-        # first, remove the compute engine
+        # first, remove the compute engine (active contexts, e.g., of a
+        # Control section, come before it)
+        _insert_contexts(self.engine)
         compute_eng = self.engine.next_engine
         if not isinstance(compute_eng, ComputeEngine):
             raise NoComputeSectionError(
@@ -426,6 +418,7 @@ def Uncompute(engine):
             action(qubits)
             Uncompute(eng) # runs inverse of the compute section
     """
+    _insert_contexts(engine)
     compute_eng = engine.next_engine
     if not isinstance(compute_eng, ComputeEngine):
         raise NoComputeSectionError("Invalid call to Uncompute: No "
@@ -22,7 +22,7 @@ from projectq import MainEngine
 from projectq.cengines import DummyEngine, CompareEngine
 from projectq.ops import H, Rx, Ry, Deallocate, Allocate, CNOT, NOT, FlushGate
 from projectq.types import WeakQubitRef
-from projectq.meta import DirtyQubitTag
+from projectq.meta import Control, DirtyQubitTag
 
 from projectq.meta import _compute
 
@@ -371,6 +371,31 @@ def test_exception_if_no_compute_but_uncompute2():
         _compute.Uncompute(eng)
 
 
+def test_exception_if_uncompute_within_control():
+    # the compute section must not be uncomputed within a Control section
+    # which was entered after it
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[DummyEngine()])
+    qureg = eng.allocate_qureg(3)
+    with _compute.Compute(eng):
+        H | qureg[0]
+    with pytest.raises(_compute.NoComputeSectionError):
+        with Control(eng, qureg[2]):
+            NOT | qureg[1]
+            _compute.Uncompute(eng)
+    with pytest.raises(_compute.NoComputeSectionError):
+        with Control(eng, qureg[2]):
+            NOT | qureg[1]
+            with _compute.CustomUncompute(eng):
+                NOT | qureg[0]
+    eng.flush()
+    # neither the compute section nor the action was uncomputed
+    gates = [(cmd.gate, cmd.qubits[0][0].id, len(cmd.control_qubits))
+             for cmd in backend.received_commands
+             if cmd.gate not in (Allocate, FlushGate())]
+    assert gates == [(H, 0, 0), (NOT, 1, 1), (NOT, 1, 1)]
+
+
 def test_qubit_management_error():
     eng = MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
     with _compute.Compute(eng):
@@ -27,7 +27,11 @@ from projectq.cengines import BasicEngine
 from projectq.meta import ComputeTag, UncomputeTag
 from projectq.ops import ClassicalInstructionGate
 from projectq.types import BasicQubit
-from ._util import insert_engine, drop_engine_after
+from ._util import push_context, pop_context
+
+
+# tags of commands which are never controlled by a ControlEngine
+_COMPUTE_TAGS = (ComputeTag(), UncomputeTag())
 
 
 class ControlEngine(BasicEngine):
@@ -54,25 +58,30 @@ class ControlEngine(BasicEngine):
             cmd (Command object): a command object.
         """
         for t in cmd.tags:
-            if t in [UncomputeTag(), ComputeTag()]:
+            if t in _COMPUTE_TAGS:
                 return True
         return False
 
     def _handle_command(self, cmd):
-        if (not self._has_compute_uncompute_tag(cmd) and not
-                isinstance(cmd.gate, ClassicalInstructionGate)):
+        if (not isinstance(cmd.gate, ClassicalInstructionGate) and
+                not (cmd.tags and self._has_compute_uncompute_tag(cmd))):
             cmd.add_control_qubits(self._qubits)
-        self.send([cmd])
 
     def receive(self, command_list):
         for cmd in command_list:
             self._handle_command(cmd)
+        self.send(command_list)
 
 
 class Control(object):
     """
     Condition an entire code block on the value of qubits being 1.
 
+    The control qubits are added to the commands when they are sent by the
+    engine (see push_context); a ControlEngine is only inserted into the
+    list of engines if further meta contexts (e.g., Compute) are entered
+    within the controlled section.
+
     Example:
         .. code-block:: python
 
@@ -103,13 +112,13 @@ class Control(object):
 
     def __enter__(self):
         if len(self._qubits) > 0:
-            ce = ControlEngine(self._qubits)
-            insert_engine(self.engine, ce)
+            self._control_eng = ControlEngine(self._qubits)
+            push_context(self.engine, self._control_eng)
 
     def __exit__(self, type, value, traceback):
-        # remove control handler from engine list (i.e. skip it)
+        # remove control handler (from the engine list if it was inserted)
         if len(self._qubits) > 0:
-            drop_engine_after(self.engine)
+            pop_context(self.engine, self._control_eng)
 
 
 def get_control_count(cmd):
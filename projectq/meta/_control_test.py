@@ -15,13 +15,14 @@
 """Tests for projectq.meta._control.py"""
 
 from projectq import MainEngine
-from projectq.cengines import DummyEngine
-from projectq.ops import Command, H, Rx
+from projectq.cengines import DummyEngine, ForwarderEngine
+from projectq.ops import Command, H, Rx, X
 from projectq.meta import (DirtyQubitTag,
                            ComputeTag,
                            UncomputeTag,
                            Compute,
-                           Uncompute)
+                           Uncompute,
+                           Dagger)
 
 from projectq.meta import _control
 
@@ -66,3 +67,42 @@ def test_control():
     assert backend.received_commands[4].control_qubits[0].id == qureg[0].id
     assert backend.received_commands[4].control_qubits[1].id == qureg[1].id
     assert backend.received_commands[6].control_qubits[0].id == qureg[0].id
+
+
+def test_control_does_not_insert_engine():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[])
+    ctrl = eng.allocate_qureg(2)
+    qubit = eng.allocate_qubit()
+    forwarder = ForwarderEngine(eng)
+    with _control.Control(eng, ctrl[0]):
+        with _control.Control(forwarder, ctrl[1]):
+            assert eng.next_engine is backend
+            assert forwarder.next_engine is eng
+            X | qubit
+            forwarder.send([H.generate_command(qubit)])
+    X | qubit
+    assert eng._context_stack == []
+    assert forwarder._context_stack == []
+    assert [len(cmd.control_qubits)
+            for cmd in backend.received_commands[3:]] == [1, 2, 0]
+
+
+def test_control_with_nested_meta_contexts():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[])
+    ctrl = eng.allocate_qureg(2)
+    qubit = eng.allocate_qubit()
+    with _control.Control(eng, ctrl[0]):
+        with Compute(eng):
+            X | qubit
+        with _control.Control(eng, ctrl[1]):
+            with Dagger(eng):
+                Rx(0.5) | qubit
+        H | qubit
+        Uncompute(eng)
+    assert eng.next_engine is backend
+    assert eng._context_stack == []
+    received = backend.received_commands[3:]
+    assert [len(cmd.control_qubits) for cmd in received] == [0, 2, 1, 0]
+    assert received[1].gate == Rx(-0.5)
@@ -58,8 +58,7 @@ class DaggerEngine(BasicEngine):
                     "    ...\n" +
                     "    del qubit[0]\n")
 
-        for cmd in reversed(self._commands):
-                self.send([cmd.get_inverse()])
+        self.send([cmd.get_inverse() for cmd in reversed(self._commands)])
 
     def receive(self, command_list):
         """
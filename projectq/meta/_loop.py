@@ -23,10 +23,9 @@ Example:
         Rz(M_PI/3.) | qb
 """
 
-from copy import deepcopy
-
 from projectq.cengines import BasicEngine
-from projectq.ops import Allocate, Deallocate
+from projectq.ops import Allocate, Command, Deallocate
+from projectq.types import WeakQubitRef
 from ._util import insert_engine, drop_engine_after
 
 
@@ -53,6 +52,30 @@ class LoopTag(object):
     loop_tag_id = 0
 
 
+def _copy_command(cmd, id_map):
+    """
+    Return a copy of the command cmd, in which the qubit ids are translated
+    according to id_map.
+
+    The copy shares the gate and the tag objects with cmd (see Command.tags).
+
+    Args:
+        cmd (Command): Command to copy.
+        id_map (dict): Maps qubit ids to the qubit ids to use in the copy.
+            Qubit ids which are not in id_map are kept.
+    """
+    if len(id_map) == 0:
+        return Command(cmd.engine, cmd.gate, cmd.qubits, cmd.control_qubits,
+                       cmd.tags)
+
+    def translate(qubits):
+        return [WeakQubitRef(qb.engine, id_map.get(qb.id, qb.id))
+                for qb in qubits]
+    return Command(cmd.engine, cmd.gate,
+                   tuple(translate(qureg) for qureg in cmd.qubits),
+                   translate(cmd.control_qubits), cmd.tags)
+
+
 class LoopEngine(BasicEngine):
     """
     Stores all commands and, when done, executes them num times if no loop tag
@@ -72,13 +95,28 @@ class LoopEngine(BasicEngine):
         self._cmd_list = []
         self._allocated_qubit_ids = set()
         self._deallocated_qubit_ids = set()
-        # key: qubit id of a local qubit, i.e. a qubit which has been allocated
-        #      and deallocated within the loop body.
-        # value: list contain reference to each weakref qubit with this qubit
-        #        id either within control_qubits or qubits.
-        self._refs_to_local_qb = dict()
         self._next_engines_support_loop_tag = False
 
+    def _unrolled_iterations(self):
+        """
+        Generate the list of commands of each loop iteration.
+
+        The iterations are generated one at a time from the stored loop body
+        (without deep-copying it). The local qubits, i.e., the qubits which
+        are allocated and deallocated within the loop body, get new qubit ids
+        in each iteration (using a translation table per iteration). The last
+        iteration consists of the stored commands themselves, such that they
+        are only sent on once all copies have been made.
+        """
+        # local qubits get new ids in the same order in each iteration
+        local_ids = sorted(self._allocated_qubit_ids)
+        for i in range(self._tag.num - 1):
+            id_map = dict((qubit_id, self.main_engine.get_new_qubit_id())
+                          for qubit_id in local_ids)
+            yield [_copy_command(cmd, id_map) for cmd in self._cmd_list]
+        if self._tag.num > 0:
+            yield self._cmd_list
+
     def run(self):
         """
         Apply the loop statements to all stored commands.
@@ -102,24 +140,8 @@ class LoopEngine(BasicEngine):
             if self._deallocated_qubit_ids != self._allocated_qubit_ids:
                 raise QubitManagementError(error_message)
 
-            if len(self._allocated_qubit_ids) == 0:
-                # No local qubits, just send the circuit num times
-                for i in range(self._tag.num):
-                    self.send(deepcopy(self._cmd_list))
-            else:
-                # Ancilla qubits have been allocated in loop body
-                # For each iteration, allocate and deallocate a new qubit and
-                # replace the qubit id in all commands using it.
-                for i in range(self._tag.num):
-                    if i == 0:  # Don't change local qubit ids
-                        self.send(deepcopy(self._cmd_list))
-                    else:
-                        # Change local qubit ids before sending them
-                        for refs_loc_qubit in self._refs_to_local_qb.values():
-                            new_qb_id = self.main_engine.get_new_qubit_id()
-                            for qubit_ref in refs_loc_qubit:
-                                qubit_ref.id = new_qb_id
-                        self.send(deepcopy(self._cmd_list))
+            for command_list in self._unrolled_iterations():
+                self.send(command_list)
         else:
             # Next engines support loop tag so no unrolling needed only
             # check that all qubits have been deallocated which have been
@@ -136,8 +158,8 @@ class LoopEngine(BasicEngine):
         commands (to later unroll them). Check that within the loop body,
         all allocated qubits have also been deallocated. If loop needs to be
         unrolled and ancilla qubits have been allocated within the loop body,
-        then store a reference all these qubit ids (to change them when
-        unrolling the loop)
+        then these qubits get new ids in each iteration (see
+        _unrolled_iterations).
 
         Args:
             command_list (list<Command>): List of commands to store and later
@@ -165,26 +187,8 @@ class LoopEngine(BasicEngine):
             for cmd in command_list:
                 if cmd.gate == Allocate:
                     self._allocated_qubit_ids.add(cmd.qubits[0][0].id)
-                    # Save reference to this local qubit
-                    self._refs_to_local_qb[cmd.qubits[0][0].id] = (
-                        [cmd.qubits[0][0]])
                 elif cmd.gate == Deallocate:
                     self._deallocated_qubit_ids.add(cmd.qubits[0][0].id)
-                    # Save reference to this local qubit
-                    self._refs_to_local_qb[cmd.qubits[0][0].id].append(
-                        cmd.qubits[0][0])
-                else:
-                    # Add a reference to each place a local qubit id is
-                    # used as within either control_qubit or qubits
-                    for control_qubit in cmd.control_qubits:
-                        if control_qubit.id in self._allocated_qubit_ids:
-                            self._refs_to_local_qb[control_qubit.id].append(
-                                control_qubit)
-                    for qureg in cmd.qubits:
-                        for qubit in qureg:
-                            if qubit.id in self._allocated_qubit_ids:
-                                self._refs_to_local_qb[qubit.id].append(
-                                    qubit)
 
 
 class Loop(object):
@@ -21,7 +21,8 @@ from copy import deepcopy
 from projectq import MainEngine
 from projectq.meta import ComputeTag, DirtyQubitTag
 from projectq.cengines import DummyEngine
-from projectq.ops import H, CNOT, X, FlushGate, Allocate, Deallocate
+from projectq.ops import (H, CNOT, X, FlushGate, Allocate, Deallocate, Swap,
+                          Command)
 
 from projectq.meta import _loop
 
@@ -211,6 +212,51 @@ def test_loop_unrolling_with_ancillas():
             backend.received_commands[9].qubits[0][0].id)
 
 
+def test_loop_unrolling_copies_template():
+    # engines after the loop may modify the commands they receive
+    class TaggingEngine(DummyEngine):
+        def receive(self, command_list):
+            for cmd in command_list:
+                cmd.tags.append("Seen")
+            DummyEngine.receive(self, command_list)
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[TaggingEngine()])
+    qubit = eng.allocate_qubit()
+    with _loop.Loop(eng, 3):
+        ancilla = eng.allocate_qubit()
+        Swap | (ancilla, qubit)
+        del ancilla
+    eng.flush(deallocate_qubits=True)
+    swaps = [cmd for cmd in backend.received_commands if cmd.gate == Swap]
+    assert len(swaps) == 3
+    ancilla_ids = set()
+    for cmd in swaps:
+        assert cmd.tags == ["Seen"]
+        # interchangeable qubits are ordered by their (new) ids
+        assert cmd.qubits[0][0].id < cmd.qubits[1][0].id
+        ancilla_ids.add(cmd.qubits[1][0].id)
+    assert len(ancilla_ids) == 3
+    # the gate is shared between the iterations
+    assert swaps[0].gate is swaps[1].gate
+
+
+def test_loop_unrolled_iterations_are_generated_lazily():
+    eng = MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
+    loop_eng = _loop.LoopEngine(4)
+    loop_eng.main_engine = eng
+    qubit = eng.allocate_qubit()
+    loop_eng._cmd_list = [Command(eng, H, (qubit,))]
+    iterations = loop_eng._unrolled_iterations()
+    assert isinstance(iterations, types.GeneratorType)
+    command_lists = list(iterations)
+    assert len(command_lists) == 4
+    assert command_lists[-1] is loop_eng._cmd_list
+    for command_list in command_lists[:-1]:
+        assert command_list[0] == loop_eng._cmd_list[0]
+        assert command_list[0] is not loop_eng._cmd_list[0]
+
+
 def test_nested_loop():
     backend = DummyEngine(save_commands=True)
 
@@ -25,6 +25,7 @@ def insert_engine(prev_engine, engine_to_insert):
         engine_to_insert (projectq.cengines.BasicEngine):
             The engine to insert at the insertion point.
     """
+    _insert_contexts(prev_engine)
     engine_to_insert.main_engine = prev_engine.main_engine
     engine_to_insert.next_engine = prev_engine.next_engine
     prev_engine.next_engine = engine_to_insert
@@ -40,8 +41,74 @@ def drop_engine_after(prev_engine):
     Returns:
         Engine: The dropped engine.
     """
+    _insert_contexts(prev_engine)
     dropped_engine = prev_engine.next_engine
     prev_engine.next_engine = dropped_engine.next_engine
     dropped_engine.next_engine = None
     dropped_engine.main_engine = None
     return dropped_engine
+
+
+def push_context(engine, context_engine):
+    """
+    Activate a meta context on an engine without inserting an engine.
+
+    The context engine is put onto the context stack of engine, which applies
+    it to all commands sent by engine (see BasicEngine.send), such that it
+    behaves exactly like an engine inserted right after engine. If engine has
+    no context stack, context_engine is inserted using insert_engine.
+
+    Context engines must modify commands in place (using _handle_command).
+
+    Args:
+        engine (projectq.cengines.BasicEngine): The engine which creates the
+            commands (usually the MainEngine).
+        context_engine (projectq.cengines.BasicEngine): The context to
+            activate.
+    """
+    if isinstance(getattr(engine, "_context_stack", None), list):
+        context_engine.main_engine = engine.main_engine
+        engine._context_stack.append(context_engine)
+    else:
+        insert_engine(engine, context_engine)
+
+
+def pop_context(engine, context_engine):
+    """
+    Deactivate the innermost meta context of an engine, which was activated
+    using push_context.
+
+    Args:
+        engine (projectq.cengines.BasicEngine): The engine which creates the
+            commands (usually the MainEngine).
+        context_engine (projectq.cengines.BasicEngine): The context to
+            deactivate.
+    """
+    stack = getattr(engine, "_context_stack", ())
+    if len(stack) > 0 and stack[-1] is context_engine:
+        stack.pop()
+        context_engine.main_engine = None
+    else:
+        drop_engine_after(engine)
+
+
+def _insert_contexts(engine):
+    """
+    Insert the active meta contexts of an engine into the list of engines.
+
+    This is needed as soon as the engines after engine are rearranged (e.g.,
+    by entering a Compute section within a Control section): The contexts
+    must keep their positions relative to the other engines.
+
+    Args:
+        engine (projectq.cengines.BasicEngine): Engine whose context stack to
+            empty.
+    """
+    stack = getattr(engine, "_context_stack", ())
+    if len(stack) > 0:
+        contexts = list(stack)
+        del stack[:]
+        # the innermost context ends up right after engine
+        for context_engine in contexts:
+            context_engine.next_engine = engine.next_engine
+            engine.next_engine = context_engine
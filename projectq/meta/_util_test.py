@@ -16,6 +16,7 @@
 from projectq import MainEngine
 from projectq.cengines import DummyEngine
 from projectq.meta import insert_engine, drop_engine_after
+from projectq.meta._util import push_context, pop_context
 
 
 def test_insert_then_drop():
@@ -46,3 +47,53 @@ def test_insert_then_drop():
     assert d1.main_engine is eng
     assert d2.main_engine is None
     assert d3.main_engine is eng
+
+
+def test_push_then_pop_context():
+    d1 = DummyEngine()
+    d2 = DummyEngine()
+    eng = MainEngine(backend=d1, engine_list=[])
+
+    push_context(eng, d2)
+    assert eng.next_engine is d1
+    assert eng._context_stack == [d2]
+    assert d2.main_engine is eng
+    pop_context(eng, d2)
+    assert eng.next_engine is d1
+    assert eng._context_stack == []
+    assert d2.main_engine is None
+
+
+def test_insert_engine_inserts_contexts():
+    d1 = DummyEngine()
+    d2 = DummyEngine()
+    d3 = DummyEngine()
+    d4 = DummyEngine()
+    eng = MainEngine(backend=d1, engine_list=[])
+
+    push_context(eng, d2)
+    push_context(eng, d3)
+    insert_engine(eng, d4)
+    assert eng._context_stack == []
+    assert eng.next_engine is d4
+    assert d4.next_engine is d3
+    assert d3.next_engine is d2
+    assert d2.next_engine is d1
+    drop_engine_after(eng)
+    # the contexts are now dropped from the list of engines
+    pop_context(eng, d3)
+    pop_context(eng, d2)
+    assert eng.next_engine is d1
+
+
+def test_push_context_without_context_stack():
+    d1 = DummyEngine()
+    d2 = DummyEngine()
+    d3 = DummyEngine()
+    eng = MainEngine(backend=d3, engine_list=[d1])
+
+    push_context(d1, d2)
+    assert d1.next_engine is d2
+    assert d2.next_engine is d3
+    pop_context(d1, d2)
+    assert d1.next_engine is d3
@@ -36,6 +36,7 @@ from copy import deepcopy
 
 from projectq.types import BasicQubit
 from ._command import Command, apply_command
+from ._parameter import Parameter
 
 
 EQ_TOLERANCE = 1e-12
@@ -119,6 +120,26 @@ class BasicGate(object):
         """
         raise NotMergeable("BasicGate: No get_merged() implemented.")
 
+    @property
+    def parameters(self):
+        """
+        Names of the symbolic parameters (see Parameter) of the gate, which
+        must be bound to values before the gate can be executed.
+        """
+        return frozenset()
+
+    def bind(self, values):
+        """
+        Return the gate with its symbolic parameters replaced by values.
+
+        Standard implementation of bind: The gate has no parameters and is
+        returned as is.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values.
+        """
+        return self
+
     @staticmethod
     def make_tuple_of_qureg(qubits):
         """
@@ -231,17 +252,22 @@ class BasicRotationGate(BasicGate):
     self._angle. Its inverse is the same gate with the negated argument.
     Rotation gates of the same class can be merged by adding the angles.
     The continuous parameter is modulo 4 * pi, self._angle is in the interval
-    [0, 4 * pi).
+    [0, 4 * pi). The angle may also be symbolic (see Parameter), in which case
+    only its constant is reduced and the parameters are bound to values upon
+    execution (see bind).
     """
     def __init__(self, angle):
         """
         Initialize a basic rotation gate.
 
         Args:
-            angle (float): Angle of rotation (saved modulo 4 * pi)
+            angle (float|Parameter): Angle of rotation (saved modulo 4 * pi)
         """
         BasicGate.__init__(self)
-        self._angle = float(angle) % (4. * math.pi)
+        if isinstance(angle, Parameter):
+            self._angle = angle % (4. * math.pi)
+        else:
+            self._angle = float(angle) % (4. * math.pi)
 
     def __str__(self):
         """
@@ -302,7 +328,11 @@ class BasicRotationGate(BasicGate):
         """ Return True if same class and same rotation angle. """
         tolerance = EQ_TOLERANCE
         if isinstance(other, self.__class__):
-            difference = abs(self._angle - other._angle) % (4 * math.pi)
+            difference = self._angle - other._angle
+            if isinstance(difference, Parameter):
+                # the angles differ depending on the parameter values
+                return False
+            difference = abs(difference) % (4 * math.pi)
             # Return True if angles are close to each other modulo 4 * pi
             if difference < tolerance or difference > 4 * math.pi - tolerance:
                 return True
@@ -311,6 +341,24 @@ class BasicRotationGate(BasicGate):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    @property
+    def parameters(self):
+        """ Names of the symbolic parameters of the angle. """
+        if isinstance(self._angle, Parameter):
+            return self._angle.names
+        return frozenset()
+
+    def bind(self, values):
+        """
+        Return the gate with its (symbolic) angle evaluated.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values.
+        """
+        if isinstance(self._angle, Parameter):
+            return self.__class__(self._angle.evaluate(values))
+        return self
+
 
 class BasicPhaseGate(BasicGate):
     """
@@ -320,17 +368,22 @@ class BasicPhaseGate(BasicGate):
     self._angle. Its inverse is the same gate with the negated argument.
     Phase gates of the same class can be merged by adding the angles.
     The continuous parameter is modulo 2 * pi, self._angle is in the interval
-    [0, 2 * pi).
+    [0, 2 * pi). The angle may also be symbolic (see Parameter), in which case
+    only its constant is reduced and the parameters are bound to values upon
+    execution (see bind).
     """
     def __init__(self, angle):
         """
         Initialize a basic rotation gate.
 
         Args:
-            angle (float): Angle of rotation (saved modulo 2 * pi)
+            angle (float|Parameter): Angle of rotation (saved modulo 2 * pi)
         """
         BasicGate.__init__(self)
-        self._angle = float(angle) % (2. * math.pi)
+        if isinstance(angle, Parameter):
+            self._angle = angle % (2. * math.pi)
+        else:
+            self._angle = float(angle) % (2. * math.pi)
 
     def __str__(self):
         """
@@ -391,7 +444,11 @@ class BasicPhaseGate(BasicGate):
         """ Return True if same class and same rotation angle. """
         tolerance = EQ_TOLERANCE
         if isinstance(other, self.__class__):
-            difference = abs(self._angle - other._angle) % (2 * math.pi)
+            difference = self._angle - other._angle
+            if isinstance(difference, Parameter):
+                # the angles differ depending on the parameter values
+                return False
+            difference = abs(difference) % (2 * math.pi)
             # Return True if angles are close to each other modulo 4 * pi
             if difference < tolerance or difference > 2 * math.pi - tolerance:
                 return True
@@ -400,6 +457,24 @@ class BasicPhaseGate(BasicGate):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    @property
+    def parameters(self):
+        """ Names of the symbolic parameters of the angle. """
+        if isinstance(self._angle, Parameter):
+            return self._angle.names
+        return frozenset()
+
+    def bind(self, values):
+        """
+        Return the gate with its (symbolic) angle evaluated.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values.
+        """
+        if isinstance(self._angle, Parameter):
+            return self.__class__(self._angle.evaluate(values))
+        return self
+
 
 # Classical instruction gates never have control qubits.
 class ClassicalInstructionGate(BasicGate):
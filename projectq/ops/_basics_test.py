@@ -23,7 +23,7 @@ from projectq.ops import Command
 from projectq import MainEngine
 from projectq.cengines import DummyEngine
 
-from projectq.ops import _basics
+from projectq.ops import _basics, Parameter
 
 
 @pytest.fixture
@@ -249,6 +249,37 @@ def test_basic_phase_gate_comparison():
     assert basic_phase_gate2 != _basics.BasicPhaseGate(0.5 + math.pi)
 
 
+def test_basic_gate_bind():
+    basic_gate = _basics.BasicGate()
+    assert basic_gate.parameters == frozenset()
+    assert basic_gate.bind({"theta": 1.}) is basic_gate
+
+
+@pytest.mark.parametrize("gate_class, period",
+                         [(_basics.BasicRotationGate, 4 * math.pi),
+                          (_basics.BasicPhaseGate, 2 * math.pi)])
+def test_symbolic_angle(gate_class, period):
+    theta = Parameter("theta")
+    gate = gate_class(theta + period + 0.5)
+    assert gate._angle == theta + 0.5
+    assert gate.parameters == frozenset(["theta"])
+    assert str(gate) == gate_class.__name__ + "(theta + 0.5)"
+    # symbolic merging and inversion
+    merged = gate.get_merged(gate_class(2 * theta))
+    assert merged._angle == 3 * theta + 0.5
+    assert gate == gate_class(theta + 0.5)
+    assert gate != gate_class(theta)
+    assert gate != gate_class(0.5)
+    assert gate.get_inverse().get_merged(gate) == gate_class(0.)
+    # binding
+    bound = gate.bind({"theta": 1.})
+    assert bound == gate_class(1.5)
+    assert bound.parameters == frozenset()
+    assert bound.bind({"theta": 2.}) is bound
+    with pytest.raises(ValueError):
+        gate.bind({})
+
+
 def test_basic_math_gate():
     def my_math_function(a, b, c):
         return (a, b, c + a * b)
@@ -39,11 +39,27 @@ apply wrapper (apply_command).
 """
 
 from copy import deepcopy
+from operator import attrgetter
 
 import projectq
 from projectq.types import WeakQubitRef, Qureg
 
 
+# sort key of qubits (by id)
+_get_id = attrgetter("id")
+
+
+def _weak_copy(qubits, engine):
+    """
+    Return a list of WeakQubitRef copies of the given qubits.
+
+    Args:
+        qubits (list<BasicQubit>): Qubits to copy.
+        engine: Owning engine of the copies.
+    """
+    return [WeakQubitRef(engine, qubit.id) for qubit in qubits]
+
+
 def apply_command(cmd):
     """
     Apply a command.
@@ -80,8 +96,12 @@ class Command(object):
           is from the inner scope while tag[1] is from the other scope as the
           other scope receives the command after the inner scope LoopEngine
           and hence adds its LoopTag to the end.
+          Tag objects are shared between a command and its copies (e.g.,
+          its inverse), which only copy the list. Hence, tag objects must not
+          be modified once they have been added to a command.
         all_qubits: A tuple of control_qubits + qubits
     """
+    __slots__ = ("gate", "tags", "_qubits", "_control_qubits", "_engine")
 
     def __init__(self, engine, gate, qubits, controls=(), tags=()):
         """
@@ -106,15 +126,16 @@ class Command(object):
             tags (list[object]):
                 Tags associated with the command.
         """
-        qubits = tuple([WeakQubitRef(qubit.engine, qubit.id)
-                        for qubit in qreg]
-                       for qreg in qubits)
-
         self.gate = gate
         self.tags = list(tags)
-        self.qubits = qubits  # property
-        self.control_qubits = controls  # property
-        self.engine = engine  # property
+        self._engine = engine
+        # the copies already belong to engine (see engine.setter)
+        self._qubits = self._order_qubits([_weak_copy(qreg, engine)
+                                           for qreg in qubits])
+        control_qubits = _weak_copy(controls, engine)
+        if len(control_qubits) > 1:
+            control_qubits.sort(key=_get_id)
+        self._control_qubits = control_qubits
 
     @property
     def qubits(self):
@@ -129,8 +150,8 @@ class Command(object):
         return Command(self.engine,
                        deepcopy(self.gate),
                        self.qubits,
-                       list(self.control_qubits),
-                       deepcopy(self.tags))
+                       self.control_qubits,
+                       self.tags)
 
     def get_inverse(self):
         """
@@ -146,8 +167,8 @@ class Command(object):
         return Command(self._engine,
                        projectq.ops.get_inverse(self.gate),
                        self.qubits,
-                       list(self.control_qubits),
-                       deepcopy(self.tags))
+                       self.control_qubits,
+                       self.tags)
 
     def get_merged(self, other):
         """
@@ -167,7 +188,7 @@ class Command(object):
                            self.gate.get_merged(other.gate),
                            self.qubits,
                            self.control_qubits,
-                           deepcopy(self.tags))
+                           self.tags)
         raise projectq.ops.NotMergeable("Commands not mergeable.")
 
     def _order_qubits(self, qubits):
@@ -183,6 +204,8 @@ class Command(object):
         ordered_qubits = list(qubits)
         # e.g. [[0,4],[1,2,3]]
         interchangeable_qubit_indices = self.interchangeable_qubit_indices
+        if len(interchangeable_qubit_indices) == 0:
+            return tuple(ordered_qubits)
         for old_positions in interchangeable_qubit_indices:
             new_positions = sorted(old_positions,
                                    key=lambda x: ordered_qubits[x][0].id)
@@ -219,9 +242,8 @@ class Command(object):
         Args:
             control_qubits (Qureg): quantum register
         """
-        self._control_qubits = ([WeakQubitRef(qubit.engine, qubit.id)
-                                 for qubit in qubits])
-        self._control_qubits = sorted(self._control_qubits, key=lambda x: x.id)
+        self._control_qubits = sorted([WeakQubitRef(qubit.engine, qubit.id)
+                                       for qubit in qubits], key=_get_id)
 
     def add_control_qubits(self, qubits):
         """
@@ -237,9 +259,11 @@ class Command(object):
                 in state 1.
         """
         assert(isinstance(qubits, list))
-        self._control_qubits.extend([WeakQubitRef(qubit.engine, qubit.id)
-                                    for qubit in qubits])
-        self._control_qubits = sorted(self._control_qubits, key=lambda x: x.id)
+        control_qubits = self._control_qubits + [WeakQubitRef(qubit.engine,
+                                                              qubit.id)
+                                                 for qubit in qubits]
+        control_qubits.sort(key=_get_id)
+        self._control_qubits = control_qubits
 
     @property
     def all_qubits(self):
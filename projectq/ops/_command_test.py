@@ -62,6 +62,15 @@ def test_command_init(main_engine):
     assert symmetric_cmd._engine == main_engine
 
 
+def test_command_slots(main_engine):
+    qureg = Qureg([Qubit(main_engine, 0)])
+    cmd = _command.Command(main_engine, BasicGate(), (qureg,))
+    assert not hasattr(cmd, "__dict__")
+    assert isinstance(cmd.qubits[0][0], WeakQubitRef)
+    with pytest.raises(AttributeError):
+        cmd.my_attribute = 1
+
+
 def test_command_deepcopy(main_engine):
     qureg0 = Qureg([Qubit(main_engine, 0)])
     qureg1 = Qureg([Qubit(main_engine, 1)])
@@ -103,7 +112,11 @@ def test_command_get_inverse(main_engine):
     assert cmd.control_qubits[0].id == inverse_cmd.control_qubits[0].id
     assert id(cmd.control_qubits[0]) != id(inverse_cmd.control_qubits[0])
     assert cmd.tags == inverse_cmd.tags
-    assert id(cmd.tags[0]) != id(inverse_cmd.tags[0])
+    # the tag list is copied, the (immutable) tags are shared
+    assert id(cmd.tags) != id(inverse_cmd.tags)
+    assert id(cmd.tags[0]) == id(inverse_cmd.tags[0])
+    inverse_cmd.tags.append("NewTag")
+    assert cmd.tags == [ComputeTag()]
     assert id(cmd.engine) == id(inverse_cmd.engine)
 
 
@@ -27,6 +27,9 @@ Contains definitions of standard gates such as
 and meta gates, i.e.,
 * Allocate / Deallocate qubits
 * Flush gate (end of circuit)
+
+The gate matrices are read-only numpy matrices, which are computed only once
+(and shared between gates with equal angles); copy them before modifying.
 """
 
 import math
@@ -41,6 +44,73 @@ from ._basics import (BasicGate,
                       ClassicalInstructionGate,
                       FastForwardingGate,
                       BasicMathGate)
+from ._parameter import Parameter
+
+
+# maximal number of matrices of parametrized gates which are interned
+_MAX_INTERNED_MATRICES = 1024
+_interned_matrices = dict()
+
+
+def _read_only_matrix(elements):
+    """
+    Return the matrix elements as a read-only complex numpy matrix.
+
+    Args:
+        elements: Nested list (or array) of matrix elements.
+    """
+    matrix = np.matrix(elements, dtype=complex)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def _get_parametrized_matrix(gate, get_elements):
+    """
+    Return the (read-only) matrix of a gate with an angle.
+
+    The matrix is computed only once per gate and interned per gate class and
+    angle, such that all gates with equal angles share the same matrix. The
+    interning cache holds at most _MAX_INTERNED_MATRICES matrices.
+
+    Args:
+        gate (BasicRotationGate|BasicPhaseGate): Gate of which to return the
+            matrix.
+        get_elements (function): Function which returns the matrix elements
+            when called with the angle of the gate.
+
+    Raises:
+        AttributeError: If the angle of the gate is symbolic (the gate has a
+            matrix only once its parameters are bound, see BasicGate.bind).
+    """
+    try:
+        return gate._matrix
+    except AttributeError:
+        pass
+    if isinstance(gate._angle, Parameter):
+        raise AttributeError("{} has no matrix: its angle is symbolic (bind "
+                             "its parameters first).".format(gate))
+    key = (type(gate), gate._angle)
+    matrix = _interned_matrices.get(key)
+    if matrix is None:
+        matrix = _read_only_matrix(get_elements(gate._angle))
+        if len(_interned_matrices) >= _MAX_INTERNED_MATRICES:
+            _interned_matrices.clear()
+        _interned_matrices[key] = matrix
+    gate._matrix = matrix
+    return matrix
+
+
+_H_MATRIX = _read_only_matrix(1. / cmath.sqrt(2.) * np.array([[1, 1],
+                                                             [1, -1]]))
+_X_MATRIX = _read_only_matrix([[0, 1], [1, 0]])
+_Y_MATRIX = _read_only_matrix([[0, -1j], [1j, 0]])
+_Z_MATRIX = _read_only_matrix([[1, 0], [0, -1]])
+_S_MATRIX = _read_only_matrix([[1, 0], [0, 1j]])
+_T_MATRIX = _read_only_matrix([[1, 0], [0, cmath.exp(1j * cmath.pi / 4)]])
+_SWAP_MATRIX = _read_only_matrix([[1, 0, 0, 0],
+                                  [0, 0, 1, 0],
+                                  [0, 1, 0, 0],
+                                  [0, 0, 0, 1]])
 
 
 class HGate(SelfInverseGate):
@@ -50,7 +120,7 @@ class HGate(SelfInverseGate):
 
     @property
     def matrix(self):
-        return 1. / cmath.sqrt(2.) * np.matrix([[1, 1], [1, -1]])
+        return _H_MATRIX
 
 H = HGate()
 
@@ -62,7 +132,7 @@ class XGate(SelfInverseGate):
 
     @property
     def matrix(self):
-        return np.matrix([[0, 1], [1, 0]])
+        return _X_MATRIX
 
 X = NOT = XGate()
 
@@ -74,7 +144,7 @@ class YGate(SelfInverseGate):
 
     @property
     def matrix(self):
-        return np.matrix([[0, -1j], [1j, 0]])
+        return _Y_MATRIX
 
 Y = YGate()
 
@@ -86,7 +156,7 @@ class ZGate(SelfInverseGate):
 
     @property
     def matrix(self):
-        return np.matrix([[1, 0], [0, -1]])
+        return _Z_MATRIX
 
 Z = ZGate()
 
@@ -95,7 +165,7 @@ class SGate(BasicGate):
     """ S gate class """
     @property
     def matrix(self):
-        return np.matrix([[1, 0], [0, 1j]])
+        return _S_MATRIX
 
     def __str__(self):
         return "S"
@@ -108,7 +178,7 @@ class TGate(BasicGate):
     """ T gate class """
     @property
     def matrix(self):
-        return np.matrix([[1, 0], [0, cmath.exp(1j * cmath.pi / 4)]])
+        return _T_MATRIX
 
     def __str__(self):
         return "T"
@@ -129,10 +199,7 @@ class SwapGate(SelfInverseGate, BasicMathGate):
 
     @property
     def matrix(self):
-        return np.matrix([[1, 0, 0, 0],
-                          [0, 0, 1, 0],
-                          [0, 1, 0, 0],
-                          [0, 0, 0, 1]])
+        return _SWAP_MATRIX
 
 Swap = SwapGate()
 
@@ -152,43 +219,48 @@ class Ph(BasicPhaseGate):
     """ Phase gate (global phase) """
     @property
     def matrix(self):
-        return np.matrix([[cmath.exp(1j * self._angle), 0],
-                          [0, cmath.exp(1j * self._angle)]])
+        return _get_parametrized_matrix(
+            self, lambda angle: [[cmath.exp(1j * angle), 0],
+                                 [0, cmath.exp(1j * angle)]])
 
 
 class Rx(BasicRotationGate):
     """ RotationX gate class """
     @property
     def matrix(self):
-        return np.matrix([[math.cos(0.5 * self._angle),
-                           -1j * math.sin(0.5 * self._angle)],
-                          [-1j * math.sin(0.5 * self._angle),
-                           math.cos(0.5 * self._angle)]])
+        return _get_parametrized_matrix(
+            self, lambda angle: [[math.cos(0.5 * angle),
+                                  -1j * math.sin(0.5 * angle)],
+                                 [-1j * math.sin(0.5 * angle),
+                                  math.cos(0.5 * angle)]])
 
 
 class Ry(BasicRotationGate):
     """ RotationX gate class """
     @property
     def matrix(self):
-        return np.matrix([[math.cos(0.5 * self._angle),
-                           -math.sin(0.5 * self._angle)],
-                          [math.sin(0.5 * self._angle),
-                           math.cos(0.5 * self._angle)]])
+        return _get_parametrized_matrix(
+            self, lambda angle: [[math.cos(0.5 * angle),
+                                  -math.sin(0.5 * angle)],
+                                 [math.sin(0.5 * angle),
+                                  math.cos(0.5 * angle)]])
 
 
 class Rz(BasicRotationGate):
     """ RotationZ gate class """
     @property
     def matrix(self):
-        return np.matrix([[cmath.exp(-.5 * 1j * self._angle), 0],
-                          [0, cmath.exp(.5 * 1j * self._angle)]])
+        return _get_parametrized_matrix(
+            self, lambda angle: [[cmath.exp(-.5 * 1j * angle), 0],
+                                 [0, cmath.exp(.5 * 1j * angle)]])
 
 
 class R(BasicPhaseGate):
     """ Phase-shift gate (equivalent to Rz up to a global phase) """
     @property
     def matrix(self):
-        return np.matrix([[1, 0], [0, cmath.exp(1j * self._angle)]])
+        return _get_parametrized_matrix(
+            self, lambda angle: [[1, 0], [0, cmath.exp(1j * angle)]])
 
 
 class FlushGate(FastForwardingGate):
@@ -207,7 +279,10 @@ class FlushGate(FastForwardingGate):
 
             eng.flush()
 
-        on the MainEngine `eng`.
+        on the MainEngine `eng`. The flush gate acts on a single qubit with
+        id -1, unless only some qubits are flushed (using
+        `eng.flush(qubits=...)`). Then, it acts on these qubits and compiler
+        engines may keep all commands which these qubits do not depend on.
     """
 
     def __str__(self):
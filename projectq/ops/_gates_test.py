@@ -21,7 +21,7 @@ import pytest
 
 from projectq.ops import (get_inverse, SelfInverseGate, BasicRotationGate,
                           ClassicalInstructionGate, FastForwardingGate,
-                          BasicGate)
+                          BasicGate, Parameter)
 
 from projectq.ops import _gates
 
@@ -156,6 +156,54 @@ def test_r(angle):
     assert gate == gate2
 
 
+@pytest.mark.parametrize("gate_class", [_gates.Rx, _gates.Ry, _gates.Rz,
+                                        _gates.Ph, _gates.R])
+def test_parametrized_gate_matrix_cache(gate_class):
+    gate = gate_class(0.3)
+    matrix = gate.matrix
+    assert isinstance(matrix, np.matrix)
+    assert not matrix.flags.writeable
+    with pytest.raises(ValueError):
+        matrix[0, 0] = 2.
+    # computed once per gate and shared between gates with equal angles
+    assert gate.matrix is matrix
+    assert gate_class(0.3).matrix is matrix
+    assert gate_class(0.4).matrix is not matrix
+    assert gate.get_inverse().matrix is not matrix
+
+
+def test_parametrized_gate_matrix_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(_gates, "_MAX_INTERNED_MATRICES", 3)
+    _gates._interned_matrices.clear()
+    matrices = [_gates.Rx(0.1 * i).matrix for i in range(5)]
+    assert len(_gates._interned_matrices) <= 3
+    assert np.allclose(matrices[0], _gates.Rx(0.).matrix)
+    assert np.allclose(matrices[4], _gates.Rx(0.4).matrix)
+
+
+@pytest.mark.parametrize("gate_class", [_gates.Rx, _gates.Ry, _gates.Rz,
+                                        _gates.Ph, _gates.R])
+def test_symbolic_gate_has_no_matrix(gate_class):
+    gate = gate_class(Parameter("theta"))
+    with pytest.raises(AttributeError):
+        gate.matrix
+    assert not hasattr(gate, "matrix")
+    assert np.allclose(gate.bind({"theta": 0.3}).matrix,
+                       gate_class(0.3).matrix)
+
+
+def test_gate_matrices_read_only():
+    for gate in [_gates.H, _gates.X, _gates.Y, _gates.Z, _gates.S,
+                 _gates.T, _gates.Swap]:
+        assert gate.matrix is gate.matrix
+        assert isinstance(gate.matrix, np.matrix)
+        assert not gate.matrix.flags.writeable
+    # the matrices are numpy matrices, i.e., * is the matrix product
+    assert np.allclose(_gates.H.matrix * _gates.H.matrix, np.identity(2))
+    assert np.allclose(_gates.Rx(0.3).matrix * _gates.Rx(-0.3).matrix,
+                       np.identity(2))
+
+
 def test_flush_gate():
     gate = _gates.FlushGate()
     assert str(gate) == ""
@@ -28,6 +28,8 @@ As well as the meta functions
 * C (Creates an n-ary controlled version of an arbitrary gate)
 """
 
+import numpy as np
+
 from ._basics import BasicGate, NotInvertible
 from ._command import Command, apply_command
 
@@ -75,7 +77,9 @@ class DaggeredGate(BasicGate):
 
         try:
             # Hermitian conjugate is inverse matrix
-            self.matrix = gate.matrix.getH()
+            matrix = np.matrix(gate.matrix).getH()
+            matrix.flags.writeable = False
+            self.matrix = matrix
         except AttributeError:
             pass
 
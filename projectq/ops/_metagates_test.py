@@ -24,7 +24,7 @@ from projectq import MainEngine
 from projectq.cengines import DummyEngine
 from projectq.ops import (T, Y, NotInvertible, Entangle, Rx,
                           FastForwardingGate, Command, C,
-                          ClassicalInstructionGate, All)
+                          ClassicalInstructionGate, All, BasicGate)
 
 from projectq.ops import _metagates
 
@@ -61,6 +61,14 @@ def test_daggered_gate_init():
     inv = _metagates.DaggeredGate(invertible_gate)
     assert inv._gate == invertible_gate
     assert np.array_equal(inv.matrix, np.matrix([[0, -1j], [1j, 0]]))
+    assert not inv.matrix.flags.writeable
+    # Matrices of user-defined gates may be numpy matrices
+    class MatrixGate(BasicGate):
+        @property
+        def matrix(self):
+            return np.matrix([[1, 2j], [3, 4]])
+    assert np.array_equal(_metagates.DaggeredGate(MatrixGate()).matrix,
+                          np.matrix([[1, 3], [-2j, 4]]))
     # Test matrix
     no_matrix_gate = Entangle
     with pytest.raises(AttributeError):
@@ -0,0 +1,183 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Contains the Parameter class, a symbolic parameter of a gate (e.g., the angle
+of a rotation gate or the time of a TimeEvolution gate) which is bound to a
+value only when the circuit is executed.
+
+Example:
+    .. code-block:: python
+
+        theta = Parameter("theta")
+        Rx(theta) | qubit
+        Rx(0.5 * theta + 1.) | qubit  # merged into Rx(1.5*theta + 1.0)
+"""
+
+import numbers
+
+
+class Parameter(object):
+    """
+    Linear expression of symbolic parameters, i.e., a sum of named
+    parameters times coefficients plus a constant.
+
+    Parameters support addition and subtraction of parameters and numbers
+    as well as multiplication and division by numbers. Expressions which no
+    longer depend on any parameter (e.g., theta - theta) are plain numbers.
+
+    Attributes:
+        terms (dict): Maps the names of the parameters to their coefficients.
+        constant (float): Constant of the expression.
+    """
+    def __init__(self, name):
+        """
+        Initialize a symbolic parameter.
+
+        Args:
+            name (str): Name of the parameter (values are bound by name).
+        """
+        self.terms = {name: 1.}
+        self.constant = 0.
+
+    @staticmethod
+    def _from_terms(terms, constant):
+        """
+        Return the expression with the given terms and constant (dropping
+        terms with coefficient zero), or the constant if there are no terms.
+        """
+        terms = dict((name, coeff) for name, coeff in terms.items()
+                     if coeff != 0)
+        if len(terms) == 0:
+            return constant
+        expression = Parameter.__new__(Parameter)
+        expression.terms = terms
+        expression.constant = constant
+        return expression
+
+    @property
+    def names(self):
+        """ Names of the parameters the expression depends on. """
+        return frozenset(self.terms)
+
+    def evaluate(self, values):
+        """
+        Return the value of the expression.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values.
+
+        Raises:
+            ValueError: If a parameter of the expression has no value.
+        """
+        result = self.constant
+        for name, coeff in self.terms.items():
+            try:
+                result += coeff * values[name]
+            except KeyError:
+                raise ValueError("Parameter '{}' is not bound to a value."
+                                 .format(name))
+        return result
+
+    def __add__(self, other):
+        if isinstance(other, Parameter):
+            terms = dict(self.terms)
+            for name, coeff in other.terms.items():
+                terms[name] = terms.get(name, 0.) + coeff
+            return Parameter._from_terms(terms, self.constant + other.constant)
+        if isinstance(other, numbers.Number):
+            return Parameter._from_terms(self.terms, self.constant + other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        return self * -1.
+
+    def __sub__(self, other):
+        if isinstance(other, (Parameter, numbers.Number)):
+            return self + (-other)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, numbers.Number):
+            return (-self) + other
+        return NotImplemented
+
+    def __mul__(self, other):
+        if isinstance(other, numbers.Number):
+            return Parameter._from_terms(
+                dict((name, coeff * other)
+                     for name, coeff in self.terms.items()),
+                self.constant * other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if isinstance(other, numbers.Number):
+            return self * (1. / other)
+        return NotImplemented
+
+    def __div__(self, other):
+        return self.__truediv__(other)
+
+    def __mod__(self, other):
+        """
+        Return the expression with its constant taken modulo other (the
+        symbolic part cannot be reduced).
+        """
+        if isinstance(other, numbers.Number):
+            return Parameter._from_terms(self.terms, self.constant % other)
+        return NotImplemented
+
+    def __float__(self):
+        raise TypeError("Cannot convert {} to float: Parameters {} are not "
+                        "bound to values.".format(self, sorted(self.names)))
+
+    def __eq__(self, other):
+        """ Return True if other is the same expression. """
+        return (isinstance(other, Parameter) and self.terms == other.terms and
+                self.constant == other.constant)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((frozenset(self.terms.items()), self.constant))
+
+    def __str__(self):
+        string = ""
+        for name in sorted(self.terms):
+            coeff = self.terms[name]
+            if coeff == 1:
+                term = name
+            elif coeff == -1:
+                term = "-" + name
+            else:
+                term = "{}*{}".format(coeff, name)
+            if string == "":
+                string = term
+            elif term.startswith("-"):
+                string += " - " + term[1:]
+            else:
+                string += " + " + term
+        if self.constant != 0:
+            string += " + {}".format(self.constant)
+        return string
+
+    def __repr__(self):
+        return "Parameter({})".format(str(self))
@@ -0,0 +1,88 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for projectq.ops._parameter.py."""
+
+import pytest
+
+from projectq.ops import _parameter
+from projectq.ops._parameter import Parameter
+
+
+def test_parameter_arithmetic():
+    theta = Parameter("theta")
+    phi = Parameter("phi")
+    expression = 2 * theta - phi / 2. + 1.
+    assert expression.terms == {"theta": 2., "phi": -0.5}
+    assert expression.constant == 1.
+    assert expression.names == frozenset(["theta", "phi"])
+    assert (1. - theta).terms == {"theta": -1.}
+    assert (1. - theta).constant == 1.
+    assert (theta + 3) * 2 == 2 * theta + 6
+    assert -theta == theta * -1
+    assert theta + theta != theta
+    # expressions without parameters are numbers
+    assert theta - theta == 0.
+    assert isinstance(theta * 0 + 1, float)
+    assert isinstance(theta, _parameter.Parameter)
+
+
+def test_parameter_unsupported_operations():
+    theta = Parameter("theta")
+    with pytest.raises(TypeError):
+        theta * theta
+    with pytest.raises(TypeError):
+        theta + "1"
+    with pytest.raises(TypeError):
+        "1" - theta
+    with pytest.raises(TypeError):
+        theta - "1"
+    with pytest.raises(TypeError):
+        theta / theta
+    with pytest.raises(TypeError):
+        theta % theta
+    with pytest.raises(TypeError):
+        float(theta)
+
+
+def test_parameter_mod():
+    expression = (Parameter("theta") + 7.) % 4.
+    assert expression.terms == {"theta": 1.}
+    assert expression.constant == 3.
+
+
+def test_parameter_evaluate():
+    expression = 2 * Parameter("theta") - Parameter("phi") + 0.5
+    assert expression.evaluate({"theta": 1., "phi": 3.}) == pytest.approx(
+        -0.5)
+    with pytest.raises(ValueError):
+        expression.evaluate({"theta": 1.})
+
+
+def test_parameter_hash():
+    theta = Parameter("theta")
+    assert hash(theta + 1) == hash(1 + theta)
+    assert len(set([theta, Parameter("theta"), Parameter("phi")])) == 2
+    assert not theta == "theta"
+
+
+def test_parameter_str():
+    theta = Parameter("theta")
+    phi = Parameter("phi")
+    assert str(theta) == "theta"
+    assert str(-theta) == "-theta"
+    assert str(2 * theta - phi + 1.5) == "-phi + 2.0*theta + 1.5"
+    assert str(theta - 2 * phi) == "-2.0*phi + theta"
+    assert str(phi - theta) == "phi - theta"
+    assert repr(theta + 1) == "Parameter(theta + 1.0)"
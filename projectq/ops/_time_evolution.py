@@ -17,6 +17,7 @@ import copy
 from projectq.ops import Ph
 
 from ._basics import BasicGate, NotMergeable
+from ._parameter import Parameter
 from ._qubit_operator import QubitOperator
 from ._command import apply_command
 
@@ -43,7 +44,7 @@ class TimeEvolution(BasicGate):
             TimeEvolution(time=2.0, hamiltonian=hamiltonian) | wavefunction
 
     Attributes:
-        time(float, int): time t
+        time(float, int, Parameter): time t
         hamiltonian(QubitOperator): hamiltonaian H
 
     """
@@ -57,7 +58,8 @@ class TimeEvolution(BasicGate):
             Coefficients are internally converted to float.
 
         Args:
-            time (float, or int): time to evolve under (can be negative).
+            time (float, int, or Parameter): time to evolve under (can be
+                negative or symbolic, see Parameter).
             hamiltonian (QubitOperator): hamiltonian to evolve under.
 
         Raises:
@@ -67,7 +69,7 @@ class TimeEvolution(BasicGate):
                                        hermitian (only real coefficients).
         """
         BasicGate.__init__(self)
-        if not isinstance(time, (float, int)):
+        if not isinstance(time, (float, int, Parameter)):
             raise TypeError("time needs to be a (real) numeric type.")
         if not isinstance(hamiltonian, QubitOperator):
             raise TypeError("hamiltonian needs to be QubitOperator object.")
@@ -88,6 +90,28 @@ class TimeEvolution(BasicGate):
         """
         return TimeEvolution(self.time * -1.0, self.hamiltonian)
 
+    @property
+    def parameters(self):
+        """ Names of the symbolic parameters of the time. """
+        if isinstance(self.time, Parameter):
+            return self.time.names
+        return frozenset()
+
+    def bind(self, values):
+        """
+        Return the gate with its (symbolic) time evaluated.
+
+        The hamiltonian is shared with the returned gate.
+
+        Args:
+            values (dict): Maps the names of the parameters to their values.
+        """
+        if isinstance(self.time, Parameter):
+            gate = copy.copy(self)
+            gate.time = self.time.evaluate(values)
+            return gate
+        return self
+
     def get_merged(self, other):
         """
         Return self merged with another TimeEvolution gate if possible.
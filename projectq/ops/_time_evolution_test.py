@@ -21,7 +21,8 @@ import pytest
 
 from projectq import MainEngine
 from projectq.cengines import DummyEngine
-from projectq.ops import QubitOperator, BasicGate, NotMergeable, Ph
+from projectq.ops import (QubitOperator, BasicGate, NotMergeable, Parameter,
+                          Ph)
 
 from projectq.ops import _time_evolution as te
 
@@ -91,6 +92,22 @@ def test_get_inverse():
     assert inverse.hamiltonian.isclose(hamiltonian)
 
 
+def test_symbolic_time():
+    hamiltonian = QubitOperator("X0 Z1", 0.5)
+    time = Parameter("t")
+    gate = te.TimeEvolution(time, hamiltonian)
+    assert gate.parameters == frozenset(["t"])
+    assert gate.get_inverse().time == -time
+    merged = gate.get_merged(te.TimeEvolution(2 * time, 2. * hamiltonian))
+    assert merged.time == 5 * time
+    bound = gate.bind({"t": 1.5})
+    assert bound.time == 1.5
+    assert bound.hamiltonian is gate.hamiltonian
+    assert bound.parameters == frozenset()
+    assert bound.bind({"t": 2.}) is bound
+    assert gate.time == time
+
+
 def test_get_merged_one_term():
     hamiltonian = QubitOperator("Z2", 2)
     gate = te.TimeEvolution(2, hamiltonian)
@@ -0,0 +1,92 @@
+#   Copyright 2017 ProjectQ-Framework (www.projectq.ch)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Import-time regression tests: Importing projectq must not load the backends,
+setups and decomposition rules which are not used.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import projectq
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(
+    projectq.__file__)))
+
+
+def _get_loaded_modules(code):
+    """
+    Run code in a new interpreter and return the names of all modules of
+    projectq (and requests) which were loaded.
+    """
+    code += ("\nimport sys, json\n"
+             "print(json.dumps([m for m in sys.modules if m.split('.')[0] "
+             "in ('projectq', 'requests')]))")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([_ROOT_DIR,
+                                         env.get("PYTHONPATH", "")])
+    output = subprocess.check_output([sys.executable, "-c", code], env=env,
+                                     cwd=_ROOT_DIR)
+    return set(json.loads(output.decode().splitlines()[-1]))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="requires module-level __getattr__")
+def test_import_projectq_is_lazy():
+    modules = _get_loaded_modules("import projectq")
+    assert modules == {"projectq", "projectq._version", "projectq._lazy"}
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="requires module-level __getattr__")
+def test_main_engine_does_not_load_unused_backends():
+    modules = _get_loaded_modules(
+        "from projectq import MainEngine\n"
+        "from projectq.cengines import DummyEngine\n"
+        "from projectq.ops import H\n"
+        "eng = MainEngine(DummyEngine(), [])\n"
+        "H | eng.allocate_qubit()\n"
+        "eng.flush()")
+    assert "projectq.cengines" in modules
+    for name in ("projectq.backends._sim", "projectq.backends._circuits",
+                 "projectq.backends._ibm._ibm_http_client", "requests",
+                 "projectq.setups", "projectq.libs"):
+        assert name not in modules
+
+
+def test_lazy_attributes():
+    import projectq.backends
+    assert "Simulator" in dir(projectq.backends)
+    assert projectq.backends.Simulator.__name__ == "Simulator"
+    assert projectq.MainEngine is projectq.cengines.MainEngine
+    with pytest.raises(AttributeError):
+        projectq.backends.NoSuchBackend
+    assert "lazy_import" not in dir(projectq.backends)
+    assert "lazy_import" not in dir(projectq)
+    assert "IBMCNOTMapper" in dir(projectq.cengines)
+    assert "lazy_import" not in dir(projectq.cengines)
+
+
+@pytest.mark.parametrize("code", ["import projectq.meta",
+                                  "import projectq.backends._ibm",
+                                  "from projectq.backends import IBMBackend",
+                                  "from projectq.cengines import IBMCNOTMapper"])
+def test_import_without_cycles(code):
+    # importing any subpackage first must not run into an import cycle
+    assert "projectq.cengines" in _get_loaded_modules(code)
@@ -15,6 +15,7 @@
 """Tests for projectq.types._qubits."""
 
 from copy import copy, deepcopy
+import weakref
 
 import pytest
 
@@ -127,6 +128,20 @@ def test_weak_qubit_ref():
         qubit.__del__()
 
 
+def test_qubit_slots():
+    # qubits are lightweight (no instance dictionary) ...
+    weak_qubit = _qubit.WeakQubitRef(None, 0)
+    with pytest.raises(AttributeError):
+        weak_qubit.tag = 1
+    assert not hasattr(weak_qubit, "__dict__")
+    # ... but qubits support weak references (see MainEngine.active_qubits)
+    eng = MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
+    qubit = eng.allocate_qubit()[0]
+    assert not hasattr(qubit, "__dict__")
+    assert weakref.ref(qubit)() is qubit
+    assert qubit in eng.active_qubits
+
+
 def test_qureg_str():
     assert str(_qubit.Qureg([])) == 'Qureg[]'
     eng = MainEngine(backend=DummyEngine(), engine_list=[])